@@ -30,6 +30,8 @@ try:
     NEGATIVE_THRESHOLD = user_config["NEGATIVE_THRESHOLD"]
 
     MEMORY_CONCEPT_CAPACITY = user_config["MEMORY_CONCEPT_CAPACITY"]  # how many concepts can this NARS have?
+    MEMORY_HOT_CONCEPT_CAPACITY = user_config["MEMORY_HOT_CONCEPT_CAPACITY"]  # how many concepts keep their tables and links in RAM; the rest are stored on disk. 0 keeps every concept in RAM
+    COLD_CONCEPT_SWEEP_INTERVAL = user_config["COLD_CONCEPT_SWEEP_INTERVAL"]  # working cycles between demotions of low priority concepts to disk
     EVENT_BUFFER_CAPACITY = user_config["EVENT_BUFFER_CAPACITY"]
     GLOBAL_BUFFER_CAPACITY = user_config["GLOBAL_BUFFER_CAPACITY"]
     CONCEPT_LINK_CAPACITY = user_config["CONCEPT_LINK_CAPACITY"]  # how many of each concept link can this NARS have?
@@ -48,6 +50,9 @@ try:
     ARRAY_SENTENCES_DRAW_INDIVIDUAL_ELEMENTS = user_config[
         "ARRAY_SENTENCES_DRAW_INDIVIDUAL_ELEMENTS"]  # whether or not to draw each individual element / pixel of an array sentence. Turning this to False results in GUI speedup when viewing array sentences
     USE_PROFILER = user_config["USE_PROFILER"]
+    METRICS_ENABLED = user_config["METRICS_ENABLED"]  # record counters and timings of cycle phases, tasks, inference rules and containers (see NARSMetrics)
+    GUI_UPDATES_PER_SECOND = user_config["GUI_UPDATES_PER_SECOND"]  # max number of batched data structure updates sent to the GUI per second
+    GUI_SNAPSHOT_INTERVAL = user_config["GUI_SNAPSHOT_INTERVAL"]  # working cycles between shared memory snapshots of the concepts bag for the GUI; 0 sends every concept change instead
 
 
     """
@@ -56,6 +61,11 @@ try:
     PROJECTION_DECAY_DESIRE = user_config["PROJECTION_DECAY_DESIRE"]
     PROJECTION_DECAY_EVENT = user_config["PROJECTION_DECAY_EVENT"]
 
+    INFERENCE_POOL_PROCESSES = user_config["INFERENCE_POOL_PROCESSES"]  # worker processes for the premise pairs of a working cycle (judgments, and goals with their beliefs; question pairs derive nothing that is kept, so they are not pooled); 0 runs each pair when it is picked
+    INFERENCE_POOL_MIN_BATCH_SIZE = user_config["INFERENCE_POOL_MIN_BATCH_SIZE"]  # fewest premise pairs in a cycle worth sending to the worker processes
+
+    SHARD_BELIEF_REQUESTS_PER_CYCLE = user_config["SHARD_BELIEF_REQUESTS_PER_CYCLE"]  # concepts owned by other shards whose beliefs a shard asks for each working cycle (see NARSShards)
+
     NUMBER_OF_ATTEMPTS_TO_SEARCH_FOR_SEMANTICALLY_RELATED_CONCEPT = user_config[
         "NUMBER_OF_ATTEMPTS_TO_SEARCH_FOR_SEMANTICALLY_RELATED_CONCEPT"]  # The number of times to look for a semantically related concept to interact with
     NUMBER_OF_ATTEMPTS_TO_SEARCH_FOR_SEMANTICALLY_RELATED_BELIEF = user_config[
@@ -69,6 +79,9 @@ try:
         Bags
     """
     BAG_DEFAULT_CAPACITY = user_config["BAG_DEFAULT_CAPACITY"]  # default for how many items can fit in a bag
+    BAG_LAZY_DECAY = user_config["BAG_LAZY_DECAY"]  # defer moving decayed concepts between buckets until they are sampled
+    BAG_LAZY_DECAY_RATE = user_config["BAG_LAZY_DECAY_RATE"]  # priority multiplier per working cycle, for every concept and concept link in lazy decay mode
+    BAG_DECAY_SWEEP_INTERVAL = user_config["BAG_DECAY_SWEEP_INTERVAL"]  # working cycles between sweeps of lazily decayed concepts
 
     """
         Tables
@@ -80,6 +93,17 @@ try:
     """
     MAX_EVIDENTIAL_BASE_LENGTH = user_config[
         "MAX_EVIDENTIAL_BASE_LENGTH"]  # maximum IDs to store documenting evidential base
+    EVIDENTIAL_BASE_FINGERPRINT_BITS = user_config[
+        "EVIDENTIAL_BASE_FINGERPRINT_BITS"]  # size of the bitset used to rule out evidential overlap without comparing IDs
+    PARSE_CACHE_CAPACITY = user_config["PARSE_CACHE_CAPACITY"]  # how many parsed Narsese strings to remember
+    SENTENCE_INDEX_CAPACITY = user_config["SENTENCE_INDEX_CAPACITY"]  # how many recent sentences can be looked up by Stamp ID (0 to disable)
+
+    """
+        Memory Journal
+    """
+    JOURNAL_FLUSH_INTERVAL = user_config["JOURNAL_FLUSH_INTERVAL"]  # working cycles between appends of changed concepts to the journal
+    JOURNAL_CHECKPOINT_INTERVAL = user_config["JOURNAL_CHECKPOINT_INTERVAL"]  # working cycles between checkpoints of the whole memory
+    JOURNAL_CHECKPOINT_CHUNK_SIZE = user_config["JOURNAL_CHECKPOINT_CHUNK_SIZE"]  # concepts written into a checkpoint per working cycle
 
     """
         Default Input Task Values
@@ -2,15 +2,45 @@
     Author: Christian Hahm
     Created: December 24, 2020
 """
+import contextvars
+import time
+
 import Config
 import NALGrammar.Terms
 
+
+class ReasonerContext:
+    """
+        State of one NARS instance that sentences, stamps and terms need while reasoning:
+        its memory, which hands out Stamp IDs, holds the current cycle number and the concepts.
+
+        Stamps bind the context active when they are created, so several NARS can run in one process.
+    """
+
+    def __init__(self, memory=None):
+        self.memory = memory  # NARSMemory.Memory, replaced when memory is loaded or restored
+
+    def get_current_cycle_number(self):
+        return self.memory.current_cycle_number
+
+    def get_next_stamp_id(self):
+        return self.memory.get_next_stamp_id()
+
+    def peek_concept(self, term):
+        return self.memory.peek_concept(term)
+
+
+current_context = contextvars.ContextVar("current_context", default=None)  # ReasonerContext of the running NARS
+
+
 class Global:
     """
         NARS vars
     """
     NARS = None  # variable to hold NARS instance
     paused = False
+    output_log = None  # if a list, output messages are appended to it instead of printed (see NARS.run_headless)
+    metrics = None  # NARSMetrics.MetricsRegistry recording counters and timings, or None when metrics are disabled
 
     """
         Terms
@@ -32,30 +62,81 @@ class Global:
     """
     NARS_object_pipe = None
     NARS_string_pipe = None
+    gui_update_batcher = None  # GUIUpdateBatcher, coalesces data structure updates between sends to the GUI
+
+    @classmethod
+    def is_gui_attached(cls):
+        """
+            :return: Is the GUI enabled and its process connected? If not, NARS runs headless.
+        """
+        return Config.GUI_USE_INTERFACE and cls.NARS_string_pipe is not None
+
+    @classmethod
+    def is_gui_mirrored(cls, data_structure):
+        """
+            :return: Does the GUI keep a copy of the data structure's items, updated on every put and take?
+                The concepts bag is instead read from a shared memory snapshot, if GUI_SNAPSHOT_INTERVAL is set.
+        """
+        return cls.is_gui_attached() and not (Config.GUI_SNAPSHOT_INTERVAL > 0
+                                              and data_structure is cls.NARS.memory.concepts_bag)
+
+    @classmethod
+    def get_context(cls):
+        """
+            :return: ReasonerContext of the NARS running in this thread,
+                or of the NARS in Global.NARS if none has run in this thread (e.g. the shell input thread)
+        """
+        context = current_context.get()
+        if context is None: return cls.NARS.context
+        return context
+
+    @classmethod
+    def set_context(cls, context):
+        """
+            Make a ReasonerContext the one new sentences and stamps use in this thread
+            :return: token to reset the previous context with
+        """
+        return current_context.set(context)
+
+    @classmethod
+    def reset_context(cls, token):
+        """
+            Put back the ReasonerContext this thread had before set_context returned the token
+        """
+        current_context.reset(token)
 
     @classmethod
     def get_current_cycle_number(cls):
-        return cls.NARS.memory.current_cycle_number
+        return cls.get_context().memory.current_cycle_number
 
     @classmethod
     def print_to_output(cls, msg, data_structure=None):
         try:
             data_structure_name = None
             data_structure_len = 0
-            if data_structure is None: print(msg)
+            if data_structure is None:
+                if cls.output_log is not None:
+                    cls.output_log.append(msg)
+                else:
+                    print(msg)
             if not(data_structure is cls.NARS.memory.concepts_bag or
                    data_structure is cls.NARS.temporal_module or
                    data_structure is cls.NARS.global_buffer or
                    data_structure is None): return # must be a valid data structure
+            if data_structure is not None and not cls.is_gui_mirrored(data_structure): return
+            if not cls.is_gui_attached(): return
             if data_structure is not None:
                 data_structure_name = (str(data_structure), type(data_structure).__name__)
                 data_structure_len = len(data_structure)
-            if Config.GUI_USE_INTERFACE: cls.NARS_string_pipe.send(("print", msg, data_structure_name, data_structure_len))
+                cls.get_gui_update_batcher().add(msg, data_structure_name, data_structure_len)
+            else:
+                cls.NARS_string_pipe.send(("print", msg, data_structure_name, data_structure_len))
         except:
             print(msg)
 
     @classmethod
     def clear_output_gui(cls, data_structure=None):
+        cls.get_gui_update_batcher().discard(type(data_structure).__name__)
         cls.NARS_string_pipe.send(("clear", "", type(data_structure).__name__,0))
 
     @classmethod
@@ -67,7 +148,24 @@ class Global:
         if not(data_structure is cls.NARS.memory.concepts_bag or
                data_structure is cls.NARS.temporal_module or
                data_structure is cls.NARS.global_buffer): return
-        cls.NARS_string_pipe.send(("remove", msg, (str(data_structure), type(data_structure).__name__),len(data_structure)))
+        if not cls.is_gui_mirrored(data_structure): return
+        cls.get_gui_update_batcher().remove(msg, (str(data_structure), type(data_structure).__name__), len(data_structure))
+
+    @classmethod
+    def get_gui_update_batcher(cls):
+        if cls.gui_update_batcher is None:
+            cls.gui_update_batcher = GUIUpdateBatcher(updates_per_second=Config.GUI_UPDATES_PER_SECOND)
+        return cls.gui_update_batcher
+
+    @classmethod
+    def flush_gui_updates(cls, force=False):
+        """
+            Send the batched data structure updates to the GUI,
+            if enough time has passed since the last send (or if forced)
+        """
+        if not cls.is_gui_attached() or cls.gui_update_batcher is None: return
+        for batch in cls.gui_update_batcher.flush(force=force):
+            cls.NARS_string_pipe.send(batch)
 
     @classmethod
     def set_paused(cls, paused):
@@ -75,7 +173,7 @@ class Global:
             Set global paused variable and GUI
         """
         cls.paused = paused
-        if Config.GUI_USE_INTERFACE: cls.NARS_string_pipe.send(("paused", paused, "guibox", 0))
+        if cls.is_gui_attached(): cls.NARS_string_pipe.send(("paused", paused, "guibox", 0))
 
 
     @classmethod
@@ -93,4 +191,79 @@ class Global:
         cls.TERM_SELF = NALGrammar.Terms.from_string("{SELF}")
         cls.TERM_IMAGE_PLACEHOLDER = NALGrammar.Terms.from_string("_")
 
+
+
+class GUIUpdateBatcher:
+    """
+        Collects the items put into and taken from the GUI-displayed data structures,
+        and sends them to the GUI as one "batch" message per data structure, at most updates_per_second times per second.
+
+        Only the net change since the last flush is sent:
+            an item added and then removed within the same window is never sent,
+            and an item that changed (removed, then re-added) is sent as one remove and one add.
+    """
+
+    def __init__(self, updates_per_second):
+        self.flush_interval = 1.0 / updates_per_second if updates_per_second > 0 else 0.0
+        self.last_flush_time = 0.0
+        self.pending = {}  # data structure info -> [removed messages by item ID, added messages by item ID, length]
+
+    def __len__(self):
+        return sum([len(removes) + len(adds) for removes, adds, _ in self.pending.values()])
+
+    @classmethod
+    def get_item_id(cls, msg):
+        start = msg.find(Global.MARKER_ITEM_ID) + len(Global.MARKER_ITEM_ID)
+        return msg[start:msg.find(Global.MARKER_ID_END, start)]
+
+    def get_pending(self, data_structure_info, length):
+        if data_structure_info not in self.pending:
+            self.pending[data_structure_info] = [{}, {}, length]
+        pending = self.pending[data_structure_info]
+        pending[2] = length
+        return pending
+
+    def add(self, msg, data_structure_info, length):
+        """
+            An item was put into the data structure
+        """
+        _, adds, _ = self.get_pending(data_structure_info, length)
+        adds[GUIUpdateBatcher.get_item_id(msg)] = msg
+
+    def remove(self, msg, data_structure_info, length):
+        """
+            An item was taken from the data structure
+        """
+        removes, adds, _ = self.get_pending(data_structure_info, length)
+        item_id = GUIUpdateBatcher.get_item_id(msg)
+        if item_id in adds:
+            # the GUI never saw this version of the item
+            del adds[item_id]
+        else:
+            removes[item_id] = msg
+
+    def discard(self, data_structure_name):
+        """
+            Drop the pending updates for a data structure whose GUI box is being cleared
+        """
+        for data_structure_info in list(self.pending):
+            if data_structure_info[1] == data_structure_name:
+                del self.pending[data_structure_info]
+
+    def flush(self, force=False):
+        """
+            :param force: send the pending updates even if the last flush was less than one interval ago
+            :return: list of ("batch", (removed messages, added messages), data structure info, length) messages,
+                empty if it is not time to flush yet
+        """
+        now = time.monotonic()
+        if not force and now - self.last_flush_time < self.flush_interval: return []
+        self.last_flush_time = now
+        batches = [("batch", (list(removes.values()), list(adds.values())), data_structure_info, length)
+                   for data_structure_info, (removes, adds, length) in self.pending.items()
+                   if len(removes) > 0 or len(adds) > 0]
+        self.pending = {}
+        return batches
+
+
 Global.create_inherent_terms()
\ No newline at end of file
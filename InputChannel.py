@@ -69,6 +69,16 @@ def parse_input_line(input_string: str):
             NARS.save_memory_to_disk()
         elif input_string == "load":
             NARS.load_memory_from_disk()
+        elif input_string == "journal":
+            NARS.start_memory_journal()
+        elif input_string == "restore":
+            NARS.restore_memory_from_journal()
+        elif input_string == "metrics":
+            if Global.Global.metrics is None:
+                NARS.enable_metrics()
+                Global.Global.print_to_output("Metrics enabled")
+            else:
+                Global.Global.print_to_output(Global.Global.metrics.to_prometheus_text())
         elif input_string == "load_input":
             load_input()
         else:
@@ -113,6 +123,20 @@ def process_input_channel():
                 Global.Global.NARS.vision_buffer.set_image(img_array)
 
 
+def input_lines(lines):
+    """
+        Parse lines of input in order and put the resultant sentences into NARS as tasks, immediately.
+        Blank lines and // comments are skipped.
+
+        :param lines: iterable of input strings, one sentence or command per string
+    """
+    for line in lines:
+        line = line.strip()
+        if len(line) == 0 or line.startswith("//"): continue
+        sentence = parse_input_line(line)
+        if sentence is not None: process_sentence_into_task(sentence)
+
+
 def process_sentence_into_task(sentence: NALGrammar.Sentences.Sentence):
     """
         Put a sentence into a NARS task, then do something with the Task
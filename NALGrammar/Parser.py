@@ -0,0 +1,217 @@
+import re
+
+import NALSyntax
+import NALGrammar.Terms
+
+"""
+    Author: Christian Hahm
+    Created: October 18, 2026
+    Purpose: Parses Narsese term strings in a single left-to-right pass
+"""
+
+"""
+    Character classes
+"""
+WORD_PATTERN = re.compile("[" + "".join([re.escape(char) for char in sorted(NALSyntax.valid_term_chars)]) + "]*")
+DIGITS_PATTERN = re.compile("[0-9]+")
+DEPENDENCY_LIST_END = ")"
+
+SET_STARTS = {NALSyntax.TermConnector.ExtensionalSetStart.value: NALSyntax.TermConnector.ExtensionalSetStart,
+              NALSyntax.TermConnector.IntensionalSetStart.value: NALSyntax.TermConnector.IntensionalSetStart}
+SET_ENDS = {NALSyntax.TermConnector.ExtensionalSetStart.value: NALSyntax.TermConnector.ExtensionalSetEnd.value,
+            NALSyntax.TermConnector.IntensionalSetStart.value: NALSyntax.TermConnector.IntensionalSetEnd.value}
+COPULA_LENGTH = 3
+
+
+def parse_term(term_string):
+    """
+        Parse a Term from a Narsese string containing no spaces.
+
+        Builds the same Terms as the recursive, slicing parser (NALGrammar.Terms._from_string_recursive),
+        but reads each character a constant number of times.
+
+        :param term_string: String from which to construct the term
+        :return: Term parsed from the string
+    """
+    assert len(term_string) > 0, "ERROR: Cannot convert empty string to a Term."
+    return TermParser(term_string).parse()
+
+
+class TermParser:
+    """
+        Recursive-descent parser over a term string.
+
+        Grammar:
+            term ::= atomic | variable | set | compound | statement
+            set ::= {<element>,...} | [<element>,...]
+            compound ::= (<connector>,<element>,...)
+            statement ::= (<term><copula><term>)
+            element ::= <term> | <interval>
+
+        The tokens (brackets, connectors, copulas, words, intervals) are read on demand,
+        since which token comes next (e.g. "--" or "-->") depends on where the parser is in the grammar.
+    """
+
+    def __init__(self, string):
+        self.string = string
+        self.position = 0
+        self.trailing_interval = None  # interval ending the most recently parsed term, e.g. the 5 in (&/,A,5)
+
+    def parse(self):
+        term = self.parse_term()
+        self.skip_atomic_intervals(term)
+        assert self.position == len(self.string), \
+            "ERROR: Unexpected " + self.string[self.position:] + " after term in " + self.string
+        return term
+
+    def peek_char(self):
+        if self.position >= len(self.string): return None
+        return self.string[self.position]
+
+    def expect_char(self, char):
+        assert self.peek_char() == char, \
+            "ERROR: Expected " + char + " at position " + str(self.position) + " of " + self.string
+        self.position += 1
+
+    def read_word(self):
+        match = WORD_PATTERN.match(self.string, self.position)
+        self.position = match.end()
+        return match.group()
+
+    def parse_term(self):
+        char = self.peek_char()
+        assert char is not None, "ERROR: Term ended unexpectedly: " + self.string
+        self.trailing_interval = None
+
+        if char == NALSyntax.StatementSyntax.Start.value:
+            return self.parse_compound_or_statement()
+        elif char in SET_STARTS:
+            return self.parse_set()
+        elif char == NALGrammar.Terms.VariableTerm.VARIABLE_SYM or char == NALGrammar.Terms.VariableTerm.QUERY_SYM:
+            return self.parse_variable()
+        else:
+            return self.parse_atomic()
+
+    def parse_atomic(self):
+        start = self.position
+        name = self.read_word()
+        assert len(name) > 0, "ERROR: Invalid term at position " + str(start) + " of " + self.string
+        return NALGrammar.Terms.AtomicTerm(name)
+
+    def parse_variable(self):
+        variable_type_symbol = self.string[self.position]
+        self.position += 1
+        variable_name = self.read_word()
+
+        dependency_list_string = ""
+        if self.peek_char() == NALSyntax.StatementSyntax.Start.value:
+            end = self.string.find(DEPENDENCY_LIST_END, self.position)
+            assert end != -1, "ERROR: Variable dependency list is not closed in " + self.string
+            dependency_list_string = self.string[self.position + 1:end]
+            self.position = end + 1
+            last_dependency = dependency_list_string.rsplit(NALSyntax.StatementSyntax.TermDivider.value, 1)
+            if len(last_dependency) == 2 and last_dependency[1].isdigit():
+                self.trailing_interval = int(last_dependency[1])
+
+        return NALGrammar.Terms.VariableTerm.from_string(variable_name=variable_name,
+                                                         variable_type_symbol=variable_type_symbol,
+                                                         dependency_list_string=dependency_list_string)
+
+    def parse_set(self):
+        set_start = self.string[self.position]
+        self.position += 1
+        subterms, intervals, trailing_interval = self.parse_elements(SET_ENDS[set_start])
+        term = NALGrammar.Terms.CompoundTerm(subterms, SET_STARTS[set_start], intervals=intervals)
+        self.trailing_interval = trailing_interval
+        return term
+
+    def parse_compound_or_statement(self):
+        self.position += 1  # (
+        connector = self.parse_connector()
+        if connector is None:
+            return self.parse_statement()
+
+        subterms, intervals, trailing_interval = self.parse_elements(NALSyntax.StatementSyntax.End.value)
+        term = NALGrammar.Terms.CompoundTerm(subterms, connector, intervals=intervals)
+        self.trailing_interval = trailing_interval
+        return term
+
+    def parse_connector(self):
+        """
+            A compound starts with a 1 or 2 character connector followed by the term divider
+
+            :return: the connector, or None if this is not a compound
+        """
+        divider = NALSyntax.StatementSyntax.TermDivider.value
+        for length in (1, 2):
+            end = self.position + length
+            if end < len(self.string) and self.string[end] == divider:
+                connector = NALSyntax.TermConnector.get_term_connector_from_string(self.string[self.position:end])
+                if connector is None: return None
+                self.position = end + 1
+                return connector
+        return None
+
+    def parse_elements(self, end_char):
+        """
+            Parse a comma-separated list of elements up to and including end_char.
+            Elements consisting of only digits are intervals, unless they are the last element.
+
+            :return: subterms, intervals, and the interval if the last element was digits (otherwise None)
+        """
+        subterms = []
+        intervals = []
+        divider = NALSyntax.StatementSyntax.TermDivider.value
+        while True:
+            trailing_interval = None
+            digits = DIGITS_PATTERN.match(self.string, self.position)
+            if digits is not None and self.string[digits.end():digits.end() + 1] == divider:
+                intervals.append(int(digits.group()))
+                self.position = digits.end() + 1
+                continue
+
+            if digits is not None and self.string[digits.end():digits.end() + 1] == end_char:
+                trailing_interval = int(digits.group())
+            subterms.append(self.parse_term())
+
+            char = self.peek_char()
+            if char == divider:
+                self.position += 1
+            else:
+                self.expect_char(end_char)
+                return subterms, intervals, trailing_interval
+
+    def parse_statement(self):
+        subject_term = self.parse_term()
+        self.skip_atomic_intervals(subject_term)
+        subject_trailing_interval = self.trailing_interval
+
+        copula = NALSyntax.Copula.get_copula_from_string(self.string[self.position:self.position + COPULA_LENGTH])
+        assert copula is not None, "ERROR: Copula not found at position " + str(self.position) + " of " + self.string
+        self.position += COPULA_LENGTH
+
+        predicate_term = self.parse_term()
+        self.skip_atomic_intervals(predicate_term)
+        self.expect_char(NALSyntax.StatementSyntax.End.value)
+
+        interval = 0
+        if not NALSyntax.Copula.is_first_order(copula) and subject_trailing_interval is not None:
+            interval = subject_trailing_interval
+
+        term = NALGrammar.Terms.StatementTerm(subject_term=subject_term,
+                                              predicate_term=predicate_term,
+                                              copula=copula,
+                                              interval=interval)
+        self.trailing_interval = None
+        return term
+
+    def skip_atomic_intervals(self, term):
+        """
+            An atomic term may be followed by intervals, e.g. the subject of (A,5-->B), which are dropped
+        """
+        if not isinstance(term, NALGrammar.Terms.AtomicTerm): return
+        divider = NALSyntax.StatementSyntax.TermDivider.value
+        while self.peek_char() == divider:
+            digits = DIGITS_PATTERN.match(self.string, self.position + 1)
+            assert digits is not None, "ERROR: Unexpected " + divider + " at position " + str(self.position) + " of " + self.string
+            self.position = digits.end()
@@ -1,3 +1,6 @@
+import array
+import functools
+
 import Config
 import Global
 import NALSyntax
@@ -21,6 +24,11 @@ class Sentence:
     """
         sentence ::= <statement><punctuation> <tense> %<value>%
     """
+    # sentences are created for every derivation and kept in tables, so they have slots instead of a __dict__
+    # (and a __weakref__ slot, so tools and tests can watch when one is freed)
+    __slots__ = ("statement", "punctuation", "stamp", "value", "eternal_expectation",
+                 "present_value", "present_expectation", "present_value_cycle", "__weakref__")
+
     def __init__(self, statement, value, punctuation, occurrence_time=None):
         """
 
@@ -38,8 +46,12 @@ class Sentence:
         self.value = value  # truth-value (for Judgment) or desire-value (for Goal) or None (for Question)
 
         if self.punctuation != NALSyntax.Punctuation.Question:
-            self.eternal_expectation = NALInferenceRules.TruthValueFunctions.Expectation(self.value.frequency,
-                                                                                     self.value.confidence)
+            self.eternal_expectation = self.value.get_expectation()
+
+        # an event's value projected to the current cycle, and its expectation, computed at most once per cycle
+        self.present_value = None
+        self.present_expectation = None
+        self.present_value_cycle = None
 
     def __str__(self):
         return self.get_formatted_string()
@@ -59,11 +71,9 @@ class Sentence:
         return self.stamp.get_tense()
 
     def get_expectation(self):
-        if self.is_event():
-            time_projected_truth_value = self.get_present_value()
-            expectation = NALInferenceRules.TruthValueFunctions.Expectation(time_projected_truth_value.frequency,
-                                                                     time_projected_truth_value.confidence)
-            return expectation
+        if self.stamp.occurrence_time is not None:
+            if self.present_value_cycle != self.stamp.context.memory.current_cycle_number: self.project_to_present()
+            return self.present_expectation
         else:
             return self.eternal_expectation
 
@@ -96,20 +106,29 @@ class Sentence:
         """
             If this is an event, project its value to the current time
         """
-        if self.is_event():
-            decay = Config.PROJECTION_DECAY_EVENT
-            if isinstance(self,Goal):
-                decay = Config.PROJECTION_DECAY_DESIRE
-            present_value = NALInferenceRules.TruthValueFunctions.F_Projection(self.value.frequency,
-                                                           self.value.confidence,
-                                                           self.stamp.occurrence_time,
-                                                           Global.Global.get_current_cycle_number(),
-                                                           decay=decay)
-
-            return present_value
+        if self.stamp.occurrence_time is not None:
+            if self.present_value_cycle != self.stamp.context.memory.current_cycle_number: self.project_to_present()
+            return self.present_value
         else:
             return self.value
 
+    def project_to_present(self):
+        """
+            Project this event's value to the current cycle, and remember it (and its expectation) until the cycle advances
+        """
+        current_cycle = self.stamp.context.memory.current_cycle_number
+        decay = Config.PROJECTION_DECAY_EVENT
+        if isinstance(self,Goal):
+            decay = Config.PROJECTION_DECAY_DESIRE
+        self.present_value = NALInferenceRules.TruthValueFunctions.F_Projection(self.value.frequency,
+                                                                                self.value.confidence,
+                                                                                self.stamp.occurrence_time,
+                                                                                current_cycle,
+                                                                                decay=decay)
+        self.present_expectation = NALInferenceRules.TruthValueFunctions.Expectation(self.present_value.frequency,
+                                                                                     self.present_value.confidence)
+        self.present_value_cycle = current_cycle
+
     def get_term_string_no_id(self):
         string = self.statement.get_term_string()
         string += str(self.punctuation.value)
@@ -141,7 +160,7 @@ class Sentence:
         evidential_base_iterator = iter(self.stamp.evidential_base)
         next(
             evidential_base_iterator)  # skip the first element, which is just the sentence's ID so it' already displayed
-        dict[NARSGUI.NARSGUI.KEY_LIST_EVIDENTIAL_BASE] = [str(evidence) for evidence in evidential_base_iterator]
+        dict[NARSGUI.NARSGUI.KEY_LIST_EVIDENTIAL_BASE] = self.stamp.get_evidence_strings(evidential_base_iterator)
         dict[NARSGUI.NARSGUI.KEY_LIST_INTERACTED_SENTENCES] = [] #todo remove
 
         is_array = isinstance(self.statement, NALGrammar.Terms.SpatialTerm)
@@ -152,7 +171,7 @@ class Sentence:
         # END TODO
 
         dict[NARSGUI.NARSGUI.KEY_DERIVED_BY] = self.stamp.derived_by
-        dict[NARSGUI.NARSGUI.KEY_PARENT_PREMISES] = str(self.stamp.parent_premises)
+        dict[NARSGUI.NARSGUI.KEY_PARENT_PREMISES] = str(self.stamp.get_evidence_strings(self.stamp.parent_premise_ids))
         return dict
 
 
@@ -160,6 +179,7 @@ class Judgment(Sentence):
     """
         judgment ::= <statement>. %<truth-value>%
     """
+    __slots__ = ()
 
     def __init__(self, statement, value,occurrence_time=None):
         Asserts.assert_valid_statement(statement)
@@ -174,6 +194,7 @@ class Question(Sentence):
     """
         question ::= <statement>? %<truth-value>%
     """
+    __slots__ = ()
 
     def __init__(self, statement):
         Asserts.assert_valid_statement(statement)
@@ -187,6 +208,7 @@ class Goal(Sentence):
     """
         goal ::= <statement>! %<desire-value>%
     """
+    __slots__ = ("executed",)
 
     def __init__(self, statement, value, occurrence_time=None):
         self.executed = False
@@ -207,21 +229,41 @@ class Stamp:
         when it was created, its occurrence time (when is its truth value valid),
         evidential base, etc.
     """
+    __slots__ = ("context", "id", "creation_time", "occurrence_time", "sentence", "evidential_base",
+                 "derived_by", "parent_premise_ids", "from_one_premise_inference")
+
     def __init__(self, self_sentence, occurrence_time=None):
-        self.id = Global.Global.NARS.memory.get_next_stamp_id()
-        self.creation_time = Global.Global.get_current_cycle_number()  # when was this stamp created (in inference cycles)?
+        self.context = Global.Global.get_context()  # ReasonerContext of the NARS the sentence belongs to
+        memory = self.context.memory
+        self.id = memory.get_next_stamp_id()
+        self.creation_time = memory.current_cycle_number  # when was this stamp created (in inference cycles)?
         self.occurrence_time = occurrence_time
         self.sentence = self_sentence
-        self.evidential_base = EvidentialBase(self_sentence=self_sentence)
+        self.evidential_base = EvidentialBase(self_sentence=self_sentence, stamp_id=self.id)
         self.derived_by = None # none if input task
-        self.parent_premises = []
+        self.parent_premise_ids = () # Stamp IDs of the premises this sentence was derived from
         self.from_one_premise_inference = False # is this sentence derived from one-premise inference?
+        if memory.sentence_index is not None: memory.sentence_index.put(self.id, self_sentence)
+
+    def get_evidence_strings(self, stamp_ids):
+        """
+            :param stamp_ids: Stamp IDs, e.g. of the evidential base or the parent premises
+            :return: the formatted strings of the sentences with those IDs, if they are still in the memory's
+                sentence index, otherwise just the IDs
+        """
+        sentence_index = self.context.memory.sentence_index
+        strings = []
+        for stamp_id in stamp_ids:
+            sentence = None if sentence_index is None else sentence_index.get(stamp_id)
+            strings.append(Global.Global.MARKER_SENTENCE_ID + str(stamp_id) + Global.Global.MARKER_ID_END
+                           if sentence is None else str(sentence))
+        return strings
 
     def get_tense(self):
         if self.occurrence_time is None:
             return NALSyntax.Tense.Eternal
 
-        current_cycle = Global.Global.get_current_cycle_number()
+        current_cycle = self.context.memory.current_cycle_number
         if self.occurrence_time < current_cycle:
             return NALSyntax.Tense.Past
         elif self.occurrence_time == current_cycle:
@@ -233,20 +275,42 @@ class Stamp:
 
 class EvidentialBase:
     """
-        Stores history of how the sentence was derived
+        Stores history of how the sentence was derived, as the Stamp IDs of its evidence.
+        Only IDs are kept, so a sentence does not keep its ancestors alive
+        (see Memory.sentence_index for looking the sentences up).
+
+        It also keeps a fingerprint: an int with one bit set per ID (see get_evidence_fingerprint).
+        Bases whose fingerprints share no bit have no evidence in common,
+        so most overlap checks are a single AND, and only fingerprint hits compare the IDs.
     """
-    def __init__(self,self_sentence):
+    __slots__ = ("sentence", "ids", "fingerprint")
+
+    def __init__(self,self_sentence, stamp_id):
         """
-        :param id: Sentence ID
+        :param stamp_id: Sentence ID
         """
         self.sentence = self_sentence
-        self.base = [self_sentence]  # array of sentences
+        self.ids = array.array('q', (stamp_id,))  # Stamp IDs of the evidence, oldest first
+        self.fingerprint = get_evidence_fingerprint(stamp_id)
 
     def __iter__(self):
-        return iter(self.base)
+        return iter(self.ids)
+
+    def __len__(self):
+        return len(self.ids)
 
     def __contains__(self, object):
-        return object in self.base
+        stamp_id = object.stamp.id
+        if not self.fingerprint & get_evidence_fingerprint(stamp_id): return False
+        return stamp_id in self.ids
+
+    def set_evidence(self, stamp_ids):
+        """
+            Replace the evidence in the base (e.g. when restoring a sentence)
+            :param stamp_ids: Stamp IDs of the evidence
+        """
+        self.ids = array.array('q', stamp_ids)
+        self.fingerprint = get_evidence_fingerprint(*self.ids)
 
     def merge_sentence_evidential_base_into_self(self, sentence):
         """
@@ -254,22 +318,37 @@ class EvidentialBase:
             This function assumes the base to merge does not have evidential overlap with this base
             #todo figure out good way to store evidential bases such that older evidence is purged on overflow
         """
-        for e_sentence in sentence.stamp.evidential_base:
-            self.base.append(e_sentence)
+        other_base = sentence.stamp.evidential_base
+        self.ids.extend(other_base.ids)
 
-        while len(self.base) > Config.MAX_EVIDENTIAL_BASE_LENGTH:
-            self.base.pop(0)
+        overflow = len(self.ids) - Config.MAX_EVIDENTIAL_BASE_LENGTH
+        if overflow > 0:
+            del self.ids[:overflow]
+            self.fingerprint = get_evidence_fingerprint(*self.ids)  # purged IDs may share bits with kept ones
+        else:
+            self.fingerprint |= other_base.fingerprint
 
     def has_evidential_overlap(self, other_base):
         """
             Check does other base has overlapping evidence with self?
-            O(M + N)
-            https://stackoverflow.com/questions/3170055/test-if-lists-share-any-items-in-python
+            O(1) when the fingerprints are disjoint, otherwise O(M + N)
         """
         if self.sentence.is_event(): return False
-        return not set(self.base).isdisjoint(other_base.base)
+        if not self.fingerprint & other_base.fingerprint: return False
+        return not set(self.ids).isdisjoint(other_base.ids)
 
 
+def get_evidence_fingerprint(*stamp_ids):
+    """
+        :return: int with the fingerprint bit of each Stamp ID set.
+            Stamp IDs are handed out in sequence, so the bit is the ID modulo EVIDENTIAL_BASE_FINGERPRINT_BITS:
+            two IDs only share a bit if they are a multiple of that many IDs apart.
+    """
+    fingerprint = 0
+    for stamp_id in stamp_ids:
+        fingerprint |= 1 << (stamp_id % Config.EVIDENTIAL_BASE_FINGERPRINT_BITS)
+    return fingerprint
+
 
 def may_interact(j1,j2):
     """
@@ -303,6 +382,55 @@ def new_sentence_from_string(sentence_string: str):
 
         :returns Sentence parsed from sentence_string
     """
+    statement, punctuation, freq, conf, tense = _parse_sentence_string(sentence_string.strip())
+
+    # make sentence
+    if punctuation == NALSyntax.Punctuation.Judgment:
+        sentence = Judgment(statement, TruthValue(freq, conf))
+    elif punctuation == NALSyntax.Punctuation.Question:
+        sentence = Question(statement)
+    elif punctuation == NALSyntax.Punctuation.Goal:
+        sentence = Goal(statement, DesireValue(freq, conf))
+    else:
+        assert False,"Error: No Punctuation!"
+
+
+
+    if tense == NALSyntax.Tense.Present:
+        # Mark present tense event as happening right now!
+        sentence.stamp.occurrence_time = sentence.stamp.context.memory.current_cycle_number
+
+    return sentence
+
+
+def get_statement_from_string(sentence_string: str):
+    """
+        :param sentence_string - String of NAL syntax <term copula term>punctuation %frequency;confidence%
+
+        :returns the statement Term of the sentence, without making the Sentence (so no Stamp ID is used)
+    """
+    return _parse_sentence_string(sentence_string.strip())[0]
+
+
+def get_parse_cache_info():
+    """
+        :return: (hits, misses, maxsize, currsize) of the sentence parse cache
+    """
+    return _parse_sentence_string.cache_info()
+
+
+def clear_parse_cache():
+    _parse_sentence_string.cache_clear()
+
+
+@functools.lru_cache(maxsize=Config.PARSE_CACHE_CAPACITY)
+def _parse_sentence_string(sentence_string: str):
+    """
+        Parse the parts of a sentence string. Memoized, since every Sentence needs its own Stamp
+        but the parts parsed from the same string are always the same.
+
+        :returns (statement term, punctuation, frequency, confidence, tense)
+    """
     # Find statement start and statement end
     start_idx = sentence_string.find(NALSyntax.StatementSyntax.Start.value)
     assert (start_idx != -1), "Statement start character " + NALSyntax.StatementSyntax.Start.value + " not found."
@@ -345,21 +473,4 @@ def new_sentence_from_string(sentence_string: str):
                 tense = NALSyntax.Tense.get_tense_from_string(sentence_string[tense_idx: tense_idx + len(t.value)])
                 break
 
-
-    # make sentence
-    if punctuation == NALSyntax.Punctuation.Judgment:
-        sentence = Judgment(statement, TruthValue(freq, conf))
-    elif punctuation == NALSyntax.Punctuation.Question:
-        sentence = Question(statement)
-    elif punctuation == NALSyntax.Punctuation.Goal:
-        sentence = Goal(statement, DesireValue(freq, conf))
-    else:
-        assert False,"Error: No Punctuation!"
-
-
-
-    if tense == NALSyntax.Tense.Present:
-        # Mark present tense event as happening right now!
-        sentence.stamp.occurrence_time = Global.Global.get_current_cycle_number()
-
-    return sentence
\ No newline at end of file
+    return statement, punctuation, freq, conf, tense
@@ -4,14 +4,17 @@
     Purpose: Enforces Narsese grammar that is used throughout the project
 """
 import enum
+import functools
 import re
+import weakref
 
 import numpy as np
 
+import Config
 import Global
 import NALSyntax
 import Asserts
-from NALGrammar import Sentences, Values
+from NALGrammar import Sentences, Values, Parser
 
 """
 Helper Functions
@@ -26,11 +29,44 @@ def from_string(term_string):
         Determine if it is an atomic term (e.g. "A") or a statement/compound term (e.g. (&&,A,B,..) or (A --> B))
         or variable term and creates the corresponding Term.
 
+        Parsed terms are memoized in an LRU cache keyed by the string with spaces removed.
+        Terms are interned and never modified, so a cached term can be handed out again.
+
         :param term_string - String from which to construct the term
         :returns Term constructed using the string
     """
-    term_string = term_string.replace(" ", "")
+    return _parse_term_string(term_string.replace(" ", ""))
+
+
+def get_parse_cache_info():
+    """
+        :return: (hits, misses, maxsize, currsize) of the term parse cache
+    """
+    return _parse_term_string.cache_info()
+
+
+def clear_parse_cache():
+    _parse_term_string.cache_clear()
+
+
+@functools.lru_cache(maxsize=Config.PARSE_CACHE_CAPACITY)
+def _parse_term_string(term_string):
+    """
+        Parse a term from a string with no spaces.
+        Use from_string() instead, which normalizes the string first.
+    """
+    return Parser.parse_term(term_string)
+
 
+def _from_string_recursive(term_string):
+    """
+        The original parser, which finds the top-level copula or subterms of a term by scanning its string
+        and then recurses into substrings.
+        from_string() uses the single-pass NALGrammar.Parser instead; this is kept as its reference.
+
+        :param term_string - String with no spaces from which to construct the term
+        :returns Term constructed using the string
+    """
     assert len(term_string) > 0, "ERROR: Cannot convert empty string to a Term."
 
     if term_string[0] == NALSyntax.StatementSyntax.Start.value:
@@ -43,12 +79,18 @@ def from_string(term_string):
         copula, copula_idx = NALSyntax.Copula.get_top_level_copula(term_string)
         if copula is None:
             # compound term
-            term = CompoundTerm.from_string(term_string)
+            subterms, connector, intervals = CompoundTerm.parse_toplevel_subterms_and_connector(term_string)
+            term = CompoundTerm(subterms, connector, intervals=intervals)
         else:
-            term = StatementTerm.from_string(term_string)
+            subject_term, predicate_term, copula, interval = StatementTerm.parse_toplevel_subject_predicate_and_copula(term_string)
+            term = StatementTerm(subject_term=subject_term,
+                                 predicate_term=predicate_term,
+                                 copula=copula,
+                                 interval=interval)
     elif NALSyntax.TermConnector.is_set_bracket_start(term_string[0]):
         # set term
-        term = CompoundTerm.from_string(term_string)
+        subterms, connector, intervals = CompoundTerm.parse_toplevel_subterms_and_connector(term_string)
+        term = CompoundTerm(subterms, connector, intervals=intervals)
     elif term_string[0] == VariableTerm.VARIABLE_SYM \
             or term_string[0] == VariableTerm.QUERY_SYM:
         # variable term
@@ -122,33 +164,110 @@ def simplify(term):
     return simplified_term
 
 
-class Term:
+class TermInterner(type):
+    """
+        Metaclass that hash-conses Terms.
+        Constructing a term that already exists returns the existing canonical instance.
+    """
+
+    def __call__(cls, *args, **kwargs):
+        term = super().__call__(*args, **kwargs)
+        return Term.intern(term)
+
+
+class Term(metaclass=TermInterner):
     """
         Base class for all terms.
+
+        Terms are interned: there is one instance per term structure, and every term carries a dense integer ID
+        shared by all terms with the same string, so comparing two terms does not compare their strings.
+
+        Terms are interned by structure, not by string, so a term's string is only built when it is first needed.
     """
-    term_id = 0
+    next_term_id = 0
+    interned_terms = weakref.WeakValueDictionary()  # intern key -> term
+    canonical_terms = weakref.WeakValueDictionary()  # identity key -> term holding the ID for that identity
+
     def __init__(self,
-                 term_string):
-        assert isinstance(term_string, str), term_string + " must be a str"
+                 term_string=None):
+        """
+            :param term_string: the term's string, or None to build it with _create_term_string() on first use
+        """
+        assert term_string is None or isinstance(term_string, str), str(term_string) + " must be a str"
         self.string = term_string
+        self.term_id = None  # assigned when the term is interned
         self.syntactic_complexity = 0#self._calculate_syntactic_complexity()
 
     @classmethod
     def get_next_term_ID(cls):
-        cls.term_id += 1
-        return cls.term_id
+        Term.next_term_id += 1
+        return Term.next_term_id
+
+    @classmethod
+    def intern(cls, term):
+        """
+            Look up the canonical instance of a term, registering the term if it is new.
+
+            :param term: Newly constructed term
+            :return: The interned term equal in structure to the given term
+        """
+        key = term.get_intern_key()
+        interned = Term.interned_terms.get(key)
+        if interned is not None:
+            term.term_id = interned.term_id
+            return interned
+
+        identity_key = term.get_identity_key()
+        canonical = Term.canonical_terms.get(identity_key)
+        if canonical is None:
+            term.term_id = Term.get_next_term_ID()
+            Term.canonical_terms[identity_key] = term
+        else:
+            # same term but different intervals; shares the ID and keeps it alive
+            term.term_id = canonical.term_id
+            term.canonical_term = canonical
+
+        Term.interned_terms[key] = term
+        return term
+
+    def get_identity_key(self):
+        """
+            :return: Key shared by all terms that have the same string
+        """
+        return type(self), self.get_term_string()
+
+    def get_intern_key(self):
+        """
+            :return: Key identifying the term's structure, including intervals, in the interning table
+        """
+        return self.get_identity_key()
 
     def get_term_string(self):
+        if self.string is None:
+            self.string = self._create_term_string()
         return self.string
 
+    def _create_term_string(self):
+        assert False, "Term string not defined for Term base class"
+
     def __eq__(self, other):
         """
-            Terms are equal if their strings are the same
+            Terms are equal if their strings are the same, i.e. if they have the same term ID
         """
+        if isinstance(other, Term):
+            return self.term_id == other.term_id
         return str(self) == str(other)
 
     def __hash__(self):
-        return hash(str(self))
+        # hash like the term string so a term can look up items keyed by its string (the string caches its hash)
+        return hash(self.get_term_string())
+
+    def __setstate__(self, state):
+        """
+            Terms loaded from disk are re-interned so their IDs agree with the terms of this process
+        """
+        self.__dict__.update(state)
+        Term.intern(self)
 
     def __str__(self):
         return self.get_term_string()
@@ -330,7 +449,13 @@ class CompoundTerm(Term):
         for i, subterm in np.ndenumerate(self.subterms):
             self.is_operation = self.is_operation and subterm.is_op()
 
-        Term.__init__(self, term_string=self._create_term_string())
+        Term.__init__(self)
+
+    def get_identity_key(self):
+        return type(self), self.connector, tuple([subterm.term_id for subterm in self.subterms])
+
+    def get_intern_key(self):
+        return self.get_identity_key() + (tuple(self.intervals),)
 
     def is_op(self):
         return self.is_operation
@@ -342,8 +467,9 @@ class CompoundTerm(Term):
         return False
 
     def contains_positive(self):
+        memory = Global.Global.get_context().memory  # terms are shared by every NARS in the process
         for subterm in self.subterms:
-            subterm_concept = Global.Global.NARS.memory.peek_concept(subterm)
+            subterm_concept = memory.peek_concept(subterm)
             if not subterm.is_op() and subterm_concept.term_contains_positive():
                 return True
         return False
@@ -383,22 +509,18 @@ class CompoundTerm(Term):
             return NALSyntax.StatementSyntax.Start.value + string + NALSyntax.StatementSyntax.End.value
 
     def _create_term_string(self):
-        if self.is_set():
-            string = self.connector.value
-        else:
-            string = self.connector.value + NALSyntax.StatementSyntax.TermDivider.value
-
-        for i in range(len(self.subterms)):
-            subterm = self.subterms[i]
-            string = string + subterm.get_term_string() + NALSyntax.StatementSyntax.TermDivider.value
-
-        string = string[:-1]  # remove the final term divider
+        subterms_string = NALSyntax.StatementSyntax.TermDivider.value.join([subterm.get_term_string() for subterm in self.subterms])
 
         if self.is_set():
-            return string + NALSyntax.TermConnector.get_set_end_connector_from_set_start_connector(
-                self.connector).value
+            return self.connector.value \
+                   + subterms_string \
+                   + NALSyntax.TermConnector.get_set_end_connector_from_set_start_connector(self.connector).value
         else:
-            return NALSyntax.StatementSyntax.Start.value + string + NALSyntax.StatementSyntax.End.value
+            return NALSyntax.StatementSyntax.Start.value \
+                   + self.connector.value \
+                   + NALSyntax.StatementSyntax.TermDivider.value \
+                   + subterms_string \
+                   + NALSyntax.StatementSyntax.End.value
 
     def _calculate_syntactic_complexity(self):
         """
@@ -419,14 +541,13 @@ class CompoundTerm(Term):
         """
             Create a compound term from a string representing a compound term
         """
-        compound_term_string = compound_term_string.replace(" ", "")
-        subterms, connector, intervals = cls.parse_toplevel_subterms_and_connector(compound_term_string)
-        return cls(subterms, connector, intervals=intervals)
+        return from_string(compound_term_string)
 
     @classmethod
     def parse_toplevel_subterms_and_connector(cls, compound_term_string):
         """
-            Parse out all top-level subterms from a string representing a compound term
+            Parse out all top-level subterms from a string representing a compound term.
+            Used by the reference parser, _from_string_recursive().
 
             compound_term_string - a string representing a compound term
         """
@@ -465,13 +586,13 @@ class CompoundTerm(Term):
                 if subterm_string.isdigit():
                     intervals.append(int(subterm_string))
                 else:
-                    subterm = from_string(subterm_string)
+                    subterm = _from_string_recursive(subterm_string)
                     subterms.append(subterm)
                 subterm_string = ""
             else:
                 subterm_string += c
 
-        subterm = from_string(subterm_string)
+        subterm = _from_string_recursive(subterm_string)
         subterms.append(subterm)
 
         return subterms, connector, intervals
@@ -525,14 +646,26 @@ class StatementTerm(Term):
 
         self.is_operation = self.calculate_is_operation()
 
-        Term.__init__(self, term_string=self._create_term_string())
+        Term.__init__(self)
 
     @classmethod
     def from_string(cls, statement_string):
         """
             Parameter: statement_string - String of NAL syntax "(term copula term)"
 
-            Returns: top-level subject term, predicate term, copula, copula index
+            Returns: the statement term
+        """
+        return from_string(statement_string)
+
+    @classmethod
+    def parse_toplevel_subject_predicate_and_copula(cls, statement_string):
+        """
+            Parse out the subject, predicate and copula from a string representing a statement.
+            Used by the reference parser, _from_string_recursive().
+
+            Parameter: statement_string - String of NAL syntax "(term copula term)"
+
+            Returns: top-level subject term, predicate term, copula, interval
         """
         statement_string = statement_string.replace(" ", "")
         # get copula
@@ -549,12 +682,7 @@ class StatementTerm(Term):
             if last_element[0:-1].isdigit():
                 interval = int(last_element[0:-1])
 
-        statement_term = StatementTerm(subject_term=from_string(subject_str),
-                                       predicate_term=from_string(predicate_str),
-                                       copula=copula,
-                                       interval=interval)
-
-        return statement_term
+        return _from_string_recursive(subject_str), _from_string_recursive(predicate_str), copula, interval
 
     def _calculate_syntactic_complexity(self):
         """
@@ -569,6 +697,12 @@ class StatementTerm(Term):
 
         return count
 
+    def get_identity_key(self):
+        return type(self), self.copula, self.subterms[0].term_id, self.subterms[1].term_id
+
+    def get_intern_key(self):
+        return self.get_identity_key() + (self.interval,)
+
     def get_subject_term(self):
         return self.subterms[0]
 
@@ -621,15 +755,11 @@ class StatementTerm(Term):
 
             returns: (Subject copula Predicate)
         """
-        string = NALSyntax.StatementSyntax.Start.value + \
-                 self.get_subject_term().get_term_string()
-
-        string += " " + self.get_copula_string() + " "
-
-        string += self.get_predicate_term().get_term_string() + \
-                  NALSyntax.StatementSyntax.End.value
-
-        return string
+        return NALSyntax.StatementSyntax.Start.value \
+               + self.get_subject_term().get_term_string() \
+               + " " + self.get_copula_string() + " " \
+               + self.get_predicate_term().get_term_string() \
+               + NALSyntax.StatementSyntax.End.value
 
     def contains_op(self):
         contains = self.is_op()
@@ -655,7 +785,7 @@ class StatementTerm(Term):
         return NALSyntax.Copula.is_symmetric(self.copula)
 
     def is_positive(self):
-        term_concept = Global.Global.NARS.memory.peek_concept(self)
+        term_concept = Global.Global.get_context().memory.peek_concept(self)  # terms are shared by every NARS in the process
         if term_concept is None: return False
         # todo higher order statements?
         return term_concept.is_positive()
@@ -692,18 +822,24 @@ class SpatialTerm(CompoundTerm):
                               term_connector=connector)
         # self.subterms = None
 
+    def get_identity_key(self):
+        return type(self), self.connector, self.dimensions, tuple([subterm.term_id for subterm in self.subterms.flat])
+
     def _create_term_string(self):
         """
+            Each element is written as <row><element><column>_
 
         :return:
         """
-        string = ''
-        for indices, element_term in np.ndenumerate(self.subterms):
-            string += str(indices[0]) + str(element_term) + str(indices[1]) + '_'
+        element_strings = []
+        for row in range(self.dimensions[0]):
+            row_string = str(row)
+            for column in range(self.dimensions[1]):
+                element_strings.append(row_string + self.subterms[row, column].get_term_string() + str(column) + '_')
 
         return NALSyntax.StatementSyntax.Start.value \
                 + self.connector.value \
-                + string \
+                + "".join(element_strings) \
                 + NALSyntax.StatementSyntax.End.value
 
    # def img_from_term(self):
@@ -11,6 +11,7 @@ class EvidentialValue:
     """
         <frequency, confidence>
     """
+    __slots__ = ("frequency", "confidence", "formatted_string")
 
     def __init__(self, frequency, confidence):
         if confidence >= 1.0: confidence = 0.9999
@@ -19,6 +20,10 @@ class EvidentialValue:
         assert (confidence >= 0.0 and confidence < 1.0), "ERROR: Confidence must be in (0,1)"
         self.frequency = float(frequency)
         self.confidence = float(confidence)
+        self.formatted_string = None  # built the first time the value is printed
+
+    def get_expectation(self):
+        return NALInferenceRules.TruthValueFunctions.Expectation(self.frequency, self.confidence)
 
     def get_formatted_string(self):
         assert False, "Formatted string not defined for Evidential Value base class"
@@ -33,19 +38,21 @@ class DesireValue(EvidentialValue):
         For a virtual judgement S |=> D,
         how much the associated statement S implies the overall desired state of NARS, D
     """
+    __slots__ = ()
 
     def __init__(self, frequency=Config.DEFAULT_GOAL_FREQUENCY, confidence=None):
         if frequency is None: frequency = Config.DEFAULT_GOAL_FREQUENCY
         if confidence is None: confidence = NALInferenceRules.HelperFunctions.get_unit_evidence()
         if confidence > 0.99: confidence = 0.99999
         super().__init__(frequency=frequency, confidence=confidence)
-        self.formatted_string = str(NALSyntax.StatementSyntax.TruthValMarker.value) \
-               + "{:.2f}".format(self.frequency) \
-               + str(NALSyntax.StatementSyntax.ValueSeparator.value) \
-               + "{:.2f}".format(self.confidence) \
-               + str(NALSyntax.StatementSyntax.TruthValMarker.value)
 
     def get_formatted_string(self):
+        if self.formatted_string is None:
+            self.formatted_string = str(NALSyntax.StatementSyntax.TruthValMarker.value) \
+                   + "{:.2f}".format(self.frequency) \
+                   + str(NALSyntax.StatementSyntax.ValueSeparator.value) \
+                   + "{:.2f}".format(self.confidence) \
+                   + str(NALSyntax.StatementSyntax.TruthValMarker.value)
         return self.formatted_string
 
 
@@ -54,16 +61,18 @@ class TruthValue(EvidentialValue):
         <frequency, confidence>
         Describing the evidential basis for the associated statement to be true
     """
+    __slots__ = ()
 
     def __init__(self, frequency=Config.DEFAULT_JUDGMENT_FREQUENCY, confidence=None):
         if frequency is None: frequency = Config.DEFAULT_JUDGMENT_FREQUENCY
         if confidence is None: confidence = NALInferenceRules.HelperFunctions.get_unit_evidence()
         super().__init__(frequency=frequency, confidence=confidence)
-        self.formatted_string = str(NALSyntax.StatementSyntax.TruthValMarker.value) \
-               + '{0:.2f}'.format(self.frequency) \
-               + str(NALSyntax.StatementSyntax.ValueSeparator.value) \
-               + '{0:.10f}'.format(self.confidence) \
-               + str(NALSyntax.StatementSyntax.TruthValMarker.value) \
 
     def get_formatted_string(self):
-        return self.formatted_string
\ No newline at end of file
+        if self.formatted_string is None:
+            self.formatted_string = str(NALSyntax.StatementSyntax.TruthValMarker.value) \
+                   + '{0:.2f}'.format(self.frequency) \
+                   + str(NALSyntax.StatementSyntax.ValueSeparator.value) \
+                   + '{0:.10f}'.format(self.confidence) \
+                   + str(NALSyntax.StatementSyntax.TruthValMarker.value)
+        return self.formatted_string
@@ -8,6 +8,9 @@
     Purpose: Defines the NAL inference rules
             Assumes the given sentences do not have evidential overlap.
             Does combine evidential bases in the Resultant Sentence.
+
+            The operators are element-wise, so they also accept NumPy arrays of values
+            (as used by the array truth value functions).
 """
 
 def band(*argv):
@@ -1,5 +1,7 @@
 import math
 
+import numpy as np
+
 import Config
 import Global
 import NALGrammar
@@ -30,6 +32,23 @@ def get_truthvalue_from_evidence(wp, w):
     return f, c
 
 
+def get_truthvalue_array_from_evidence(wp, w):
+    """
+        Array counterpart of get_truthvalue_from_evidence
+
+        Input:
+            wp: array of positive evidence w+
+
+            w: array of total evidence w
+        Returns:
+            frequency array, confidence array
+    """
+    wp, w = np.asarray(wp, dtype=float), np.asarray(w, dtype=float)
+    f = np.where(wp == w, 1.0, wp / np.where(w == 0, 1.0, w))
+    c = get_confidence_from_evidence(w)
+    return f, c
+
+
 def get_evidence_fromfreqconf(f, c):
     """
         Input:
@@ -145,7 +164,8 @@ def create_resultant_sentence_one_premise(j, result_statement, truth_value_funct
 
 
     if truth_value_function is None:
-        stamp_and_print_inference_rule(result, truth_value_function, j.stamp.parent_premises)
+        stamp_and_print_inference_rule(result, truth_value_function, [])
+        result.stamp.parent_premise_ids = j.stamp.parent_premise_ids
     else:
         stamp_and_print_inference_rule(result, truth_value_function, [j])
 
@@ -154,12 +174,12 @@ def create_resultant_sentence_one_premise(j, result_statement, truth_value_funct
 def stamp_and_print_inference_rule(sentence, inference_rule, parent_sentences):
     sentence.stamp.derived_by = "Structural Transformation" if inference_rule is None else inference_rule.__name__
 
-    sentence.stamp.parent_premises = []
+    parent_premise_ids = []
 
 
     parent_strings = []
     for parent in parent_sentences:
-        sentence.stamp.parent_premises.append(parent)
+        parent_premise_ids.append(parent.stamp.id)
 
         # if isinstance(parent.statement, NALGrammar.Terms.SpatialTerm):
         #     parent_strings.append("CENTER: " + str(parent.statement.center) + " | DIM:"
@@ -178,6 +198,7 @@ def stamp_and_print_inference_rule(sentence, inference_rule, parent_sentences):
         # else:
         #     parent_strings.append("other " + str(parent.value))
 
+    sentence.stamp.parent_premise_ids = tuple(parent_premise_ids)
 
     if inference_rule is F_Deduction and isinstance(sentence, NALGrammar.Sentences.Judgment) and sentence.statement.is_first_order():
         Global.Global.debug_print(sentence.stamp.derived_by
@@ -216,23 +216,8 @@ def TruthFunctionOnArray(truth_value_array_1, truth_value_array_2, truth_value_f
     if truth_value_array_1 is None and truth_value_array_2 is None: return None
     if truth_value_array_1 is not None and truth_value_array_2 is not None: assert truth_value_array_1.shape == truth_value_array_2.shape,"ERROR: Truth value arrays must be the same shape"
 
-    def function(*indices):
-        coords = tuple([int(var) for var in indices])
-        truth_value_1 = truth_value_array_1[coords]
-        if truth_value_array_2 is None:
-            # single truth value
-            truth_value = truth_value_function(truth_value_1.frequency,
-                                                        truth_value_1.confidence)
-        else:
-            truth_value_2 = truth_value_array_2[coords]
-            truth_value = truth_value_function(truth_value_1.frequency,
-                                                        truth_value_1.confidence,
-                                                        truth_value_2.frequency,
-                                                        truth_value_2.confidence)
-        return truth_value
-
-    func_vectorized = np.vectorize(function)
-    return np.fromfunction(function=func_vectorized,shape=truth_value_array_1.shape)
+    frequencies, confidences = _apply_array_function(truth_value_array_1, truth_value_array_2, truth_value_function)
+    return create_truth_value_array(frequencies, confidences)
 
 
 
@@ -240,13 +225,9 @@ def ReviseArray(truth_value_array):
     """
          Revises a truth value array into a single truth-value
     """
-    final_truth_value = None
-    for (coords), element in np.ndenumerate(truth_value_array):
-        if final_truth_value is None:
-            final_truth_value = element
-        else:
-            final_truth_value = F_Revision(final_truth_value.frequency,final_truth_value.confidence,element.frequency,element.confidence)
-    return final_truth_value
+    frequencies, confidences = get_truth_value_arrays(truth_value_array)
+    f_rev, c_rev = F_Revision_Reduce(frequencies, confidences)
+    return NALGrammar.Values.TruthValue(f_rev, c_rev)
 
 def TruthFunctionOnArrayAndRevise(truth_value_array_1, truth_value_array_2, truth_value_function):
     """
@@ -255,27 +236,176 @@ def TruthFunctionOnArrayAndRevise(truth_value_array_1, truth_value_array_2, trut
 
          Returns the single truth-value
     """
-    final_truth_value = None
-    final_truth_value_array = np.empty(shape=truth_value_array_1.shape,dtype=NALGrammar.Values.TruthValue)
-    for (coords), element in np.ndenumerate(truth_value_array_1):
-        truth_value_1 = truth_value_array_1[coords]
-        if truth_value_array_2 is None:
-            # single truth value
-            truth_value = truth_value_function(truth_value_1.frequency,
-                                                        truth_value_1.confidence)
-        else:
-            truth_value_2 = truth_value_array_2[coords]
-            truth_value = truth_value_function(truth_value_1.frequency,
-                                                        truth_value_1.confidence,
-                                                        truth_value_2.frequency,
-                                                        truth_value_2.confidence)
-        final_truth_value_array[coords] = truth_value
-        if final_truth_value is None:
-            final_truth_value = truth_value
-        else:
-            final_truth_value = F_Revision(final_truth_value.frequency,
-                                           final_truth_value.confidence,
-                                           truth_value.frequency,
-                                           truth_value.confidence)
-
-    return final_truth_value,final_truth_value_array
\ No newline at end of file
+    frequencies, confidences = _apply_array_function(truth_value_array_1, truth_value_array_2, truth_value_function)
+    f_rev, c_rev = F_Revision_Reduce(frequencies, confidences)
+    final_truth_value = NALGrammar.Values.TruthValue(f_rev, c_rev)
+    final_truth_value_array = create_truth_value_array(frequencies, confidences)
+
+    return final_truth_value,final_truth_value_array
+
+
+def _apply_array_function(truth_value_array_1, truth_value_array_2, truth_value_function):
+    """
+        Runs the array counterpart of a truth value function on 1 or 2 arrays of TruthValues
+
+        :return: (frequency array, confidence array)
+    """
+    array_function = ARRAY_TRUTH_VALUE_FUNCTIONS[truth_value_function]
+    f1, c1 = get_truth_value_arrays(truth_value_array_1)
+    if truth_value_array_2 is None:
+        # single truth value
+        return array_function(f1, c1)
+    f2, c2 = get_truth_value_arrays(truth_value_array_2)
+    return array_function(f1, c1, f2, c2)
+
+
+def get_truth_value_arrays(truth_value_array):
+    """
+        :param truth_value_array: array of TruthValues
+        :return: (frequency array, confidence array) with the same shape
+    """
+    truth_values = truth_value_array.ravel()
+    frequencies = np.array([truth_value.frequency for truth_value in truth_values], dtype=float)
+    confidences = np.array([truth_value.confidence for truth_value in truth_values], dtype=float)
+    return frequencies.reshape(truth_value_array.shape), confidences.reshape(truth_value_array.shape)
+
+
+def create_truth_value_array(frequencies, confidences):
+    """
+        :return: array of TruthValues built from a frequency array and a confidence array
+    """
+    truth_value_array = np.empty(shape=frequencies.size, dtype=NALGrammar.Values.TruthValue)
+    truth_value_array[:] = [NALGrammar.Values.TruthValue(f, c)
+                            for f, c in zip(frequencies.ravel().tolist(), confidences.ravel().tolist())]
+    return truth_value_array.reshape(frequencies.shape)
+
+
+"""
+    Array Truth Value Functions
+
+    Counterparts of the truth value functions above that take and return NumPy arrays of frequencies and confidences,
+    so a whole array of truth values is computed with a few array operations.
+    Confidence is bounded the same way a TruthValue bounds it.
+"""
+
+def _truth_value_arrays(f, c):
+    """
+        :return: (f, c) as float arrays, with confidence bounded to (0,1) as in EvidentialValue
+    """
+    c = np.asarray(c, dtype=float)
+    c = np.where(c >= 1.0, 0.9999, np.where(c <= 0.0, 0.0001, c))
+    return np.asarray(f, dtype=float) * np.ones_like(c), c
+
+
+def F_Revision_Array(f1, c1, f2, c2):
+    wp1, w1, _ = NALInferenceRules.HelperFunctions.get_evidence_fromfreqconf(f1, c1)
+    wp2, w2, _ = NALInferenceRules.HelperFunctions.get_evidence_fromfreqconf(f2, c2)
+    f_rev, c_rev = NALInferenceRules.HelperFunctions.get_truthvalue_array_from_evidence(wp1 + wp2, w1 + w2)
+    return _truth_value_arrays(f_rev, c_rev)
+
+
+def F_Revision_Reduce(frequencies, confidences):
+    """
+        Revises every element of the arrays into a single truth-value,
+        by summing the evidence of all elements.
+
+        :return: (f, c) of the revised truth-value
+    """
+    wp, w, _ = NALInferenceRules.HelperFunctions.get_evidence_fromfreqconf(frequencies, confidences)
+    wp, w = np.sum(wp), np.sum(w)
+    f_rev, c_rev = NALInferenceRules.HelperFunctions.get_truthvalue_array_from_evidence(wp, w)
+    return float(f_rev), float(c_rev)
+
+
+def F_Negation_Array(f, c):
+    return _truth_value_arrays(1 - f, c)
+
+
+def F_Conversion_Array(f, c):
+    return _truth_value_arrays(1.0, (f * c) / (f * c + Config.k))
+
+
+def F_Contraposition_Array(f, c):
+    return _truth_value_arrays(f, ExtendedBooleanOperators.band(f, c))
+
+
+def F_Deduction_Array(f1, c1, f2, c2):
+    return _truth_value_arrays(ExtendedBooleanOperators.band(f1, f2),
+                               ExtendedBooleanOperators.band(f1, f2, c1, c2))
+
+
+def F_Analogy_Array(f1, c1, f2, c2):
+    return _truth_value_arrays(ExtendedBooleanOperators.band(f1, f2),
+                               ExtendedBooleanOperators.band(f2, c1, c2))
+
+
+def F_Resemblance_Array(f1, c1, f2, c2):
+    return _truth_value_arrays(ExtendedBooleanOperators.band(f1, f2),
+                               ExtendedBooleanOperators.band(ExtendedBooleanOperators.bor(f1, f2), c1, c2))
+
+
+def F_Abduction_Array(f1, c1, f2, c2):
+    wp = ExtendedBooleanOperators.band(f1, f2, c1, c2)
+    w = ExtendedBooleanOperators.band(f1, c1, c2)
+    return _truth_value_arrays(*NALInferenceRules.HelperFunctions.get_truthvalue_array_from_evidence(wp, w))
+
+
+def F_Induction_Array(f1, c1, f2, c2):
+    wp = ExtendedBooleanOperators.band(f1, f2, c1, c2)
+    w = ExtendedBooleanOperators.band(f2, c1, c2)
+    return _truth_value_arrays(*NALInferenceRules.HelperFunctions.get_truthvalue_array_from_evidence(wp, w))
+
+
+def F_Exemplification_Array(f1, c1, f2, c2):
+    wp = ExtendedBooleanOperators.band(f1, f2, c1, c2)
+    return _truth_value_arrays(*NALInferenceRules.HelperFunctions.get_truthvalue_array_from_evidence(wp, wp))
+
+
+def F_Comparison_Array(f1, c1, f2, c2):
+    wp = ExtendedBooleanOperators.band(f1, f2, c1, c2)
+    w = ExtendedBooleanOperators.band(ExtendedBooleanOperators.bor(f1, f2), c1, c2)
+    return _truth_value_arrays(*NALInferenceRules.HelperFunctions.get_truthvalue_array_from_evidence(wp, w))
+
+
+def F_Intersection_Array(f1, c1, f2, c2):
+    return _truth_value_arrays(ExtendedBooleanOperators.band_average(f1, f2),
+                               ExtendedBooleanOperators.band_average(c1, c2))
+
+
+def F_Union_Array(f1, c1, f2, c2):
+    return _truth_value_arrays(ExtendedBooleanOperators.bor(f1, f2),
+                               ExtendedBooleanOperators.band_average(c1, c2))
+
+
+def F_Difference_Array(f1, c1, f2, c2):
+    return _truth_value_arrays(ExtendedBooleanOperators.band(f1, ExtendedBooleanOperators.bnot(f2)),
+                               ExtendedBooleanOperators.band(c1, c2))
+
+
+def F_Projection_Array(frequency, confidence, t_B, t_T, decay):
+    interval = np.abs(np.asarray(t_B) - np.asarray(t_T))
+    return _truth_value_arrays(frequency, confidence * (decay ** interval))
+
+
+def F_Eternalization_Array(temporal_frequency, temporal_confidence):
+    return _truth_value_arrays(temporal_frequency, temporal_confidence / (Config.k + temporal_confidence))
+
+
+ARRAY_TRUTH_VALUE_FUNCTIONS = {
+    F_Revision: F_Revision_Array,
+    F_Negation: F_Negation_Array,
+    F_Conversion: F_Conversion_Array,
+    F_Contraposition: F_Contraposition_Array,
+    F_Deduction: F_Deduction_Array,
+    F_Analogy: F_Analogy_Array,
+    F_Resemblance: F_Resemblance_Array,
+    F_Abduction: F_Abduction_Array,
+    F_Induction: F_Induction_Array,
+    F_Exemplification: F_Exemplification_Array,
+    F_Comparison: F_Comparison_Array,
+    F_Intersection: F_Intersection_Array,
+    F_Union: F_Union_Array,
+    F_Difference: F_Difference_Array,
+    F_Projection: F_Projection_Array,
+    F_Eternalization: F_Eternalization_Array,
+}
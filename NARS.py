@@ -1,8 +1,10 @@
+import atexit
 import cProfile
 import pstats
 from io import StringIO
 
 import dill as pickle
+import itertools
 import random
 import sys
 import timeit
@@ -14,10 +16,14 @@ import InputChannel
 import NALInferenceRules
 import NARSGUI
 import NARSInferenceEngine
+import NARSInferencePool
+import NARSJournal
+import NARSMetrics
 import NALGrammar
 import NALSyntax
 import NARSMemory
 
+import NARSDataStructures.BagSnapshot
 import NARSDataStructures.Buffers
 import NARSDataStructures.Other
 import NARSDataStructures.ItemContainers
@@ -41,8 +47,11 @@ class NARS:
             self.pr = cProfile.Profile()
             self.pr.enable()
 
+        if Config.METRICS_ENABLED and Global.Global.metrics is None: self.enable_metrics()
+
         self.prev_take_time = -1
 
+        self.context = Global.ReasonerContext()  # bound by the sentences and stamps this NARS creates
         self.memory = NARSMemory.Memory()
         self.global_buffer = NARSDataStructures.Buffers.Buffer(item_type=NARSDataStructures.Other.Task,
                                                                capacity=Config.GLOBAL_BUFFER_CAPACITY)
@@ -58,6 +67,10 @@ class NARS:
         # enforce milliseconds per working cycle
         self.cycle_begin_time = None
 
+        # if a dict, the seconds spent in each phase of the working cycle are added to it (see end_cycle_phase)
+        self.cycle_phase_times = None
+        self.cycle_phase_begin_time = None
+
         # keeps track of number of working cycles per second
         self.cycles_per_second_timer = timeit.default_timer()
         self.last_working_cycle = 0
@@ -66,12 +79,30 @@ class NARS:
         self.last_vision_sentences = [None, None, None]
         self.last_vision_sentences2 = [None, None, None]
 
+        self.memory_journal = None  # NARSJournal.MemoryJournal, if journaling memory changes to disk
+
+        # NARSInferencePool.InferencePool, if premise pairs are collected and run in worker processes once per cycle
+        self.inference_pool = None
+        if Config.INFERENCE_POOL_PROCESSES > 0: self.start_inference_pool(Config.INFERENCE_POOL_PROCESSES)
+
+        # shared memory snapshot of the concepts bag, read by the GUI
+        self.concepts_snapshot_writer = None
+        self.last_snapshot_cycle = None
+
         Global.Global.NARS = self # global vars are part of NARS
         Global.Global.ARRAY_NEGATIVE_ELEMENT = NALGrammar.Terms.from_string('(--,(arrayEl-->negative))')
         Global.Global.ARRAY_NEGATIVE_SENTENCE = NALGrammar.Sentences.Judgment(statement=Global.Global.ARRAY_NEGATIVE_ELEMENT,
                                                      value=NALGrammar.Values.TruthValue(frequency=1.0))
 
 
+    @property
+    def memory(self):
+        return self.context.memory
+
+    @memory.setter
+    def memory(self, memory):
+        self.context.memory = memory
+
     def startup_and_run(self):
         self.run()
 
@@ -81,7 +112,7 @@ class NARS:
             Infinite loop of working cycles
         """
         while True:
-            if Config.GUI_USE_INTERFACE:
+            if Global.Global.is_gui_attached():
                 time.sleep(0.1)
                 self.handle_gui_pipes()
 
@@ -93,8 +124,78 @@ class NARS:
             #time.sleep(0.2)
             self.do_working_cycle()
 
+    def end_cycle_phase(self, phase):
+        """
+            Add the time since the previous phase of the working cycle ended to the given phase,
+            if cycle_phase_times is set, and to the phase's histogram if metrics are enabled
+        """
+        metrics = Global.Global.metrics
+        if self.cycle_phase_times is None and metrics is None: return
+        now = timeit.default_timer()
+        seconds = now - self.cycle_phase_begin_time
+        if self.cycle_phase_times is not None:
+            self.cycle_phase_times[phase] = self.cycle_phase_times.get(phase, 0.0) + seconds
+        if metrics is not None: metrics.observe("nars_cycle_phase_seconds", seconds, {"phase": phase})
+        self.cycle_phase_begin_time = now
+
+    def enable_metrics(self):
+        """
+            Start recording metrics (see NARSMetrics), if not already
+            :return: the MetricsRegistry
+        """
+        if Global.Global.metrics is None: Global.Global.metrics = NARSMetrics.create_nars_registry()
+        return Global.Global.metrics
+
+    def disable_metrics(self):
+        """
+            Stop recording metrics and discard those recorded so far
+        """
+        Global.Global.metrics = None
+
+    def run_headless(self, input_lines=(), cycles=100, until=None, lines_per_cycle=None):
+        """
+            Run a fixed budget of working cycles as fast as possible:
+            no GUI, no shell input and no sleeping. Used for regression suites and offline learning.
+
+            :param input_lines: list or generator of Narsese input lines
+            :param cycles: maximum number of working cycles to run
+            :param until: optional predicate on the list of outputs so far; the run stops once it returns True
+            :param lines_per_cycle: number of input lines to feed before each working cycle,
+                or None to feed all of them before the first cycle
+            :return: list of the output messages (e.g. "OUT: ...", "EXE: ...") produced during the run
+        """
+        previous_nars = Global.Global.NARS
+        Global.Global.NARS = self
+        context_token = Global.Global.set_context(self.context)
+        outputs = []
+        previous_output_log = Global.Global.output_log
+        Global.Global.output_log = outputs
+        input_lines = iter(input_lines)
+        try:
+            if lines_per_cycle is None: InputChannel.input_lines(input_lines)
+            for _ in range(cycles):
+                if lines_per_cycle is not None: InputChannel.input_lines(itertools.islice(input_lines, lines_per_cycle))
+                self.do_working_cycle()
+                if until is not None and until(outputs): break
+        finally:
+            Global.Global.NARS = previous_nars
+            Global.Global.output_log = previous_output_log
+            Global.Global.reset_context(context_token)
+
+        return outputs
+
 
     def do_working_cycle(self):
+        """
+            Performs 1 working cycle, with this NARS' ReasonerContext as the context of the calling thread
+        """
+        context_token = Global.Global.set_context(self.context)
+        try:
+            self.do_working_cycle_steps()
+        finally:
+            Global.Global.reset_context(context_token)
+
+    def do_working_cycle_steps(self):
         """
             Performs 1 working cycle.
             In each working cycle, NARS either *Observes* OR *Considers*:
@@ -114,6 +215,7 @@ class NARS:
                                                                                 + str(len(self.global_buffer) / Config.GLOBAL_BUFFER_CAPACITY) + "%")
 
         self.cycle_begin_time = timeit.default_timer()
+        self.cycle_phase_begin_time = self.cycle_begin_time
 
         # process input channel and temporal module
         InputChannel.process_input_channel()
@@ -131,6 +233,7 @@ class NARS:
             self.global_buffer.PUT_NEW(NARSDataStructures.Other.Task(vision_sentence))
 
         # todo end spatial take ^^
+        self.end_cycle_phase("input")
 
         # global buffer
         buffer_len = len(self.global_buffer)
@@ -140,11 +243,29 @@ class NARS:
             # process task
             self.process_task(task_item.object)
             tasks_left -= 1
+        self.end_cycle_phase("global_buffer")
 
         self.Consider()
+        self.end_cycle_phase("consider")
+
+        if self.inference_pool is not None:
+            for derived_sentence in self.inference_pool.run():
+                self.global_buffer.PUT_NEW(NARSDataStructures.Other.Task(derived_sentence))
+            self.end_cycle_phase("pooled_inference")
 
         # now execute operations
         self.execute_operation_queue()
+        self.end_cycle_phase("operations")
+
+        if Config.BAG_LAZY_DECAY and self.memory.current_cycle_number % Config.BAG_DECAY_SWEEP_INTERVAL == 0:
+            self.memory.concepts_bag.sweep_decay()
+
+        if Config.MEMORY_HOT_CONCEPT_CAPACITY > 0 \
+                and self.memory.current_cycle_number % Config.COLD_CONCEPT_SWEEP_INTERVAL == 0:
+            self.memory.demote_cold_concepts()
+
+        if self.memory_journal is not None: self.memory_journal.on_working_cycle()
+        self.end_cycle_phase("maintenance")
 
         #todo self.temporal_module.process_anticipations()
 
@@ -246,6 +367,55 @@ class NARS:
                 Global.Global.print_to_output("SAVE MEMORY FAILURE")
         sys.setrecursionlimit(old_limit)
 
+    def start_memory_journal(self, directory="memory_journal"):
+        """
+            Start journaling the changes to the NARS Memory into a directory, in the background.
+            Unlike save_memory_to_disk, the working cycle continues while memory is saved.
+        """
+        if self.memory_journal is not None: self.memory_journal.close()
+        Global.Global.print_to_output("JOURNALING SYSTEM MEMORY TO DIRECTORY: " + directory)
+        self.memory_journal = NARSJournal.MemoryJournal(self.memory, directory)
+
+    def stop_memory_journal(self):
+        """
+            Write the last changes to the journal and stop journaling
+        """
+        if self.memory_journal is None: return
+        self.memory_journal.close()
+        self.memory_journal = None
+
+    def start_inference_pool(self, processes):
+        """
+            Collect the premise pairs of judgments' semantic inference during each working cycle,
+            and run them at the end of Consider in a pool of worker processes
+        """
+        self.stop_inference_pool()
+        self.inference_pool = NARSInferencePool.InferencePool(processes)
+        atexit.register(self.inference_pool.close)
+
+    def stop_inference_pool(self):
+        if self.inference_pool is None: return
+        for derived_sentence in self.inference_pool.run():
+            self.global_buffer.PUT_NEW(NARSDataStructures.Other.Task(derived_sentence))
+        self.inference_pool.close()
+        atexit.unregister(self.inference_pool.close)
+        self.inference_pool = None
+
+    def restore_memory_from_journal(self, directory="memory_journal"):
+        """
+            Restore the NARS Memory from its last checkpoint in a journal directory and the journal since then.
+            This will override the NARS' current memory, and continue journaling into the directory.
+        """
+        self.stop_memory_journal()
+        Global.Global.print_to_output("RESTORING SYSTEM MEMORY FROM DIRECTORY: " + directory)
+        try:
+            self.memory = NARSJournal.restore_memory(directory)
+            Global.Global.print_to_output("RESTORE MEMORY SUCCESS: " + str(len(self.memory)) + " CONCEPTS")
+        except (OSError, ValueError, KeyError) as error:
+            Global.Global.print_to_output("RESTORE MEMORY FAIL: " + str(error))
+            return
+        self.start_memory_journal(directory)
+
     def load_memory_from_disk(self, filename="memory1.nars"):
         """
             Load a NARS Memory instance from disk.
@@ -256,25 +426,46 @@ class NARS:
                 Global.Global.print_to_output("LOADING SYSTEM MEMORY FILE: " + filename)
                 # load memory from file
                 self.memory = pickle.load(f)
+                if self.memory_journal is not None: self.start_memory_journal(self.memory_journal.directory)
                 # Print memory contents to internal data GUI
-                if Config.GUI_USE_INTERFACE:
+                if Global.Global.is_gui_attached():
                     Global.Global.clear_output_gui(data_structure=self.memory.concepts_bag)
                     for item in self.memory.concepts_bag:
                         if item not in self.memory.concepts_bag:
                             Global.Global.print_to_output(msg=str(item), data_structure=self.memory.concepts_bag)
 
-                if Config.GUI_USE_INTERFACE:
+                if Global.Global.is_gui_attached():
                     NARSGUI.NARSGUI.gui_total_cycles_stringvar.set("Cycle #" + str(self.memory.current_cycle_number))
 
                 Global.Global.print_to_output("LOAD MEMORY SUCCESS")
         except:
             Global.Global.print_to_output("LOAD MEMORY FAIL")
 
+    def publish_concepts_snapshot(self):
+        """
+            Every GUI_SNAPSHOT_INTERVAL working cycles, write the concepts bag into shared memory
+            and tell the GUI to redraw it from there
+        """
+        cycle = self.memory.current_cycle_number
+        if self.last_snapshot_cycle is not None and 0 <= cycle - self.last_snapshot_cycle < Config.GUI_SNAPSHOT_INTERVAL: return
+        self.last_snapshot_cycle = cycle
+
+        if self.concepts_snapshot_writer is None:
+            self.concepts_snapshot_writer = NARSDataStructures.BagSnapshot.BagSnapshotWriter()
+            atexit.register(self.concepts_snapshot_writer.close)
+
+        concepts_bag = self.memory.concepts_bag
+        snapshot_name = self.concepts_snapshot_writer.publish(concepts_bag)
+        Global.Global.NARS_string_pipe.send(("snapshot", snapshot_name,
+                                             (str(concepts_bag), type(concepts_bag).__name__), len(concepts_bag)))
+
     def handle_gui_pipes(self):
         if Global.Global.NARS_object_pipe is None: return
 
         # GUI
         Global.Global.NARS_string_pipe.send(("cycles", "Cycle #" + str(self.memory.current_cycle_number), None, 0))
+        Global.Global.flush_gui_updates()
+        if Config.GUI_SNAPSHOT_INTERVAL > 0: self.publish_concepts_snapshot()
 
 
         while Global.Global.NARS_object_pipe.poll():
@@ -365,6 +556,9 @@ class NARS:
         task_statement_term = j.statement
         if task_statement_term.contains_variable(): return  # todo handle variables
 
+        metrics = Global.Global.metrics
+        if metrics is not None: begin_time = timeit.default_timer()
+
         # statement_concept_item = self.memory.peek_concept_item(task_statement_term)
         # statement_concept = statement_concept_item.object
 
@@ -377,6 +571,9 @@ class NARS:
         elif isinstance(j, NALGrammar.Sentences.Goal):
             self.process_goal_task(task)
 
+        if metrics is not None:
+            metrics.observe("nars_task_seconds", timeit.default_timer() - begin_time,
+                            {"punctuation": j.punctuation.value})
 
         #     if not task.sentence.is_event():
         #         statement_concept_item.budget.set_quality(0.99)
@@ -400,7 +597,7 @@ class NARS:
         j = task.sentence
         if j.is_event():
             # only put non-derived atomic events in temporal module for now
-            Global.Global.NARS.temporal_module.PUT_NEW(task)
+            self.temporal_module.PUT_NEW(task)
 
         if isinstance(j.statement, NALGrammar.Terms.CompoundTerm)\
             and j.statement.connector == NALSyntax.TermConnector.Negation:
@@ -430,8 +627,8 @@ class NARS:
 
         if Config.DEBUG:
             string = "Integrated new BELIEF Task: " + j.get_formatted_string() + "from "
-            for premise in j.stamp.parent_premises:
-                string += str(premise) + ","
+            for premise_string in j.stamp.get_evidence_strings(j.stamp.parent_premise_ids):
+                string += premise_string + ","
             Global.Global.debug_print(string)
 
 
@@ -449,9 +646,8 @@ class NARS:
         statement_term = j1.statement
 
         # do regular semantic inference
-        results = self.process_sentence_semantic_inference(j1)
-        for result in results:
-            self.global_buffer.PUT_NEW(NARSDataStructures.Other.Task(result))
+        for (premise, related_premise) in self.get_semantic_inference_premise_pairs(j1):
+            self.process_premise_pair(premise, related_premise)
 
 
     def process_question_task(self, task):
@@ -520,8 +716,8 @@ class NARS:
 
         if Config.DEBUG:
             string = "Integrated new GOAL Task: " + j.get_formatted_string() + "from "
-            for premise in j.stamp.parent_premises:
-                string += str(premise) + ","
+            for premise_string in j.stamp.get_evidence_strings(j.stamp.parent_premise_ids):
+                string += premise_string + ","
             Global.Global.debug_print(string)
 
 
@@ -576,13 +772,11 @@ class NARS:
                 if NALSyntax.TermConnector.is_conjunction(statement.connector):
                     # if it's a conjunction (A &/ B), simplify using true beliefs (e.g. A)
                     subterm = statement.subterms[0]
-                    subterm_concept = Global.Global.NARS.memory.peek_concept(subterm)
+                    subterm_concept = self.memory.peek_concept(subterm)
                     belief = subterm_concept.belief_table.peek()
                     if belief is not None and belief.is_positive():
                         # the first component of the goal is positive, do inference and derive the remaining goal component
-                        results = NARSInferenceEngine.do_semantic_inference_two_premise(j, belief)
-                        for result in results:
-                            self.global_buffer.PUT_NEW(NARSDataStructures.Other.Task(result))
+                        self.process_premise_pair(j, belief)
                         return # done deriving goals
                     else:
                         if Config.DEBUG: Global.Global.debug_print(str(subterm_concept.term) + " was not positive to split conjunction.")
@@ -594,13 +788,11 @@ class NARS:
                     # :- (--,(A &/ B)) && A ==> D :- (--,B) ==> D :- (--,B)!
                     conjunction = statement.subterms[0]
                     subterm = conjunction.subterms[0]
-                    subterm_concept = Global.Global.NARS.memory.peek_concept(subterm)
+                    subterm_concept = self.memory.peek_concept(subterm)
                     belief = subterm_concept.belief_table.peek()
                     if belief is not None and belief.is_positive():
                         # the first component of the goal is negative, do inference and derive the remaining goal component
-                        results = NARSInferenceEngine.do_semantic_inference_two_premise(j, belief)
-                        for result in results:
-                            self.global_buffer.PUT_NEW(NARSDataStructures.Other.Task(result))
+                        self.process_premise_pair(j, belief)
 
                         return # done deriving goals
 
@@ -637,6 +829,21 @@ class NARS:
             #     if Config.DEBUG: Global.Global.debug_print("No contextual explanations for " + str(j))
 
 
+    def process_premise_pair(self, j1, j2):
+        """
+            Do two-premise inference, and put the derived sentences into the global buffer.
+            With an inference pool, the pair is run later in the cycle, with the other premise pairs.
+
+            :param j1 - sentence being processed
+            :param j2 - related premise
+        """
+        if self.inference_pool is not None:
+            self.inference_pool.add_premise_pair(j1, j2)
+            return
+
+        for result in NARSInferenceEngine.do_semantic_inference_two_premise(j1, j2):
+            self.global_buffer.PUT_NEW(NARSDataStructures.Other.Task(result))
+
     def process_sentence_semantic_inference(self, j1, related_concept=None):
         """
             Processes a Sentence with a belief from a related concept.
@@ -647,6 +854,19 @@ class NARS:
             #todo handle variables
         """
         results = []
+        for (premise, related_premise) in self.get_semantic_inference_premise_pairs(j1, related_concept):
+            results += NARSInferenceEngine.do_semantic_inference_two_premise(premise, related_premise)
+        return results
+
+    def get_semantic_inference_premise_pairs(self, j1, related_concept=None):
+        """
+            Picks the premises to process a Sentence with: a belief and a goal from a related concept.
+
+            :param j1 - sentence to process
+            :param related_concept - (Optional) concept from which to fetch the premises
+            :return list of (j1, related premise) pairs
+        """
+        premise_pairs = []
         if Config.DEBUG: Global.Global.debug_print("Processing: " + j1.get_formatted_string())
         statement_term = j1.statement
         # get (or create if necessary) statement concept, and sub-term concepts recursively
@@ -673,7 +893,7 @@ class NARS:
             else:
                 related_concept = self.memory.get_semantically_related_concept(statement_concept)
 
-            if related_concept is None: return results
+            if related_concept is None: return premise_pairs
         else:
             Global.Global.debug_print("Processing: Using related concept " + str(related_concept))
 
@@ -683,20 +903,20 @@ class NARS:
 
         if j2 is None:
             if Config.DEBUG: Global.Global.debug_print('No related beliefs found for ' + j1.get_formatted_string())
-            return results  # done if can't interact
+            return premise_pairs  # done if can't interact
 
-        results = NARSInferenceEngine.do_semantic_inference_two_premise(j1, j2)
+        premise_pairs.append((j1, j2))
 
         # check for a belief we can interact with
         j2 = related_concept.desire_table.peek_random()
 
         if j2 is None:
             if Config.DEBUG: Global.Global.debug_print('No related goals found for ' + j1.get_formatted_string())
-            return results # done if can't interact
+            return premise_pairs # done if can't interact
 
-        results += NARSInferenceEngine.do_semantic_inference_two_premise(j1, j2)
+        premise_pairs.append((j1, j2))
 
-        return results
+        return premise_pairs
 
     """
         OPERATIONS
@@ -725,10 +945,8 @@ class NARS:
 
         if Config.DEBUG: Global.Global.debug_print("Queueing operation: " + str(operation_goal))
 
-        parent_strings = []
         # create an anticipation if this goal was based on a higher-order implication
-        for parent in operation_goal.stamp.parent_premises:
-            parent_strings.append(str(parent))
+        parent_strings = operation_goal.stamp.get_evidence_strings(operation_goal.stamp.parent_premise_ids)
 
         # insert operation into queue to be execute after the interval
         # intervals of zero will result in immediate execution (assuming the queue is processed afterwards and in the same cycle as this function)
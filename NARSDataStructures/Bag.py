@@ -6,9 +6,8 @@
 import math
 import random
 
-import sortedcontainers
-
 import Config
+import Global
 import NARSDataStructures.ItemContainers
 
 import NARSDataStructures.Other
@@ -23,16 +22,32 @@ class Bag(NARSDataStructures.ItemContainers.ItemContainer):
 
         An array of buckets, where each bucket holds items of a certain priority
         (e.g. 100 buckets, bucket 1 - hold items with 0.01 priority,  bucket 50 - hold items with 0.50 priority)
+
+        Only non-empty buckets are stored; the bucket indexes track which levels are occupied.
+
+        With lazy decay, decaying an item only changes its Budget, and the bag's decay clock decays every item at once.
+        An item is moved to the bucket for its decayed priority when it is next sampled, or by a sweep.
+        The decay clock is either the bag's own, moved by advance_decay_clock,
+        or a clock function shared by many bags (memory's bags use the working cycle number).
     """
 
-    def __init__(self, item_type, capacity, granularity=Config.BAG_GRANULARITY):
+    def __init__(self, item_type, capacity, granularity=Config.BAG_GRANULARITY, lazy_decay=False, decay_rate=1.0,
+                 clock=None):
+        """
+            :param lazy_decay: defer moving decayed items between buckets
+            :param decay_rate: priority multiplier per tick of the decay clock, for new items (lazy decay only)
+            :param clock: function returning the decay clock time, or None for the bag's own clock (lazy decay only)
+        """
         self.level = 0
-        self.priority_buckets = {}
+        self.lazy_decay = lazy_decay
+        self.decay_rate = decay_rate if lazy_decay else 1.0
+        self.clock = clock if lazy_decay else None
+        self.own_decay_clock = 0
+        self.priority_buckets = {} # non-empty buckets only, by level
         self.quality_buckets = {} # store by inverted quality for deletion
         self.granularity = granularity
-        for i in range(granularity):
-            self.priority_buckets[i] = None
-            self.quality_buckets[i] = None
+        self.priority_bucket_index = BucketSamplingIndex(granularity)
+        self.quality_bucket_index = BucketSamplingIndex(granularity)
         NARSDataStructures.ItemContainers.ItemContainer.__init__(self, item_type=item_type, capacity=capacity)
 
     def __len__(self):
@@ -43,9 +58,11 @@ class Bag(NARSDataStructures.ItemContainers.ItemContainer):
 
     def clear(self):
         self.level = 0
-        for i in range(self.granularity):
-            self.priority_buckets[i] = None
-            self.quality_buckets[i] = None
+        self.own_decay_clock = 0
+        self.priority_buckets = {}
+        self.quality_buckets = {}
+        self.priority_bucket_index.clear()
+        self.quality_bucket_index.clear()
         NARSDataStructures.ItemContainers.ItemContainer._clear(self)
 
     def PUT_NEW(self, object):
@@ -60,9 +77,12 @@ class Bag(NARSDataStructures.ItemContainers.ItemContainer):
         # remove lowest priority item if over capacity
         if len(self) == self.capacity:
             purged_item = self._TAKE_MIN()
+            if Global.Global.metrics is not None: self.record_operation("purge")
 
         # add new item
         item = NARSDataStructures.ItemContainers.ItemContainer.PUT_NEW(self, object)
+        item.budget.decay_rate = self.decay_rate
+        item.budget.decay_timestamp = self.decay_clock
         self.add_item_to_bucket(item)
         self.add_item_to_quality_bucket(item)
 
@@ -78,7 +98,14 @@ class Bag(NARSDataStructures.ItemContainers.ItemContainer):
         if len(self) == 0: return None  # no items
 
         if key is None:
-            item = self._peek_probabilistically(buckets=self.priority_buckets)
+            if Global.Global.metrics is not None: self.record_operation("sample")
+            item = self._peek_probabilistically(buckets=self.priority_buckets,
+                                               bucket_index=self.priority_bucket_index)
+            if self.lazy_decay:
+                while self.refresh_item_priority(item):
+                    # the item had decayed out of the bucket it was sampled from; sample again
+                    item = self._peek_probabilistically(buckets=self.priority_buckets,
+                                                       bucket_index=self.priority_bucket_index)
         else:
             item = NARSDataStructures.ItemContainers.ItemContainer.peek_using_key(self, key=key)
 
@@ -96,6 +123,8 @@ class Bag(NARSDataStructures.ItemContainers.ItemContainer):
 
         # change item priority attribute, and GUI if necessary
         item.budget.set_priority(new_priority)
+        item.budget.decay_timestamp = self.decay_clock
+        if self.changed_keys is not None: self.changed_keys.add(item.key)
 
         # if Config.GUI_USE_INTERFACE:
         #     NARSDataStructures.ItemContainers.ItemContainer._take_from_lookup_dict(self, key)
@@ -112,6 +141,7 @@ class Bag(NARSDataStructures.ItemContainers.ItemContainer):
 
         # change item quality
         item.budget.set_quality(new_quality)
+        if self.changed_keys is not None: self.changed_keys.add(item.key)
 
         # if Config.GUI_USE_INTERFACE:
         #     NARSDataStructures.ItemContainers.ItemContainer._take_from_lookup_dict(self, key)
@@ -124,36 +154,53 @@ class Bag(NARSDataStructures.ItemContainers.ItemContainer):
     def add_item_to_bucket(self,item):
         # add to appropriate bucket
         bucket_num = self.calc_bucket_num_from_value(item.budget.get_priority())
-        if self.priority_buckets[bucket_num] is None:
-            self.priority_buckets[bucket_num] = sortedcontainers.SortedList()
-        bucket = self.priority_buckets[bucket_num]
-        bucket.add((id(item),item)) # convert to ID so
+        bucket = self.priority_buckets.get(bucket_num, None)
+        if bucket is None:
+            bucket = []
+            self.priority_buckets[bucket_num] = bucket
+            self.priority_bucket_index.set_occupied(bucket_num)
         item.bucket_num = bucket_num
+        item.bucket_slot = len(bucket)
+        bucket.append(item)
 
 
     def remove_item_from_its_bucket(self, item):
-        # take from bucket
+        # take from bucket, moving the last item of the bucket into the vacated slot
         bucket = self.priority_buckets[item.bucket_num]
-        bucket.remove((id(item),item))
+        last_item = bucket.pop()
+        if last_item is not item:
+            bucket[item.bucket_slot] = last_item
+            last_item.bucket_slot = item.bucket_slot
         if len(bucket) == 0:
-            self.priority_buckets[item.bucket_num] = None
+            del self.priority_buckets[item.bucket_num]
+            self.priority_bucket_index.set_empty(item.bucket_num)
         item.bucket_num = None
+        item.bucket_slot = None
 
     def add_item_to_quality_bucket(self, item):
         # add to appropriate bucket
         bucket_num = self.calc_bucket_num_from_value(1-item.budget.get_quality()) # higher quality should have lower probability of being selected for deletion
-        if self.quality_buckets[bucket_num] is None: self.quality_buckets[bucket_num] = sortedcontainers.SortedList()
-        bucket = self.quality_buckets[bucket_num]
-        bucket.add((id(item),item))
+        bucket = self.quality_buckets.get(bucket_num, None)
+        if bucket is None:
+            bucket = []
+            self.quality_buckets[bucket_num] = bucket
+            self.quality_bucket_index.set_occupied(bucket_num)
         item.quality_bucket_num = bucket_num
+        item.quality_bucket_slot = len(bucket)
+        bucket.append(item)
 
     def remove_item_from_its_quality_bucket(self, item):
-        # take from bucket
+        # take from bucket, moving the last item of the bucket into the vacated slot
         bucket = self.quality_buckets[item.quality_bucket_num]
-        bucket.remove((id(item),item))
+        last_item = bucket.pop()
+        if last_item is not item:
+            bucket[item.quality_bucket_slot] = last_item
+            last_item.quality_bucket_slot = item.quality_bucket_slot
         if len(bucket) == 0:
-            self.quality_buckets[item.quality_bucket_num] = None
+            del self.quality_buckets[item.quality_bucket_num]
+            self.quality_bucket_index.set_empty(item.quality_bucket_num)
         item.quality_bucket_num = None
+        item.quality_bucket_slot = None
 
     def strengthen_item_priority(self, key, multiplier=Config.PRIORITY_STRENGTHEN_VALUE):
         """
@@ -162,6 +209,7 @@ class Bag(NARSDataStructures.ItemContainers.ItemContainer):
         :return:
         """
         item = self.peek_using_key(key)
+        item.budget.apply_decay(self.decay_clock)
         # change item priority attribute, and GUI if necessary
         new_priority = NALInferenceRules.ExtendedBooleanOperators.bor(item.budget.get_priority(), multiplier)
         self.change_priority(key, new_priority=new_priority)
@@ -187,8 +235,49 @@ class Bag(NARSDataStructures.ItemContainers.ItemContainer):
         :return:
         """
         item = self.peek_using_key(key)
+        item.budget.apply_decay(self.decay_clock)
         new_priority = NALInferenceRules.ExtendedBooleanOperators.band(item.budget.get_priority(), multiplier)
-        self.change_priority(key, new_priority=new_priority)
+        if self.lazy_decay:
+            # leave the item in its bucket until it is sampled or swept
+            item.budget.set_priority(new_priority)
+            if self.changed_keys is not None: self.changed_keys.add(item.key)
+        else:
+            self.change_priority(key, new_priority=new_priority)
+
+    @property
+    def decay_clock(self):
+        if self.clock is None: return self.own_decay_clock
+        return self.clock()
+
+    def advance_decay_clock(self, ticks=1):
+        """
+            Decays every item in the bag by its decay rate, once per tick.
+            Only the clock changes here; items catch up when they are sampled or swept.
+        """
+        assert self.clock is None, "ERROR: This bag's decay clock is driven by its clock function"
+        self.own_decay_clock += ticks
+
+    def refresh_item_priority(self, item):
+        """
+            Brings an item's priority up to date with the decay clock,
+            and moves it to the bucket for that priority.
+
+        :param item: item in this bag
+        :return: True if the item changed buckets; False otherwise
+        """
+        item.budget.apply_decay(self.decay_clock)
+        bucket_num = self.calc_bucket_num_from_value(item.budget.get_priority())
+        if bucket_num == item.bucket_num: return False
+        self.remove_item_from_its_bucket(item=item)
+        self.add_item_to_bucket(item=item)
+        return True
+
+    def sweep_decay(self):
+        """
+            Moves every lazily decayed item to the bucket for its current priority
+        """
+        for item in self.item_lookup_dict.values():
+            self.refresh_item_priority(item)
 
     def TAKE_USING_KEY(self, key):
         """
@@ -209,7 +298,8 @@ class Bag(NARSDataStructures.ItemContainers.ItemContainer):
             :returns the lowest quality item taken from the Bag
         """
         try:
-            item = self._peek_probabilistically(buckets=self.quality_buckets)
+            item = self._peek_probabilistically(buckets=self.quality_buckets,
+                                               bucket_index=self.quality_bucket_index)
             assert (item.key in self.item_lookup_dict), "Given key does not exist in this bag"
             item = NARSDataStructures.ItemContainers.ItemContainer._take_from_lookup_dict(self, item.key)
             self.remove_item_from_its_bucket(item=item)
@@ -219,34 +309,140 @@ class Bag(NARSDataStructures.ItemContainers.ItemContainer):
         return item
 
 
-    def _peek_probabilistically(self, buckets):
+    def _peek_probabilistically(self, buckets, bucket_index):
         """
             Probabilistically selects a priority value / bucket, then peeks an item from that bucket.
 
-            :returns (item, index of item in the current bucket)
+            The bucket is chosen as if walking the buckets from a random starting level,
+            entering each non-empty bucket with probability (level + 1) / granularity;
+            the walk itself is resolved by the bucket index in O(log granularity).
+
+            :returns an item peeked from the selected bucket
         """
         if len(self) == 0: return None, None
-        self.level = random.randint(0, self.granularity - 1)
-        while True:
-            level_bucket = buckets[self.level]
-            if level_bucket is None or len(level_bucket) == 0:
-                self.level = (self.level + 1) % self.granularity
-                continue
-
-            # try to go into bucket
-            rnd = random.randint(0, self.granularity - 1)
-
-            threshold = self.level
-            if rnd <= threshold:
-                # use this bucket
-                break
-            else:
-                self.level = (self.level + 1) % self.granularity
+        self.level = bucket_index.sample_level()
 
+        level_bucket = buckets[self.level]
         rnd_idx = random.randint(0,len(level_bucket)-1)
-        _, item = level_bucket[rnd_idx]
+        item = level_bucket[rnd_idx]
 
         return item
 
     def calc_bucket_num_from_value(self, val):
-        return min(math.floor(val * self.granularity), self.granularity - 1)
\ No newline at end of file
+        return min(math.floor(val * self.granularity), self.granularity - 1)
+
+
+class BucketSamplingIndex:
+    """
+        Fenwick tree over the non-empty buckets of a Bag, used to select a bucket level in O(log granularity).
+
+        --------------------------------------------
+
+        A Bag walks its buckets cyclically from a random level, entering non-empty bucket `level`
+        with probability p = (level + 1) / granularity.
+        The walk stops at the first bucket where the survival product of (1 - p) drops below a uniform draw U,
+        which is the first bucket where the running sum of -ln(1 - p) exceeds -ln(U).
+        The tree holds those weights (in fixed point, so repeated updates never drift) for the occupied levels,
+        so the stopping bucket is found with a single prefix-sum descent instead of a step-by-step walk.
+
+        The top level always accepts (p = 1), so it is tracked separately from the tree.
+        Every other level has a positive weight, so a level is occupied exactly when its weight is in the tree.
+        The number of occupied levels is counted, so bags with a single live level skip the walk,
+        and the tree itself is only allocated once a level below the top is used.
+    """
+    WEIGHT_SCALE = 2 ** 32  # fixed-point units per unit of -ln(1 - p)
+    level_weights_by_granularity = {}  # the weights depend only on granularity, so bags share them
+
+    def __init__(self, granularity):
+        self.granularity = granularity
+        self.size = granularity - 1  # levels stored in the tree; the top level is kept out of it
+        if granularity not in BucketSamplingIndex.level_weights_by_granularity:
+            BucketSamplingIndex.level_weights_by_granularity[granularity] = \
+                [round(-math.log(1.0 - (level + 1) / granularity) * self.WEIGHT_SCALE) for level in range(self.size)]
+        self.level_weights = BucketSamplingIndex.level_weights_by_granularity[granularity]
+        self.clear()
+
+    def clear(self):
+        self.tree = None  # 1-indexed Fenwick tree, allocated on first use
+        self.total_weight = 0
+        self.occupied_level_count = 0
+        self.top_level_occupied = False
+
+    def set_occupied(self, level):
+        self.occupied_level_count += 1
+        if level == self.size:
+            self.top_level_occupied = True
+        else:
+            self._add(level, self.level_weights[level])
+
+    def set_empty(self, level):
+        self.occupied_level_count -= 1
+        if level == self.size:
+            self.top_level_occupied = False
+        else:
+            self._add(level, -self.level_weights[level])
+
+    def _add(self, level, delta):
+        if self.tree is None: self.tree = [0] * (self.size + 1)
+        self.total_weight += delta
+        i = level + 1
+        while i <= self.size:
+            self.tree[i] += delta
+            i += i & -i
+
+    def _prefix_weight(self, level):
+        """
+            :returns the summed weight of all levels below the given level
+        """
+        total = 0
+        i = min(level, self.size)
+        while i > 0:
+            total += self.tree[i]
+            i -= i & -i
+        return total
+
+    def _find_level(self, target):
+        """
+            :returns the lowest level whose inclusive prefix weight exceeds target
+        """
+        level = 0
+        step = 1 << self.size.bit_length()
+        while step > 0:
+            candidate = level + step
+            if candidate <= self.size and self.tree[candidate] <= target:
+                level = candidate
+                target -= self.tree[candidate]
+            step >>= 1
+        return level
+
+    def sample_level(self):
+        """
+            Selects a non-empty bucket level with the same distribution as walking the buckets.
+            The index must have at least one occupied level.
+
+            :returns the selected level
+        """
+        if self.occupied_level_count == 1:
+            # a single live level; every walk ends there
+            return self.size if self.top_level_occupied else self._find_level(0)
+
+        # one uniform draw; its integer part picks the starting level,
+        # and its fractional part is an independent uniform used for the acceptance test
+        rnd = random.random() * self.granularity
+        start_level = int(rnd)
+        target = int(-math.log(1.0 - (rnd - start_level)) * self.WEIGHT_SCALE)
+
+        top_level_occupied = self.top_level_occupied
+        if start_level == self.size and top_level_occupied: return self.size
+
+        weight_before_start = self._prefix_weight(start_level)
+        weight_after_start = self.total_weight - weight_before_start
+        if target < weight_after_start:
+            # stopped before wrapping around
+            return self._find_level(weight_before_start + target)
+
+        if top_level_occupied: return self.size
+
+        # wrapped around; each full lap over the buckets adds the total weight
+        target = (target - weight_after_start) % self.total_weight
+        return self._find_level(target)
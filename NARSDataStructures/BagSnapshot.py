@@ -0,0 +1,202 @@
+import multiprocessing.shared_memory
+
+import numpy as np
+
+import NARSMemory
+
+"""
+    Author: Christian Hahm
+    Created: October 18, 2026
+    Purpose: Publishes a compact snapshot of a Bag's contents in shared memory,
+        so another process (the GUI) can read it without the items being sent over a pipe.
+"""
+
+"""
+    Block layout (all little-endian, 8-byte aligned):
+        header: int64[HEADER_LENGTH] = [version, sequence, count, string table length]
+        item IDs: int64[count]
+        string offsets: int64[count + 1], string i is string_table[offsets[i]:offsets[i+1]]
+        priorities: float32[count]
+        qualities: float32[count]
+        expectations: float32[count], NaN for items that are not Concepts or have no beliefs
+        string table: UTF-8 bytes of the item keys
+"""
+VERSION = 1
+HEADER_LENGTH = 4
+HEADER_VERSION, HEADER_SEQUENCE, HEADER_COUNT, HEADER_STRING_TABLE_LENGTH = range(HEADER_LENGTH)
+INT_DTYPE = np.dtype("<i8")
+FLOAT_DTYPE = np.dtype("<f4")
+MIN_BLOCK_SIZE = 4096
+
+
+def align(size):
+    return (size + 7) & ~7
+
+
+def get_block_size(count, string_table_length):
+    return align(INT_DTYPE.itemsize * (HEADER_LENGTH + count + count + 1)
+                 + 3 * align(FLOAT_DTYPE.itemsize * count)) + string_table_length
+
+
+def get_array_views(buffer, count):
+    """
+        :return: numpy views of the item IDs, string offsets, priorities, qualities and expectations in the buffer,
+            and the offset where the string table starts
+    """
+    offset = INT_DTYPE.itemsize * HEADER_LENGTH
+    item_ids = np.ndarray((count,), dtype=INT_DTYPE, buffer=buffer, offset=offset)
+    offset += INT_DTYPE.itemsize * count
+    string_offsets = np.ndarray((count + 1,), dtype=INT_DTYPE, buffer=buffer, offset=offset)
+    offset += INT_DTYPE.itemsize * (count + 1)
+    float_arrays = []
+    for _ in range(3):
+        float_arrays.append(np.ndarray((count,), dtype=FLOAT_DTYPE, buffer=buffer, offset=offset))
+        offset += align(FLOAT_DTYPE.itemsize * count)
+    priorities, qualities, expectations = float_arrays
+    return item_ids, string_offsets, priorities, qualities, expectations, align(offset)
+
+
+class BagSnapshotWriter:
+    """
+        Owns a shared memory block and overwrites it with the contents of a Bag on each publish().
+
+        The header sequence number is odd while a publish is in progress and even once it is done (a seqlock),
+        so readers can detect a snapshot that changed while they read it.
+        A larger block (with a new name) is created when the bag outgrows the current one.
+    """
+
+    def __init__(self):
+        self.shared_memory = None
+        self.sequence = 0
+
+    def get_name(self):
+        return None if self.shared_memory is None else self.shared_memory.name
+
+    def publish(self, bag):
+        """
+            Write the Bag's items into the shared memory block, with their priorities decayed to the bag's decay clock time.
+
+            :param bag: Bag to snapshot
+            :return: name of the shared memory block holding the snapshot
+        """
+        items = list(bag)
+        keys = [str(item.key).encode("utf-8") for item in items]
+        string_offsets = np.zeros(len(items) + 1, dtype=INT_DTYPE)
+        np.cumsum([len(key) for key in keys], out=string_offsets[1:])
+        string_table = b"".join(keys)
+
+        block_size = get_block_size(len(items), len(string_table))
+        if self.shared_memory is None or self.shared_memory.size < block_size:
+            self.reallocate(block_size)
+
+        header = np.ndarray((HEADER_LENGTH,), dtype=INT_DTYPE, buffer=self.shared_memory.buf)
+        self.sequence += 1
+        header[HEADER_SEQUENCE] = self.sequence  # odd: write in progress
+
+        item_ids, offsets_view, priorities, qualities, expectations, string_table_start = \
+            get_array_views(self.shared_memory.buf, len(items))
+        item_ids[:] = [item.id for item in items]
+        offsets_view[:] = string_offsets
+        decay_clock = bag.decay_clock
+        priorities[:] = [item.budget.get_decayed_priority(decay_clock) for item in items]
+        qualities[:] = [item.budget.get_quality() for item in items]
+        expectations[:] = [BagSnapshotWriter.get_expectation(item) for item in items]
+        self.shared_memory.buf[string_table_start:string_table_start + len(string_table)] = string_table
+
+        header[HEADER_VERSION] = VERSION
+        header[HEADER_COUNT] = len(items)
+        header[HEADER_STRING_TABLE_LENGTH] = len(string_table)
+        self.sequence += 1
+        header[HEADER_SEQUENCE] = self.sequence  # even: write done
+
+        del header, item_ids, offsets_view, priorities, qualities, expectations  # release the buffer exports
+        return self.shared_memory.name
+
+    @classmethod
+    def get_expectation(cls, item):
+        if not isinstance(item.object, NARSMemory.Concept): return np.nan
+        if item.object.is_cold(): return np.nan  # reading its beliefs would load the concept back into RAM
+        expectation = item.object.get_expectation()
+        return np.nan if expectation is None else expectation
+
+    def reallocate(self, block_size):
+        self.close()
+        self.shared_memory = multiprocessing.shared_memory.SharedMemory(create=True,
+                                                                        size=max(MIN_BLOCK_SIZE, 2 * block_size))
+
+    def close(self):
+        """
+            Free the shared memory block. Readers attached to it keep their mapping until they close it.
+        """
+        if self.shared_memory is None: return
+        self.shared_memory.close()
+        self.shared_memory.unlink()
+        self.shared_memory = None
+
+
+class BagSnapshot:
+    """
+        Read-only view of a published snapshot. The arrays are numpy views into the shared memory block (no copies).
+    """
+
+    def __init__(self, reader, sequence, buffer, count, string_table_length):
+        self.reader = reader
+        self.sequence = sequence
+        self.item_ids, self.string_offsets, self.priorities, self.qualities, self.expectations, string_table_start = \
+            get_array_views(buffer, count)
+        self.string_table = buffer[string_table_start:string_table_start + string_table_length]
+
+    def __len__(self):
+        return len(self.item_ids)
+
+    def get_key(self, i):
+        return bytes(self.string_table[self.string_offsets[i]:self.string_offsets[i + 1]]).decode("utf-8")
+
+    def is_valid(self):
+        """
+            :return: Was the snapshot left unchanged by the writer since it was read?
+                Check this after using the arrays, since the writer does not wait for readers.
+        """
+        return self.reader.get_sequence() == self.sequence
+
+    def release(self):
+        """
+            Drop the views into the shared memory, so the reader can close it
+        """
+        self.item_ids = self.string_offsets = self.priorities = self.qualities = self.expectations = None
+        if self.string_table is not None: self.string_table.release()
+        self.string_table = None
+
+
+class BagSnapshotReader:
+    """
+        Attaches to the shared memory block published by a BagSnapshotWriter, possibly in another process.
+    """
+
+    def __init__(self, name):
+        self.shared_memory = multiprocessing.shared_memory.SharedMemory(name=name)
+        self.header = np.ndarray((HEADER_LENGTH,), dtype=INT_DTYPE, buffer=self.shared_memory.buf)
+
+    def get_name(self):
+        return self.shared_memory.name
+
+    def get_sequence(self):
+        return int(self.header[HEADER_SEQUENCE])
+
+    def read(self):
+        """
+            :return: BagSnapshot of the latest published contents,
+                or None if nothing was published yet or a publish is in progress
+        """
+        sequence = self.get_sequence()
+        if sequence == 0 or sequence % 2 == 1: return None
+        assert self.header[HEADER_VERSION] == VERSION, "ERROR: Unknown bag snapshot version " + str(self.header[HEADER_VERSION])
+        return BagSnapshot(self, sequence, self.shared_memory.buf,
+                           int(self.header[HEADER_COUNT]), int(self.header[HEADER_STRING_TABLE_LENGTH]))
+
+    def close(self):
+        """
+            Detach from the block. Every BagSnapshot read from it must be released first.
+        """
+        self.header = None
+        self.shared_memory.close()
@@ -45,6 +45,7 @@ class Buffer(ItemContainer, Depq):
         if len(self) > self.capacity:
             purged_item = self.extract_min()
             self._take_from_lookup_dict(purged_item.key)
+            if Global.Global.metrics is not None: self.record_operation("purge")
 
         return purged_item
 
@@ -114,45 +115,37 @@ class SpatialBuffer():
         #     + str(event_array.shape) + " and " + str(self.dimensions)
 
         self.array = np.array(original_event_array)
-        self.components_bag.clear()
-
-        maximum = 0
-        for indices, sentence in np.ndenumerate(self.array):
-            if sentence.value.frequency > Config.POSITIVE_THRESHOLD \
-                    and not (isinstance(sentence.statement,
-                                        NALGrammar.Terms.CompoundTerm) and sentence.statement.connector == NALSyntax.TermConnector.Negation):
-                maximum = max(maximum, sentence.value.frequency * sentence.value.confidence)
-
-        for indices, sentence in np.ndenumerate(self.array):
-            if sentence.value.frequency > Config.POSITIVE_THRESHOLD \
-                and not (isinstance(sentence.statement,NALGrammar.Terms.CompoundTerm) and sentence.statement.connector == NALSyntax.TermConnector.Negation):
-                priority = sentence.value.frequency * sentence.value.confidence / maximum
-                object = indices
-                self.components_bag.PUT_NEW(object)
-                self.components_bag.change_priority(Item.get_key_from_object(object), priority)
-
-
+        self.set_components_bag_priorities(self.components_bag, self.array)
 
         # pooled
         self.pooled_array = self.create_pooled_sensation_array(original_event_array, stride=2)
         #self.pooled_array = self.create_pooled_sensation_array(self.pooled_array , stride=2)
-        self.pooled_components_bag.clear()
-
-        maximum = 0
-        for indices, sentence in np.ndenumerate(self.pooled_array):
-            if sentence.value.frequency > Config.POSITIVE_THRESHOLD \
-                    and not (isinstance(sentence.statement,
-                                        NALGrammar.Terms.CompoundTerm) and sentence.statement.connector == NALSyntax.TermConnector.Negation):
-                maximum = max(maximum, sentence.value.frequency * sentence.value.confidence)
-
-        for indices, sentence in np.ndenumerate(self.pooled_array):
-            if sentence.value.frequency > Config.POSITIVE_THRESHOLD \
-                    and not (isinstance(sentence.statement,
-                                        NALGrammar.Terms.CompoundTerm) and sentence.statement.connector == NALSyntax.TermConnector.Negation):
-                priority = sentence.value.frequency * sentence.value.confidence / maximum
-                object = indices
-                self.pooled_components_bag.PUT_NEW(object)
-                self.pooled_components_bag.change_priority(Item.get_key_from_object(object), priority)
+        self.set_components_bag_priorities(self.pooled_components_bag, self.pooled_array)
+
+    def set_components_bag_priorities(self, bag, array):
+        """
+            Refill a components bag with the indices of the positive events in an array,
+            prioritized by frequency * confidence relative to the strongest positive event.
+        """
+        bag.clear()
+
+        sentences = array.ravel()
+        truth_values = np.empty(shape=sentences.shape, dtype=NALGrammar.Values.TruthValue)
+        truth_values[:] = [sentence.value for sentence in sentences]
+        frequencies, confidences = NALInferenceRules.TruthValueFunctions.get_truth_value_arrays(truth_values)
+        is_negated = np.array([isinstance(sentence.statement, NALGrammar.Terms.CompoundTerm)
+                               and sentence.statement.connector == NALSyntax.TermConnector.Negation
+                               for sentence in sentences], dtype=bool)
+        frequencies, confidences = frequencies.reshape(array.shape), confidences.reshape(array.shape)
+        is_positive = (frequencies > Config.POSITIVE_THRESHOLD) & ~is_negated.reshape(array.shape)
+        if not np.any(is_positive): return
+
+        strengths = NALInferenceRules.ExtendedBooleanOperators.band(frequencies, confidences)
+        priorities = strengths / np.max(strengths[is_positive])
+        for indices in zip(*np.nonzero(is_positive)):
+            object = tuple(int(i) for i in indices)
+            bag.PUT_NEW(object)
+            bag.change_priority(Item.get_key_from_object(object), float(priorities[indices]))
 
     def take(self, pooled):
         """
@@ -365,44 +358,31 @@ class SpatialBuffer():
         """
         max_value = 255
 
-        def create_2d_truth_value_array(*indices):
-            coords = tuple([int(var) for var in indices])
-            y,x = coords
-            pixel_value = float(img_array[y, x])
-
-            f = pixel_value / max_value
-            if f > 1: f = 1
-
-            relative_indices = []
-            offsets = (img_array.shape[0]-1)/2, (img_array.shape[1]-1)/2
-            for i in range(2):
-                relative_indices.append((indices[i] - offsets[i]) / offsets[i])
-
-            unit = NALInferenceRules.HelperFunctions.get_unit_evidence()
-            c = unit*math.exp(-1*((Config.FOCUSY ** 2)*(relative_indices[0]**2) + (Config.FOCUSX ** 2)*(relative_indices[1]**2)))
-
-            predicate_name = 'B'
+        # frequency is the pixel brightness; confidence falls off with distance from the center of focus
+        frequencies = np.minimum(np.asarray(img_array, dtype=float) / max_value, 1.0)
+        offsets = (img_array.shape[0]-1)/2, (img_array.shape[1]-1)/2
+        relative_y, relative_x = np.indices(img_array.shape, dtype=float)
+        relative_y, relative_x = (relative_y - offsets[0]) / offsets[0], (relative_x - offsets[1]) / offsets[1]
+        unit = NALInferenceRules.HelperFunctions.get_unit_evidence()
+        confidences = unit*np.exp(-1*((Config.FOCUSY ** 2)*(relative_y**2) + (Config.FOCUSX ** 2)*(relative_x**2)))
+
+        is_positive = frequencies > Config.POSITIVE_THRESHOLD
+        frequencies = np.where(is_positive, frequencies, NALInferenceRules.ExtendedBooleanOperators.bnot(frequencies))
+        truth_value_array = NALInferenceRules.TruthValueFunctions.create_truth_value_array(frequencies, confidences)
+
+        predicate_name = 'B'
+        sentence_array = np.empty(shape=img_array.shape, dtype=NALGrammar.Sentences.Sentence)
+        for (y, x), truth_value in np.ndenumerate(truth_value_array):
             subject_name = str(y) + "_" + str(x)
-
-
-            if f > Config.POSITIVE_THRESHOLD:
-                truth_value = NALGrammar.Sentences.TruthValue(f, c)
+            if is_positive[y, x]:
                 statement = NALGrammar.Terms.from_string("(" + subject_name + "-->" + predicate_name + ")")
             else:
-                truth_value = NALGrammar.Sentences.TruthValue(NALInferenceRules.ExtendedBooleanOperators.bnot(f), c)
                 statement = NALGrammar.Terms.from_string("(--,(" + subject_name + "-->" + predicate_name + "))")
 
-            # create the common predicate
-
-            return NALGrammar.Sentences.Judgment(statement=statement,
-                                                       value=truth_value)
-
-
-        func_vectorized = np.vectorize(create_2d_truth_value_array)
-        truth_value_array = np.fromfunction(function=func_vectorized,
-                                            shape=img_array.shape)
+            sentence_array[y, x] = NALGrammar.Sentences.Judgment(statement=statement,
+                                                                 value=truth_value)
 
-        return truth_value_array
+        return sentence_array
 
 
 class TemporalModule(ItemContainer):
@@ -449,6 +429,7 @@ class TemporalModule(ItemContainer):
         if len(self.temporal_chain) > self.capacity:
             popped_item = self.temporal_chain.pop(0)
             ItemContainer._take_from_lookup_dict(self, popped_item.key)
+            if Global.Global.metrics is not None: self.record_operation("purge")
 
         self.process_temporal_chaining()
 
@@ -0,0 +1,155 @@
+import json
+import mmap
+import tempfile
+
+import NALGrammar
+import NARSDataStructures.Other
+import NARSJournal
+import NARSMemory
+
+"""
+    Author: Christian Hahm
+    Created: October 18, 2026
+    Purpose: Keeps the contents of rarely used (cold) concepts in a memory-mapped file instead of RAM
+"""
+
+LINK_ATTRIBUTES = ("term_links", "subterm_links", "superterm_links", "prediction_links", "explanation_links")
+
+
+class ColdConceptStore:
+    """
+        A cold concept stays in the concepts bag as a stub, with only its term and Budget,
+        while its tables and link bags are written to the store's file and dropped from RAM.
+        They are loaded back the first time they are used (see Concept.__getattr__).
+
+        Records are keyed by the concept's key (its term string), so the store holds no concept objects.
+        The record of a concept forgotten by the concepts bag while cold is kept,
+        and restored when the concept is created again (see Memory.conceptualize_term).
+
+        Records are appended to the file and read through a memory map.
+        The space of loaded records is reclaimed by compact().
+    """
+
+    def __init__(self, memory):
+        self.memory = memory
+        self.file = tempfile.TemporaryFile()
+        self.map = None
+        self.size = 0  # bytes written to the file
+        self.live_size = 0  # bytes of records not yet loaded back
+        self.records = {}  # concept key -> (offset, length)
+
+    def __len__(self):
+        return len(self.records)
+
+    def __contains__(self, concept_key):
+        return concept_key in self.records
+
+    def __getstate__(self):
+        return {"memory": self.memory,
+                "records": [(concept_key, self.read(offset, length))
+                            for (concept_key, (offset, length)) in self.records.items()]}
+
+    def __setstate__(self, state):
+        self.__init__(state["memory"])
+        for concept_key, data in state["records"]:
+            self.append(concept_key, data)
+
+    def store(self, concept):
+        """
+            Write a concept's tables and links to the file, and drop them from the concept.
+            Links keep their undecayed priority and decay timestamp, so they go on decaying while cold.
+        """
+        record = {"beliefs": [NARSJournal.get_sentence_record(belief) for (belief, _) in concept.belief_table],
+                  "desires": [NARSJournal.get_sentence_record(desire) for (desire, _) in concept.desire_table]}
+        for link_attribute in LINK_ATTRIBUTES:
+            record[link_attribute] = [(link_item.key, link_item.budget.get_priority(), link_item.budget.get_quality(),
+                                       link_item.budget.decay_timestamp)
+                                      for link_item in getattr(concept, link_attribute)]
+        self.append(str(concept.term), json.dumps(record).encode("utf-8"))
+
+        for attribute in NARSMemory.Concept.COLD_ATTRIBUTES:
+            del concept.__dict__[attribute]
+        concept.cold_store = self
+
+    def append(self, concept_key, data):
+        self.file.seek(self.size)
+        self.file.write(data)
+        if concept_key in self.records: self.live_size -= self.records[concept_key][1]  # replaced record
+        self.records[concept_key] = (self.size, len(data))
+        self.size += len(data)
+        self.live_size += len(data)
+
+    def read(self, offset, length):
+        if self.map is None or offset + length > len(self.map):
+            # the file grew since it was mapped
+            self.file.flush()
+            if self.map is not None: self.map.close()
+            self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        return self.map[offset:offset + length]
+
+    def peek_record(self, concept_key):
+        """
+            :param concept_key: key of the cold concept
+            :return: the stored record of a cold concept, without loading it
+        """
+        (offset, length) = self.records[concept_key]
+        return json.loads(self.read(offset, length))
+
+    def load(self, concept):
+        """
+            Rebuild a concept's tables and links from its record.
+            The record is removed once loaded into the concept held by the concepts bag;
+            a forgotten copy of the concept (e.g. still named by another concept's link) gets the contents
+            but leaves the record for the concept to be created again.
+
+            :param concept: cold stub, or new concept, whose key has a record
+        """
+        concept_key = str(concept.term)
+        record = None
+        if concept_key in self.records:
+            record = self.peek_record(concept_key)
+            concept_item = self.memory.concepts_bag.item_lookup_dict.get(concept_key, None)
+            if concept_item is not None and concept_item.object is concept:
+                (_, length) = self.records.pop(concept_key)
+                self.live_size -= length
+        concept.__dict__.pop("cold_store", None)
+
+        concept.belief_table = NARSDataStructures.Other.Table(NALGrammar.Sentences.Judgment)
+        concept.desire_table = NARSDataStructures.Other.Table(NALGrammar.Sentences.Goal)
+        for link_attribute in LINK_ATTRIBUTES:
+            setattr(concept, link_attribute, NARSMemory.Concept.create_link_bag(self.memory.clock))
+        if record is None: return
+
+        for table, sentence_records in ((concept.belief_table, record["beliefs"]),
+                                        (concept.desire_table, record["desires"])):
+            for sentence_record in sentence_records:
+                sentence = NARSJournal.restore_sentence(self.memory, sentence_record)
+                table.insert_object(sentence, sentence.get_present_value().confidence)
+
+        for link_attribute in LINK_ATTRIBUTES:
+            link_bag = getattr(concept, link_attribute)
+            for (key, priority, quality, decay_timestamp) in record[link_attribute]:
+                linked_item = self.memory.concepts_bag.item_lookup_dict.get(key, None)
+                if linked_item is None: continue  # the linked concept was forgotten
+                link_item = link_bag.PUT_NEW(linked_item.object)
+                link_bag.change_priority(link_item.key, new_priority=priority)
+                link_bag.change_quality(link_item.key, new_quality=quality)
+                link_item.budget.decay_timestamp = decay_timestamp  # apply the decay accrued while cold
+
+    def compact(self):
+        """
+            Rewrite the file with only the records not yet loaded back
+        """
+        records = [(concept_key, self.read(offset, length)) for (concept_key, (offset, length)) in self.records.items()]
+
+        if self.map is not None: self.map.close()
+        self.file.close()
+        self.__init__(self.memory)
+        for concept_key, data in records:
+            self.append(concept_key, data)
+
+    def compact_if_needed(self):
+        """
+            Compact once more than half of the file is records that were loaded back
+        """
+        if self.live_size < self.size / 2: self.compact()
@@ -20,6 +20,7 @@ class ItemContainer:
 
         Examples of Item Containers include Bag and Buffer.
     """
+    changed_keys = None  # if a set, the keys of items put, taken or re-budgeted are added to it (see NARSJournal)
 
     def __init__(self, item_type, capacity):
         self.item_type = item_type  # the class of the objects this Container stores (be wrapped in Item)
@@ -65,8 +66,10 @@ class ItemContainer:
         """
         # put item into lookup table
         self.item_lookup_dict[item.key] = item
+        if self.changed_keys is not None: self.changed_keys.add(item.key)
+        if Global.Global.metrics is not None: self.record_operation("put")
 
-        if Config.GUI_USE_INTERFACE:
+        if Global.Global.is_gui_mirrored(self):
             Global.Global.print_to_output(str(item), data_structure=self)  # draw to GUI
             #self.item_archive[item.key] = item
 
@@ -79,13 +82,28 @@ class ItemContainer:
         :return: The Item that was removed.
         """
         item = self.item_lookup_dict.pop(key)  # remove item reference from lookup table
+        if self.changed_keys is not None: self.changed_keys.add(key)
+        if Global.Global.metrics is not None: self.record_operation("take")
 
-        if Config.GUI_USE_INTERFACE:
+        if Global.Global.is_gui_mirrored(self):
             Global.Global.remove_from_output(str(item), data_structure=self)
 
         return item
 
 
+    def record_operation(self, operation):
+        """
+            Count an operation on this container (e.g. "put", "take", "sample" or "purge") in the metrics
+        """
+        NARS = Global.Global.NARS
+        container = "ConceptsBag" if NARS is not None and self is NARS.memory.concepts_bag else type(self).__name__
+        labels = {"container": container, "item": self.item_type.__name__}
+        if operation == "purge":
+            Global.Global.metrics.increment("nars_container_purged_total", labels)
+        else:
+            labels["operation"] = operation
+            Global.Global.metrics.increment("nars_container_operations_total", labels)
+
     def _take_min(self):
         assert False, "Take smallest priority item not defined for generic Item Container!"
 
@@ -116,13 +134,17 @@ class Item:
 
             budget ($priority$)
     """
+    __slots__ = ("bucket_num", "bucket_slot", "quality_bucket_num", "quality_bucket_slot", "object", "id", "key", "budget")
 
     def __init__(self, object, id):
         """
         :param object: object to wrap in the item
         :param container: the Item Container instance that will contain this item
         """
-        self.bucket = None
+        self.bucket_num = None  # priority bucket level and slot, when held in a Bag
+        self.bucket_slot = None
+        self.quality_bucket_num = None
+        self.quality_bucket_slot = None
         self.object = object
         self.id = id
         priority = None
@@ -214,8 +236,8 @@ class Item:
             dict[NARSGUI.NARSGUI.KEY_CAPACITY_EXPLANATION_LINKS] = str(self.object.explanation_links.capacity)
         elif isinstance(self.object, NARSDataStructures.Other.Task):
             dict[NARSGUI.NARSGUI.KEY_SENTENCE_STRING] = str(self.object.sentence)
-            dict[NARSGUI.NARSGUI.KEY_LIST_EVIDENTIAL_BASE] = [str(evidence) for evidence in
-                                                              self.object.sentence.stamp.evidential_base]
+            stamp = self.object.sentence.stamp
+            dict[NARSGUI.NARSGUI.KEY_LIST_EVIDENTIAL_BASE] = stamp.get_evidence_strings(stamp.evidential_base)
             dict[NARSGUI.NARSGUI.KEY_LIST_INTERACTED_SENTENCES] = []
 
         return dict
@@ -226,6 +248,7 @@ class Item:
             Priority determines how likely an item is to be selected,
             Quality defines the Item's base priority (its lowest possible priority)
         """
+        __slots__ = ("_priority", "_quality", "decay_rate", "decay_timestamp")
 
         def __init__(self, priority=None, quality=None):
             if quality is None: quality = 0
@@ -234,6 +257,9 @@ class Item:
             if priority is None: priority = quality
             self.set_priority(priority)
 
+            self.decay_rate = 1.0  # priority multiplier per tick of the containing bag's decay clock
+            self.decay_timestamp = 0  # decay clock time at which the priority was last brought up to date
+
         def __str__(self):
             return NALSyntax.StatementSyntax.BudgetMarker.value \
                    + str(self.get_priority()) \
@@ -255,5 +281,22 @@ class Item:
         def get_priority(self):
             return self._priority
 
+        def get_decayed_priority(self, current_time):
+            """
+                :param current_time: current time of the decay clock
+                :return: the priority after decaying from the decay timestamp to the current time
+            """
+            elapsed_time = current_time - self.decay_timestamp
+            if elapsed_time <= 0 or self.decay_rate == 1.0: return self._priority
+            return self._priority * self.decay_rate ** elapsed_time
+
+        def apply_decay(self, current_time):
+            """
+                Sets the priority to its decayed value at the given decay clock time
+            """
+            if current_time == self.decay_timestamp: return
+            self.set_priority(self.get_decayed_priority(current_time))
+            self.decay_timestamp = current_time
+
         def get_quality(self):
             return self._quality
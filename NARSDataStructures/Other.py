@@ -1,3 +1,4 @@
+import collections
 import random
 import timeit as time
 
@@ -163,6 +164,7 @@ class Task:
     """
        NARS Task
     """
+    __slots__ = ("sentence", "creation_timestamp", "is_from_input", "needs_to_be_answered_in_output")
 
     def __init__(self, sentence, is_input_task=False):
         Asserts.assert_sentence(sentence)
@@ -178,3 +180,28 @@ class Task:
     def __str__(self):
         return "TASK: " + self.sentence.get_term_string_no_id()
 
+
+
+class SentenceIndex:
+    """
+        Stamp IDs of the most recently created sentences, mapped to the sentences.
+        Evidential bases and parent premises only keep Stamp IDs; this lets views like the GUI show their sentences,
+        while older sentences are forgotten and can be garbage collected.
+    """
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.sentences = collections.OrderedDict()  # Stamp ID -> Sentence, oldest first
+
+    def __len__(self):
+        return len(self.sentences)
+
+    def put(self, stamp_id, sentence):
+        self.sentences[stamp_id] = sentence
+        if len(self.sentences) > self.capacity: self.sentences.popitem(last=False)
+
+    def get(self, stamp_id):
+        """
+            :return: the sentence with the Stamp ID, or None if it was forgotten
+        """
+        return self.sentences.get(stamp_id, None)
@@ -3,7 +3,7 @@ from tkinter import filedialog
 
 import Config
 import NALSyntax
-import NARSDataStructures
+import NARSDataStructures.BagSnapshot
 import NARSMemory
 import NALInferenceRules
 
@@ -48,6 +48,10 @@ class NARSGUI:
     gui_vision_buffer_output_label = None
     gui_concepts_bag_output_label = None
 
+    # concepts bag snapshot in shared memory
+    gui_memory_snapshot_reader = None
+    MEMORY_LISTBOX_MAX_ROWS = 1000  # only the highest priority concepts of a snapshot are listed
+
     # dictionary of data structure name to listbox
     dict_listbox_from_id = {}
     gui_object_pipe = None  # two-way object request communication
@@ -147,6 +151,38 @@ class NARSGUI:
 
         self.update_datastructure_labels(data_structure_info, length=length)
 
+    def show_memory_snapshot(self, snapshot_name, data_structure_info=None, length=0):
+        """
+            Redraw the memory listbox from the concepts bag snapshot in shared memory,
+            listing its highest priority concepts
+        """
+        if self.gui_memory_snapshot_reader is None or self.gui_memory_snapshot_reader.get_name() != snapshot_name:
+            # the bag outgrew the old block, so NARS published to a new one
+            if self.gui_memory_snapshot_reader is not None: self.gui_memory_snapshot_reader.close()
+            self.gui_memory_snapshot_reader = NARSDataStructures.BagSnapshot.BagSnapshotReader(snapshot_name)
+
+        snapshot = self.gui_memory_snapshot_reader.read()
+        if snapshot is None: return
+        rows = []
+        for i in np.argsort(-snapshot.priorities, kind="stable")[:NARSGUI.MEMORY_LISTBOX_MAX_ROWS]:
+            rows.append(NALSyntax.StatementSyntax.BudgetMarker.value
+                        + "{:.5f}".format(snapshot.priorities[i])
+                        + NALSyntax.StatementSyntax.ValueSeparator.value
+                        + "{:.5f}".format(snapshot.qualities[i])
+                        + NALSyntax.StatementSyntax.BudgetMarker.value
+                        + " " + Global.Global.MARKER_ITEM_ID + str(snapshot.item_ids[i]) + Global.Global.MARKER_ID_END
+                        + snapshot.get_key(i))
+        is_valid = snapshot.is_valid()
+        snapshot.release()
+        if not is_valid: return  # NARS overwrote the snapshot while it was read; wait for the next one
+
+        self.gui_memory_full_contents = rows
+        self.clear_listbox(self.gui_memory_listbox)
+        for row in rows:
+            if NARSGUI.is_statement_string(row) or self.gui_show_atomic_concepts:
+                self.gui_memory_listbox.insert(tk.END, row)
+        self.update_datastructure_labels(data_structure_info, length=length)
+
     @classmethod
     def get_priority_from_string(cls, msg):
         return float(msg[msg.find(NALSyntax.StatementSyntax.BudgetMarker.value) + 1:msg.find(
@@ -276,6 +312,21 @@ class NARSGUI:
                     self.remove_from_output(msg=msg,
                                             data_structure_info=data_structure_info,
                                             length=data_structure_length)
+                elif command == "batch":
+                    # net changes to a data structure since the last batch: removals, then additions
+                    removed_msgs, added_msgs = msg
+                    for removed_msg in removed_msgs:
+                        self.remove_from_output(msg=removed_msg,
+                                                data_structure_info=data_structure_info,
+                                                length=data_structure_length)
+                    for added_msg in added_msgs:
+                        self.print_to_output(msg=added_msg,
+                                             data_structure_info=data_structure_info,
+                                             length=data_structure_length)
+                elif command == "snapshot":
+                    self.show_memory_snapshot(snapshot_name=msg,
+                                              data_structure_info=data_structure_info,
+                                              length=data_structure_length)
                 elif command == "clear":
                     self.clear_listbox(data_structure_id=data_structure_info)
                 elif command == "paused":
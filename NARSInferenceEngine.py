@@ -20,10 +20,141 @@ import NARSDataStructures.Other
 
 import NALSyntax
 
+"""
+    Two-judgment rule dispatch.
+    Which syllogistic rules apply to two statements of the same order depends only on their shape:
+    whether they are first-order, whether each copula is symmetric, and which terms they share.
+    TWO_JUDGMENT_RULES lists the rules for each shape, so a premise pair finds its rules with one lookup.
+"""
+# statement shape: (is first-order, is symmetric, is temporal, is implication or predictive implication)
+IS_FIRST_ORDER = 0
+IS_SYMMETRIC = 1
+IS_TEMPORAL = 2
+IS_IMPLICATION = 3
+COPULA_SHAPES = {copula: (NALSyntax.Copula.is_first_order(copula),
+                          NALSyntax.Copula.is_symmetric(copula),
+                          NALSyntax.Copula.is_temporal(copula),
+                          copula == NALSyntax.Copula.Implication or copula == NALSyntax.Copula.PredictiveImplication)
+                 for copula in NALSyntax.Copula}
+COMPOUND = (None, False, False, False)  # shape of a compound term (e.g. A &/ B)
+
+# which terms two statements share, checked in this order
+SHARED_SUBJECT_PREDICATE = 0  # j1 = M-->P, j2 = S-->M
+SHARED_PREDICATE_SUBJECT = 1  # j1 = S-->M, j2 = M-->P
+SHARED_SUBJECTS = 2  # j1 = M-->P, j2 = M-->S
+SHARED_PREDICATES = 3  # j1 = P-->M, j2 = S-->M
+SHARED_NONE = 4
+TAUTOLOGY = 5  # j1 = S-->P, j2 = P-->S, or j1 = S-->P, j2 = S<->P: inference would only give back a premise
+
+
+def get_statement_shape(statement):
+    if isinstance(statement, NALGrammar.Terms.StatementTerm): return COPULA_SHAPES[statement.copula]
+    return COMPOUND
+
+
+def get_shared_terms(j1_statement, j2_statement, j1_symmetric, j2_symmetric):
+    """
+        :return: which terms the statements share (see SHARED_SUBJECT_PREDICATE etc.), or TAUTOLOGY
+    """
+    j1_subject_id = j1_statement.get_subject_term().term_id
+    j1_predicate_id = j1_statement.get_predicate_term().term_id
+    j2_subject_id = j2_statement.get_subject_term().term_id
+    j2_predicate_id = j2_statement.get_predicate_term().term_id
+    if j1_subject_id == j2_predicate_id:
+        return TAUTOLOGY if j1_predicate_id == j2_subject_id else SHARED_SUBJECT_PREDICATE
+    if j1_predicate_id == j2_subject_id: return SHARED_PREDICATE_SUBJECT
+    if j1_subject_id == j2_subject_id:
+        # S-->P and S<->P
+        return TAUTOLOGY if j1_predicate_id == j2_predicate_id and j1_symmetric != j2_symmetric else SHARED_SUBJECTS
+    if j1_predicate_id == j2_predicate_id: return SHARED_PREDICATES
+    return SHARED_NONE
+
+
+def conditional_conjunctional_abduction_of_subjects(j1, j2):
+    """
+        j1 = (C1 && S) ==> M
+        j2 = S ==> M
+        or the other way around: at least one of the statement's subjects is conjunctive
+        and differs from the other statement's subject by 1 term
+
+        :return: Conditional Conjunctional Abduction of the premise with more subject terms from the other,
+            or None if the subjects are not like this
+    """
+    j1_subject_term = j1.statement.get_subject_term()
+    j2_subject_term = j2.statement.get_subject_term()
+    if not (NALSyntax.TermConnector.is_conjunction(j1_subject_term.connector)
+            or NALSyntax.TermConnector.is_conjunction(j2_subject_term.connector)): return None
+
+    j1_subject_statement_terms = j1_subject_term.subterms if NALSyntax.TermConnector.is_conjunction(
+        j1_subject_term.connector) else [j1_subject_term]
+
+    j2_subject_statement_terms = j2_subject_term.subterms if NALSyntax.TermConnector.is_conjunction(
+        j2_subject_term.connector) else [j2_subject_term]
+
+    difference_of_subterms = list(set(j1_subject_statement_terms) - set(j2_subject_statement_terms)) + list(set(j2_subject_statement_terms) - set(j1_subject_statement_terms))
+    if len(difference_of_subterms) != 1: return None
+
+    if len(j1_subject_statement_terms) > len(j2_subject_statement_terms):
+        return NALInferenceRules.Conditional.ConditionalConjunctionalAbduction(j1,j2)  # S
+    else:
+        return NALInferenceRules.Conditional.ConditionalConjunctionalAbduction(j2,j1)  # S
+
+
+def build_two_judgment_rules():
+    """
+        :return: dict of (is first-order, j1 is symmetric, j2 is symmetric, shared terms)
+            to the list of (rule, swap premises) to fire, in order. A swapped rule is called as rule(j2, j1).
+    """
+    rules = {}
+    for is_first_order in (True, False):
+        asymmetric_rules = {
+            # Deduction, Swapped Exemplification
+            SHARED_SUBJECT_PREDICATE: [(NALInferenceRules.Syllogistic.Deduction, False),  # S-->P
+                                       (NALInferenceRules.Syllogistic.Exemplification, True)],  # P-->S
+            SHARED_PREDICATE_SUBJECT: [(NALInferenceRules.Syllogistic.Deduction, True),
+                                       (NALInferenceRules.Syllogistic.Exemplification, False)],
+            # Induction, Swapped Induction, Comparison, Intensional Intersection or Disjunction,
+            # Extensional Intersection or Conjunction, Extensional Difference, Swapped Extensional Difference
+            SHARED_SUBJECTS: [(NALInferenceRules.Syllogistic.Induction, False),  # S-->P
+                              (NALInferenceRules.Syllogistic.Induction, True),  # P-->S
+                              (NALInferenceRules.Syllogistic.Comparison, False),  # S<->P
+                              (NALInferenceRules.Composition.DisjunctionOrIntensionalIntersection, False),  # M --> (S | P)
+                              (NALInferenceRules.Composition.ConjunctionOrExtensionalIntersection, False),  # M --> (S & P)
+                              (NALInferenceRules.Composition.ExtensionalDifference, False),  # M --> (S - P)
+                              (NALInferenceRules.Composition.ExtensionalDifference, True)],  # M --> (P - S)
+            # Abduction, Swapped Abduction, (Conditional Conjunctional Abduction of two implications),
+            # Intensional Intersection or Disjunction, Extensional Intersection or Conjunction,
+            # Intensional Difference, Swapped Intensional Difference, Comparison
+            SHARED_PREDICATES: [(NALInferenceRules.Syllogistic.Abduction, False),  # S-->P or S==>P
+                                (NALInferenceRules.Syllogistic.Abduction, True)]  # P-->S or P==>S
+                               + ([] if is_first_order else [(conditional_conjunctional_abduction_of_subjects, False)])
+                               + [(NALInferenceRules.Composition.DisjunctionOrIntensionalIntersection, False),  # (P | S) --> M
+                                  (NALInferenceRules.Composition.ConjunctionOrExtensionalIntersection, False),  # (P & S) --> M
+                                  (NALInferenceRules.Composition.IntensionalDifference, False),  # (P ~ S) --> M
+                                  (NALInferenceRules.Composition.IntensionalDifference, True),  # (S ~ P) --> M
+                                  (NALInferenceRules.Syllogistic.Comparison, False)],  # S<->P or S<=>P
+            SHARED_NONE: []
+        }
+        for shared_terms, premise_rules in asymmetric_rules.items():
+            rules[(is_first_order, False, False, shared_terms)] = premise_rules
+            # j1 = M-->P or P-->M, j2 = S<->M or M<->S: Analogy
+            rules[(is_first_order, False, True, shared_terms)] = [(NALInferenceRules.Syllogistic.Analogy, False)]  # S-->P or P-->S
+            # j1 = M<->S or S<->M, j2 = P-->M or M-->P: Swapped Analogy
+            rules[(is_first_order, True, False, shared_terms)] = [(NALInferenceRules.Syllogistic.Analogy, True)]  # S-->P or P-->S
+            # j1 = M<->P or P<->M, j2 = S<->M or M<->S: Resemblance
+            rules[(is_first_order, True, True, shared_terms)] = [(NALInferenceRules.Syllogistic.Resemblance, False)]  # S<->P
+    return rules
+
+
+TWO_JUDGMENT_RULES = build_two_judgment_rules()
+
 
 def do_semantic_inference_two_premise(j1, j2):
     if not NALGrammar.Sentences.may_interact(j1,j2): return []
 
+    metrics = Global.Global.metrics
+    if metrics is not None: begin_time = time.default_timer()
+
     try:
         if isinstance(j1, NALGrammar.Sentences.Goal) and isinstance(j2, NALGrammar.Sentences.Judgment):
             results = do_semantic_inference_goal_judgment(j1,j2)
@@ -32,6 +163,12 @@ def do_semantic_inference_two_premise(j1, j2):
     except Exception as error:
         assert False,"ERROR: Inference error " + str(error) + " between " + str(j1) + " and " + str(j2)
 
+    if metrics is not None:
+        metrics.observe("nars_two_premise_inference_seconds", time.default_timer() - begin_time,
+                        {"premises": type(j1).__name__ + "," + type(j2).__name__})
+        for derived_sentence in results:
+            metrics.increment("nars_inference_rule_fired_total", {"rule": derived_sentence.stamp.derived_by})
+
     return results
 
 def do_semantic_inference_two_judgment(j1: NALGrammar.Sentences, j2: NALGrammar.Sentences) -> [NARSDataStructures.Other.Task]:
@@ -97,322 +234,40 @@ def do_semantic_inference_two_judgment(j1: NALGrammar.Sentences, j2: NALGrammar.
     ===============================================
     ===============================================
     """
-    if isinstance(j1.statement, NALGrammar.Terms.CompoundTerm):
-        if isinstance(j2.statement,NALGrammar.Terms.StatementTerm) \
-            and not j2.statement.is_first_order():
-            if j2.statement.get_copula() == NALSyntax.Copula.Implication \
-                or  j2.statement.get_copula() == NALSyntax.Copula.PredictiveImplication:
-                derived_sentence = NALInferenceRules.Conditional.ConditionalJudgmentDeduction(j2, j1)  # S-->P
-                add_to_derived_sentences(derived_sentence, all_derived_sentences, j2, j1)
-                return all_derived_sentences
-
-    if isinstance(j2.statement, NALGrammar.Terms.CompoundTerm):
-        if isinstance(j1.statement,NALGrammar.Terms.StatementTerm) \
-            and not j1.statement.is_first_order():
-            if j1.statement.get_copula() == NALSyntax.Copula.Implication \
-                or j1.statement.get_copula() == NALSyntax.Copula.PredictiveImplication:
-                derived_sentence = NALInferenceRules.Conditional.ConditionalJudgmentDeduction(j1, j2)  # S-->P
-                add_to_derived_sentences(derived_sentence, all_derived_sentences, j1, j2)
-                return all_derived_sentences
-
-    swapped = False
-
-    if isinstance(j1.statement,NALGrammar.Terms.StatementTerm) and isinstance(j2.statement,NALGrammar.Terms.StatementTerm) and \
-            NALSyntax.Copula.is_first_order(j1.statement.get_copula()) == NALSyntax.Copula.is_first_order(j2.statement.get_copula()):
-        j1_subject_term = j1.statement.get_subject_term()
-        j2_subject_term = j2.statement.get_subject_term()
-        j1_predicate_term = j1.statement.get_predicate_term()
-        j2_predicate_term = j2.statement.get_predicate_term()
-        j1_copula = j1.statement.get_copula()
-        j2_copula = j2.statement.get_copula()
-
-
-        # check if the result will lead to tautology
-        tautology = (j1_subject_term == j2_predicate_term and j1_predicate_term == j2_subject_term) or \
-                    (j1_subject_term == j2_subject_term and j1_predicate_term == j2_predicate_term
-                     and
-                     ((not NALSyntax.Copula.is_symmetric(j1_copula) and NALSyntax.Copula.is_symmetric(
-                         j2_copula))  # S-->P and P<->S
-                      or
-                      (NALSyntax.Copula.is_symmetric(j1_copula) and not NALSyntax.Copula.is_symmetric(
-                          j2_copula))))  # S<->P and S-->P
-
-        if tautology:
-            if Config.DEBUG: Global.Global.debug_print("tautology")
-            return all_derived_sentences  # can't do inference, it will result in tautology
-
-        if NALSyntax.Copula.is_temporal(j1.statement.get_copula()) \
-            or (isinstance(j1,NALGrammar.Sentences.Judgment)
-                and j1.is_event()) or (isinstance(j2,NALGrammar.Sentences.Judgment) and j2.is_event()):
-            #dont do semantic inference with temporal
-            # todo .. don't do inference with events, it isn't handled gracefully right now
-            return all_derived_sentences
-        elif not NALSyntax.Copula.is_symmetric(j1.statement.get_copula()) and not NALSyntax.Copula.is_symmetric(j2.statement.get_copula()):
-            if j1_subject_term == j2_predicate_term or j1_predicate_term == j2_subject_term:
-                """
-                    j1 = M-->P, j2 = S-->M
-                OR swapped premises
-                    j1 = S-->M, j2 = M-->P
-                """
-                if j1_subject_term != j2_predicate_term:
-                    """
-                        j1=S-->M, j2=M-->P
-                        
-                        Swap these premises
-                    """
-
-                    j1, j2 = j2, j1
-
-                """
-                    j1 = M-->P, j2 = S-->M
-                """
-                if not j1.is_array and not j2.is_array:
-                    """
-                    # Deduction
-                    """
-
-                    derived_sentence = NALInferenceRules.Syllogistic.Deduction(j1, j2)  # S-->P
-                    add_to_derived_sentences(derived_sentence,all_derived_sentences,j1,j2)
-
-                    """
-                    # Swapped Exemplification
-                    """
-                    derived_sentence = NALInferenceRules.Syllogistic.Exemplification(j2, j1)  # P-->S
-                    add_to_derived_sentences(derived_sentence,all_derived_sentences,j1,j2)
-
-            elif j1.statement.get_subject_term() == j2.statement.get_subject_term():
-                """
-                    j1=M-->P
-                    j2=M-->S
-                """
-                if not j1.is_array and not j2.is_array:
-                    """
-                    # Induction
-                    """
-                    derived_sentence = NALInferenceRules.Syllogistic.Induction(j1, j2)  # S-->P
-                    add_to_derived_sentences(derived_sentence,all_derived_sentences,j1,j2)
-
-                    """
-                    # Swapped Induction
-                    """
-                    derived_sentence = NALInferenceRules.Syllogistic.Induction(j2, j1)  # P-->S
-                    add_to_derived_sentences(derived_sentence,all_derived_sentences,j1,j2)
-
-                    """
-                    # Comparison
-                    """
-                    derived_sentence = NALInferenceRules.Syllogistic.Comparison(j1, j2)  # S<->P
-                    add_to_derived_sentences(derived_sentence,all_derived_sentences,j1,j2)
-
-                    """
-                    # Intensional Intersection or Disjunction
-                    """
-                    derived_sentence = NALInferenceRules.Composition.DisjunctionOrIntensionalIntersection(j1, j2)  # M --> (S | P)
-                    add_to_derived_sentences(derived_sentence,all_derived_sentences,j1,j2)
-
-                    """
-                    # Extensional Intersection or Conjunction
-                    """
-                    derived_sentence = NALInferenceRules.Composition.ConjunctionOrExtensionalIntersection(j1, j2)  # M --> (S & P)
-                    add_to_derived_sentences(derived_sentence,all_derived_sentences,j1,j2)
-
-                    """
-                    # Extensional Difference
-                    """
-                    derived_sentence = NALInferenceRules.Composition.ExtensionalDifference(j1, j2)  # M --> (S - P)
-                    add_to_derived_sentences(derived_sentence,all_derived_sentences,j1,j2)
-
-                    """
-                    # Swapped Extensional Difference
-                    """
-                    derived_sentence = NALInferenceRules.Composition.ExtensionalDifference(j2, j1)  # M --> (P - S)
-                    add_to_derived_sentences(derived_sentence,all_derived_sentences,j1,j2)
-            elif j1.statement.get_predicate_term() == j2.statement.get_predicate_term():
-                """
-                    j1 = P-->M
-                    j2 = S-->M
-                """
-
-                """
-                # Abduction
-                """
-                derived_sentence = NALInferenceRules.Syllogistic.Abduction(j1, j2)  # S-->P or S==>P
-                add_to_derived_sentences(derived_sentence,all_derived_sentences,j1,j2)
-
-                """
-                # Swapped Abduction
-                """
-                derived_sentence = NALInferenceRules.Syllogistic.Abduction(j2, j1)  # P-->S or P==>S
-                add_to_derived_sentences(derived_sentence,all_derived_sentences,j1,j2)
-
-                if not NALSyntax.Copula.is_first_order(j1_copula):
-                    # two implication statements
-                    if NALSyntax.TermConnector.is_conjunction(j1_subject_term.connector) or \
-                            NALSyntax.TermConnector.is_conjunction(j2_subject_term.connector):
-                        j1_subject_statement_terms = j1_subject_term.subterms if NALSyntax.TermConnector.is_conjunction(
-                            j1_subject_term.connector) else [j1_subject_term]
-
-                        j2_subject_statement_terms = j2_subject_term.subterms if NALSyntax.TermConnector.is_conjunction(
-                            j2_subject_term.connector) else [j2_subject_term]
-
-                        difference_of_subterms = list(set(j1_subject_statement_terms) - set(j2_subject_statement_terms)) + list(set(j2_subject_statement_terms) - set(j1_subject_statement_terms))
-
-                        if len(difference_of_subterms) == 1:
-                            """
-                               At least one of the statement's subjects is conjunctive and differs from the
-                               other statement's subject by 1 term
-                            """
-                            if len(j1_subject_statement_terms) > len(j2_subject_statement_terms):
-                                derived_sentence = NALInferenceRules.Conditional.ConditionalConjunctionalAbduction(j1,j2)  # S
-                            else:
-                                derived_sentence = NALInferenceRules.Conditional.ConditionalConjunctionalAbduction(j2,j1)  # S
-                            add_to_derived_sentences(derived_sentence,all_derived_sentences,j1,j2)
-
-                """
-                # Intensional Intersection Disjunction
-                """
-                derived_sentence = NALInferenceRules.Composition.DisjunctionOrIntensionalIntersection(j1, j2)  # (P | S) --> M
-                add_to_derived_sentences(derived_sentence,all_derived_sentences,j1,j2)
-
-                """
-                # Extensional Intersection Conjunction
-                """
-                derived_sentence = NALInferenceRules.Composition.ConjunctionOrExtensionalIntersection(j1, j2)  # (P & S) --> M
-                add_to_derived_sentences(derived_sentence,all_derived_sentences,j1,j2)
-
-                """
-                # Intensional Difference
-                """
-                derived_sentence = NALInferenceRules.Composition.IntensionalDifference(j1, j2)  # (P ~ S) --> M
-                add_to_derived_sentences(derived_sentence,all_derived_sentences,j1,j2)
-
-                """
-                # Swapped Intensional Difference
-                """
-                derived_sentence = NALInferenceRules.Composition.IntensionalDifference(j2, j1)  # (S ~ P) --> M
-                add_to_derived_sentences(derived_sentence,all_derived_sentences,j1,j2)
-                """
-                # Comparison
-                """
-                derived_sentence = NALInferenceRules.Syllogistic.Comparison(j1, j2)  # S<->P or S<=>P
-                add_to_derived_sentences(derived_sentence,all_derived_sentences,j1,j2)
-        elif not NALSyntax.Copula.is_symmetric(j1.statement.get_copula()) and NALSyntax.Copula.is_symmetric(j2.statement.get_copula()):
-            """
-            # j1 = M-->P or P-->M
-            # j2 = S<->M or M<->S
-            # Analogy
-            """
-            derived_sentence = NALInferenceRules.Syllogistic.Analogy(j1, j2)  # S-->P or P-->S
-            add_to_derived_sentences(derived_sentence,all_derived_sentences,j1,j2)
-        elif NALSyntax.Copula.is_symmetric(j1.statement.get_copula()) and not NALSyntax.Copula.is_symmetric(j2.statement.get_copula()):
-            """
-            # j1 = M<->S or S<->M
-            # j2 = P-->M or M-->P
-            # Swapped Analogy
-            """
-            derived_sentence = NALInferenceRules.Syllogistic.Analogy(j2, j1)  # S-->P or P-->S
-            add_to_derived_sentences(derived_sentence,all_derived_sentences,j1,j2)
-        elif NALSyntax.Copula.is_symmetric(j1.statement.get_copula()) and NALSyntax.Copula.is_symmetric(j2.statement.get_copula()):
-            """
-            # j1 = M<->P or P<->M
-            # j2 = S<->M or M<->S
-            # Resemblance
-            """
-            derived_sentence = NALInferenceRules.Syllogistic.Resemblance(j1, j2)  # S<->P
-            add_to_derived_sentences(derived_sentence,all_derived_sentences,j1,j2)
-    elif (isinstance(j1.statement,NALGrammar.Terms.StatementTerm) and not j1.statement.is_first_order())\
-            or (isinstance(j2.statement,NALGrammar.Terms.StatementTerm) and not j2.statement.is_first_order()):
-        # One premise is a higher-order statement
-        """
-                j1 = S==>P or S<=>P
-                j2 = A-->B or A<->B
-            OR
-                j1 = A-->B or A<->B
-                j2 = S==>P or S<=>P
-        """
-        if isinstance(j2.statement,NALGrammar.Terms.StatementTerm) and not j2.statement.is_first_order():
-            """
-                j1 = A-->B or A<->B 
-                j2 = S==>P or S<=>P
-            """
-            # swap sentences so j1 is higher order
-            j1, j2 = j2, j1
-            swapped = True
+    j1_shape = get_statement_shape(j1_statement)
+    j2_shape = get_statement_shape(j2_statement)
 
-        assert (isinstance(j1.statement,NALGrammar.Terms.StatementTerm) and not j1.statement.is_first_order()),"ERROR"
+    if j1_shape is COMPOUND and j2_shape[IS_IMPLICATION]:
+        derived_sentence = NALInferenceRules.Conditional.ConditionalJudgmentDeduction(j2, j1)  # S-->P
+        add_to_derived_sentences(derived_sentence, all_derived_sentences, j2, j1)
+        return all_derived_sentences
 
-        """
-            j1 = S==>P or S<=>P
-        """
-        if NALSyntax.Copula.is_symmetric(j1.statement.get_copula()) and (j2.statement == j1.statement.get_subject_term() or j2.statement == j1.statement.get_predicate_term()) :
-            """
-                j1 = S<=>P
-                j2 = S (e.g A-->B)
-            """
-            pass
-            # derived_sentence = NALInferenceRules.Conditional.ConditionalAnalogy(j2, j1)  # P
-            # add_to_derived_sentences(derived_sentence,all_derived_sentences,j1,j2)
-        else:
-            """
-                j1 = S==>P
-                j2 = S or P (e.g A-->B)
-            """
-            if j2.statement == j1.statement.get_subject_term():
-                """
-                    j2 = S
-                """
-               # derived_sentence = NALInferenceRules.Conditional.ConditionalDeduction(j1, j2)  # P
-               # add_to_derived_sentences(derived_sentence,all_derived_sentences,j1,j2)
-                pass
-            elif j2.statement == j1.statement.get_predicate_term():
-                """
-                    j2 = P
-                """
-                # j2 = P. or (E ==> P)
-                pass
-                #derived_sentence = NALInferenceRules.Conditional.ConditionalJudgmentAbduction(j1, j2)  # S.
-                #add_to_derived_sentences(derived_sentence,all_derived_sentences,j1,j2)
-            elif NALSyntax.TermConnector.is_conjunction(j1.statement.get_subject_term().connector) and not NALSyntax.Copula.is_symmetric(j1.statement.get_copula()):
-                """
-                    j1 = (C1 && C2 && ..CN && S) ==> P
-                    j2 = S
-                """
-                pass
-                # derived_sentence = NALInferenceRules.Conditional.ConditionalConjunctionalDeduction(j1,j2)  # (C1 && C2 && ..CN) ==> P
-                # add_to_derived_sentences(derived_sentence,all_derived_sentences,j1,j2)
-
-    elif (isinstance(j1.statement, NALGrammar.Terms.CompoundTerm) and
-          isinstance(j2.statement, NALGrammar.Terms.StatementTerm) and
-            NALSyntax.TermConnector.is_conjunction(j1.statement.connector))\
-            or (isinstance(j2.statement, NALGrammar.Terms.CompoundTerm) and
-                isinstance(j1.statement, NALGrammar.Terms.StatementTerm) and
-                NALSyntax.TermConnector.is_conjunction(j2.statement.connector)):
-        """
-                j1 = (A &/ B)
-                j2 = A
-            OR
-                j1 = A
-                j2 = (A &/ B)
-        """
-        if isinstance(j2.statement,NALGrammar.Terms.CompoundTerm):
-            """
-                j1 = A
-                j2 = (A &/ B)
-            """
-            # swap sentences so j1 is the compound
-            j1, j2 = j2, j1
-            swapped = True
+    if j2_shape is COMPOUND and j1_shape[IS_IMPLICATION]:
+        derived_sentence = NALInferenceRules.Conditional.ConditionalJudgmentDeduction(j1, j2)  # S-->P
+        add_to_derived_sentences(derived_sentence, all_derived_sentences, j1, j2)
+        return all_derived_sentences
 
-        """
-            j1 = (A &/ B)
-            j2 = A
-        """
-        pass
+    if j1_shape is COMPOUND or j2_shape is COMPOUND or j1_shape[IS_FIRST_ORDER] != j2_shape[IS_FIRST_ORDER]:
+        # a compound (e.g. A &/ B) with a statement, or a higher-order statement with a first-order statement:
+        # no rules for these yet
+        return all_derived_sentences
+
+    shared_terms = get_shared_terms(j1_statement, j2_statement, j1_shape[IS_SYMMETRIC], j2_shape[IS_SYMMETRIC])
+    if shared_terms is TAUTOLOGY:
+        if Config.DEBUG: Global.Global.debug_print("tautology")
+        return all_derived_sentences  # can't do inference, it will result in tautology
+
+    if j1_shape[IS_TEMPORAL] \
+        or (isinstance(j1,NALGrammar.Sentences.Judgment)
+            and j1.is_event()) or (isinstance(j2,NALGrammar.Sentences.Judgment) and j2.is_event()):
+        #dont do semantic inference with temporal
+        # todo .. don't do inference with events, it isn't handled gracefully right now
+        return all_derived_sentences
+
+    for rule, swap_premises in TWO_JUDGMENT_RULES[(j1_shape[IS_FIRST_ORDER], j1_shape[IS_SYMMETRIC], j2_shape[IS_SYMMETRIC], shared_terms)]:
+        derived_sentence = rule(j2, j1) if swap_premises else rule(j1, j2)
+        add_to_derived_sentences(derived_sentence,all_derived_sentences,j1,j2)
 
-    if swapped:
-        # restore sentences
-        j1, j2 = j2, j1
-        swapped = False
     """
     ===============================================
     ===============================================
@@ -0,0 +1,246 @@
+import multiprocessing
+import os
+import sys
+
+import Config
+import Global
+import NALGrammar
+import NALSyntax
+import NARS
+import NARSInferenceEngine
+
+"""
+    Author: Christian Hahm
+    Created: October 18, 2026
+    Purpose: Runs two-premise inference on the premise pairs selected during a working cycle in a pool of worker processes,
+        and merges the derived sentences back in the order the pairs were selected.
+"""
+
+"""
+    Compact form of terms and sentences sent to and from the workers (nested tuples, cheap to pickle):
+        atomic term: (ATOMIC, name)
+        compound term: (COMPOUND, connector, (subterms...), (intervals...))
+        statement term: (STATEMENT, subject, predicate, copula, interval)
+        sentence: (punctuation, term, frequency, confidence, occurrence time, Stamp ID, (evidential base Stamp IDs...))
+            where frequency and confidence are None for a Question
+    Variable and spatial terms have no compact form; pairs with them are run in this process.
+"""
+ATOMIC = 0
+COMPOUND = 1
+STATEMENT = 2
+
+
+def is_encodable(term):
+    if isinstance(term, NALGrammar.Terms.AtomicTerm): return True
+    if isinstance(term, NALGrammar.Terms.SpatialTerm) or isinstance(term, NALGrammar.Terms.VariableTerm): return False
+    return all([is_encodable(subterm) for subterm in term.subterms])
+
+
+def encode_term(term):
+    if isinstance(term, NALGrammar.Terms.AtomicTerm):
+        return ATOMIC, term.get_term_string()
+    elif isinstance(term, NALGrammar.Terms.StatementTerm):
+        return STATEMENT, encode_term(term.subterms[0]), encode_term(term.subterms[1]), term.copula.value, term.interval
+    else:
+        return COMPOUND, term.connector.value, tuple([encode_term(subterm) for subterm in term.subterms]), tuple(term.intervals)
+
+
+def decode_term(encoded_term):
+    if encoded_term[0] == ATOMIC:
+        return NALGrammar.Terms.AtomicTerm(encoded_term[1])
+    elif encoded_term[0] == STATEMENT:
+        _, subject, predicate, copula, interval = encoded_term
+        return NALGrammar.Terms.StatementTerm(decode_term(subject), decode_term(predicate),
+                                              NALSyntax.Copula.get_copula_from_string(copula), interval=interval)
+    else:
+        _, connector, subterms, intervals = encoded_term
+        return NALGrammar.Terms.CompoundTerm([decode_term(subterm) for subterm in subterms],
+                                             NALSyntax.TermConnector.get_term_connector_from_string(connector),
+                                             intervals=list(intervals))
+
+
+def encode_sentence(sentence):
+    """
+        :return: compact form of a Sentence
+    """
+    value = getattr(sentence, "value", None)
+    return (sentence.punctuation.value, encode_term(sentence.statement),
+            None if value is None else value.frequency, None if value is None else value.confidence,
+            sentence.stamp.occurrence_time, sentence.stamp.id,
+            tuple(sentence.stamp.evidential_base.ids))
+
+
+def decode_sentence(encoded_sentence, stamp_id=None):
+    """
+        :param stamp_id: Stamp ID to give the sentence, or None to take the next ID from memory
+        :return: Sentence from its compact form. Its evidential base is left to the caller.
+    """
+    punctuation, encoded_term, frequency, confidence, occurrence_time, _, _ = encoded_sentence
+    memory = Global.Global.get_context().memory
+    next_stamp_id = memory.next_stamp_id
+    if stamp_id is not None: memory.next_stamp_id = stamp_id  # the Stamp takes the next ID
+    statement = decode_term(encoded_term)
+    if punctuation == NALSyntax.Punctuation.Judgment.value:
+        sentence = NALGrammar.Sentences.Judgment(statement, NALGrammar.Values.TruthValue(frequency, confidence),
+                                                 occurrence_time=occurrence_time)
+    elif punctuation == NALSyntax.Punctuation.Goal.value:
+        sentence = NALGrammar.Sentences.Goal(statement, NALGrammar.Values.DesireValue(frequency, confidence),
+                                             occurrence_time=occurrence_time)
+    else:
+        sentence = NALGrammar.Sentences.Question(statement)
+        sentence.stamp.occurrence_time = occurrence_time
+    if stamp_id is not None: memory.next_stamp_id = next_stamp_id
+    return sentence
+
+
+def decode_sentence_with_evidence(encoded_sentence):
+    """
+        :return: Sentence from its compact form, with its original Stamp ID and evidential base
+    """
+    sentence = decode_sentence(encoded_sentence, stamp_id=encoded_sentence[5])
+    sentence.stamp.evidential_base.set_evidence(encoded_sentence[6])
+    return sentence
+
+
+def get_config_values():
+    """
+        :return: the current Config settings, to set up a worker process the same way
+    """
+    return {name: getattr(Config, name) for name in dir(Config) if name.isupper()}
+
+
+def initialize_worker(config_values):
+    """
+        Set up a worker process: the parent's Config, and a NARS of its own to hand out Stamp IDs.
+        The worker never prints or talks to the GUI.
+    """
+    for name, value in config_values.items():
+        setattr(Config, name, value)
+    Config.GUI_USE_INTERFACE = False
+    Config.SILENT_MODE = True
+    Config.DEBUG = False
+    Config.METRICS_ENABLED = False
+    Config.INFERENCE_POOL_PROCESSES = 0
+    Global.Global.output_log = []
+    sys.stdout = open(os.devnull, "w")  # the rules' debug prints would repeat the parent's
+    NARS.NARS()
+
+
+def do_inference_on_encoded_pairs(cycle_number, encoded_pairs):
+    """
+        Worker job: run two-premise inference on a chunk of premise pairs
+
+        :param cycle_number: current working cycle of the parent NARS
+        :param encoded_pairs: list of (j1, j2) in compact form
+        :return: for each pair, a list of (derived sentence in compact form, derived by, parent premise indexes)
+            where a parent premise index is 0 for j1 and 1 for j2
+    """
+    memory = Global.Global.get_context().memory
+    memory.current_cycle_number = cycle_number
+    Global.Global.output_log.clear()
+    results = []
+    for encoded_pair in encoded_pairs:
+        # derived sentences take IDs above every ID in the pair, so the parent can tell them apart
+        memory.next_stamp_id = 1 + max([stamp_id for encoded_premise in encoded_pair for stamp_id in encoded_premise[6]]
+                                       + [encoded_premise[5] for encoded_premise in encoded_pair])
+        premises = [decode_sentence_with_evidence(encoded_premise) for encoded_premise in encoded_pair]
+
+        derived_sentences = NARSInferenceEngine.do_semantic_inference_two_premise(premises[0], premises[1])
+        results.append([(encode_sentence(derived_sentence),
+                         derived_sentence.stamp.derived_by,
+                         tuple([i for i in (0, 1) if premises[i].stamp.id in derived_sentence.stamp.parent_premise_ids]))
+                        for derived_sentence in derived_sentences])
+    return results
+
+
+class InferencePool:
+    """
+        Collects the premise pairs selected during a working cycle (see NARS.process_premise_pair),
+        and runs inference on all of them at once when the cycle calls run().
+
+        Large batches are split into one chunk per worker; smaller ones are not worth the round trip and run in this process.
+        Either way the derived sentences come back in the order the pairs were added,
+        and get their Stamp IDs here in that order, so a run does not depend on how the work was split.
+    """
+
+    def __init__(self, processes, min_batch_size=None):
+        """
+            :param processes: number of worker processes
+            :param min_batch_size: fewest encodable premise pairs to send to the workers
+        """
+        self.processes = processes
+        self.min_batch_size = Config.INFERENCE_POOL_MIN_BATCH_SIZE if min_batch_size is None else min_batch_size
+        self.pool = None  # started on the first batch large enough to need it
+        self.premise_pairs = []
+
+    def __len__(self):
+        return len(self.premise_pairs)
+
+    def add_premise_pair(self, j1, j2):
+        if not NALGrammar.Sentences.may_interact(j1, j2): return
+        self.premise_pairs.append((j1, j2))
+
+    def get_pool(self):
+        if self.pool is None:
+            self.pool = multiprocessing.get_context("spawn").Pool(self.processes,
+                                                                   initializer=initialize_worker,
+                                                                   initargs=(get_config_values(),))
+        return self.pool
+
+    def run(self):
+        """
+            Run inference on the collected premise pairs
+
+            :return: the derived sentences, in the order of their premise pairs
+        """
+        premise_pairs = self.premise_pairs
+        self.premise_pairs = []
+
+        in_pool = [isinstance(j1, (NALGrammar.Sentences.Judgment, NALGrammar.Sentences.Goal))
+                   and isinstance(j2, (NALGrammar.Sentences.Judgment, NALGrammar.Sentences.Goal))
+                   and is_encodable(j1.statement) and is_encodable(j2.statement)
+                   for (j1, j2) in premise_pairs]
+        if in_pool.count(True) < self.min_batch_size: in_pool = [False] * len(premise_pairs)
+        pool_results = iter(self.run_in_pool([pair for (pair, pair_in_pool) in zip(premise_pairs, in_pool) if pair_in_pool])
+                            if any(in_pool) else [])
+
+        derived_sentences = []
+        for (j1, j2), pair_in_pool in zip(premise_pairs, in_pool):
+            if pair_in_pool:
+                derived_sentences.extend([self.merge_derived_sentence(encoded_result, j1, j2)
+                                          for encoded_result in next(pool_results)])
+            else:
+                derived_sentences.extend(NARSInferenceEngine.do_semantic_inference_two_premise(j1, j2))
+        return derived_sentences
+
+    def run_in_pool(self, premise_pairs):
+        """
+            :return: for each premise pair, the list of its encoded results (see do_inference_on_encoded_pairs)
+        """
+        encoded_pairs = [(encode_sentence(j1), encode_sentence(j2)) for (j1, j2) in premise_pairs]
+        chunk_size = -(-len(encoded_pairs) // self.processes)
+        chunks = [encoded_pairs[i:i + chunk_size] for i in range(0, len(encoded_pairs), chunk_size)]
+        cycle_number = Global.Global.get_current_cycle_number()
+        chunk_results = self.get_pool().starmap(do_inference_on_encoded_pairs,
+                                                [(cycle_number, chunk) for chunk in chunks])
+        return [pair_results for results in chunk_results for pair_results in results]
+
+    @classmethod
+    def merge_derived_sentence(cls, encoded_result, j1, j2):
+        """
+            :return: a sentence derived in a worker, with a Stamp ID from this process in place of its ID in the worker
+        """
+        encoded_sentence, derived_by, parent_indexes = encoded_result
+        sentence = decode_sentence(encoded_sentence)
+        sentence.stamp.derived_by = derived_by
+        premises = (j1, j2)
+        sentence.stamp.parent_premise_ids = tuple([premises[i].stamp.id for i in parent_indexes])
+        sentence.stamp.evidential_base.set_evidence([sentence.stamp.id if stamp_id == encoded_sentence[5] else stamp_id
+                                                     for stamp_id in encoded_sentence[6]])
+        return sentence
+
+    def close(self):
+        if self.pool is None: return
+        self.pool.terminate()
+        self.pool.join()
+        self.pool = None
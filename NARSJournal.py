@@ -0,0 +1,377 @@
+import json
+import os
+import queue
+import threading
+
+import Config
+import Global
+import NALGrammar
+import NALSyntax
+import NARSMemory
+
+"""
+    Author: Christian Hahm
+    Created: October 18, 2026
+    Purpose: Incremental persistence of NARS Memory.
+        Concept changes are appended to a journal, and compacted into periodic checkpoints.
+"""
+
+"""
+    A journal directory holds numbered pairs of files, each one JSON record per line:
+        checkpoint-<n>.jsonl: every concept in memory, written a chunk at a time, ended by an "end" record
+        journal-<n>.jsonl: every concept that changed (or was forgotten) since checkpoint <n> began
+
+    Every concept record has a sequence number, increasing across all files,
+    so when replaying a journal, a change that was already captured in the checkpoint is skipped.
+"""
+CHECKPOINT_PREFIX = "checkpoint-"
+JOURNAL_PREFIX = "journal-"
+FILE_EXTENSION = ".jsonl"
+
+RECORD_CONCEPT = "concept"
+RECORD_FORGET = "forget"
+RECORD_CYCLE = "cycle"
+RECORD_END = "end"
+
+
+class MemoryJournal:
+    """
+        Journals the changes to a Memory's concepts, without stopping the working cycle:
+        records are built from the changed concepts on the NARS thread, and written to disk by a background thread.
+
+        Changes are tracked by the concepts bag (its changed_keys), so a concept is journaled when it is created,
+        forgotten, or its Budget changes. Its belief and desire tables are journaled along with it,
+        since a concept's quality is raised whenever a task is put into its tables.
+    """
+
+    def __init__(self, memory, directory,
+                 flush_interval=Config.JOURNAL_FLUSH_INTERVAL,
+                 checkpoint_interval=Config.JOURNAL_CHECKPOINT_INTERVAL,
+                 checkpoint_chunk_size=Config.JOURNAL_CHECKPOINT_CHUNK_SIZE):
+        """
+            :param memory: Memory to journal
+            :param directory: directory of the journal files; created if it does not exist
+            :param flush_interval: working cycles between appends of the changed concepts to the journal
+            :param checkpoint_interval: working cycles between the starts of checkpoints
+            :param checkpoint_chunk_size: concepts written into the checkpoint in progress per working cycle
+        """
+        os.makedirs(directory, exist_ok=True)
+        self.memory = memory
+        self.directory = directory
+        self.flush_interval = flush_interval
+        self.checkpoint_interval = checkpoint_interval
+        self.checkpoint_chunk_size = checkpoint_chunk_size
+
+        file_numbers = get_file_numbers(directory)
+        self.file_number = max(file_numbers) if len(file_numbers) > 0 else -1
+        self.sequence = get_last_sequence(directory, file_numbers) + 1
+        self.checkpoint_keys = None  # keys of the concepts left to write into the checkpoint in progress
+        self.last_checkpoint_cycle = None
+
+        self.write_queue = queue.Queue()
+        self.writer_thread = threading.Thread(target=self.write_records, name="Memory journal writer", daemon=True)
+        self.writer_thread.start()
+
+        memory.concepts_bag.changed_keys = set()
+        self.start_checkpoint()
+
+    def get_path(self, prefix, file_number):
+        return os.path.join(self.directory, prefix + str(file_number) + FILE_EXTENSION)
+
+    def get_next_sequence(self):
+        self.sequence += 1
+        return self.sequence - 1
+
+    def on_working_cycle(self):
+        """
+            Journal the changes made in the working cycle that just ended, when it is time to,
+            and continue the checkpoint in progress (or start a new one)
+        """
+        cycle = self.memory.current_cycle_number
+        if cycle % self.flush_interval == 0: self.flush()
+
+        if self.checkpoint_keys is not None:
+            self.continue_checkpoint()
+        elif cycle - self.last_checkpoint_cycle >= self.checkpoint_interval:
+            self.start_checkpoint()
+
+    def flush(self):
+        """
+            Append a record of each concept changed since the last flush to the current journal file
+        """
+        concepts_bag = self.memory.concepts_bag
+        changed_keys = concepts_bag.changed_keys
+        if len(changed_keys) == 0: return
+        concepts_bag.changed_keys = set()
+
+        journal_path = self.get_path(JOURNAL_PREFIX, self.file_number)
+        for key in changed_keys:
+            item = concepts_bag.item_lookup_dict.get(key, None)
+            if item is None:
+                record = {"type": RECORD_FORGET, "seq": self.get_next_sequence(), "key": key}
+            else:
+                record = self.get_concept_record(item)
+            self.write_queue.put(("write", journal_path, record))
+        self.write_queue.put(("write", journal_path, self.get_cycle_record(RECORD_CYCLE)))
+
+    def start_checkpoint(self):
+        """
+            Begin writing a new checkpoint of every concept, and a new journal for the changes made from now on
+        """
+        self.flush()  # changes made before the checkpoint go in the previous journal
+        self.file_number += 1
+        self.last_checkpoint_cycle = self.memory.current_cycle_number
+        self.checkpoint_keys = list(self.memory.concepts_bag.item_lookup_dict)
+        self.write_queue.put(("write", self.get_path(JOURNAL_PREFIX, self.file_number), self.get_cycle_record(RECORD_CYCLE)))
+        self.continue_checkpoint()
+
+    def continue_checkpoint(self):
+        """
+            Write the next chunk of concepts into the checkpoint in progress, and end it once every concept is written
+        """
+        checkpoint_path = self.get_path(CHECKPOINT_PREFIX, self.file_number)
+        concepts_bag = self.memory.concepts_bag
+        for _ in range(min(self.checkpoint_chunk_size, len(self.checkpoint_keys))):
+            item = concepts_bag.item_lookup_dict.get(self.checkpoint_keys.pop(), None)
+            if item is None: continue  # forgotten since the checkpoint began
+            self.write_queue.put(("write", checkpoint_path, self.get_concept_record(item)))
+
+        if len(self.checkpoint_keys) > 0: return
+
+        self.checkpoint_keys = None
+        self.write_queue.put(("write", checkpoint_path, self.get_cycle_record(RECORD_END)))
+        # the files before this checkpoint are no longer needed to restore
+        self.write_queue.put(("delete", None, self.file_number))
+
+    def get_cycle_record(self, record_type):
+        return {"type": record_type,
+                "cycle": self.memory.current_cycle_number,
+                "next_stamp_id": self.memory.next_stamp_id,
+                "next_percept_id": self.memory.next_percept_id}
+
+    def get_concept_record(self, item):
+        concept = item.object
+        if concept.is_cold():
+            # take the sentences from the cold store's record, rather than loading the concept
+            cold_record = concept.cold_store.peek_record(str(concept.term))
+            beliefs, desires = cold_record["beliefs"], cold_record["desires"]
+        else:
+            beliefs = [get_sentence_record(belief) for (belief, _) in concept.belief_table]
+            desires = [get_sentence_record(desire) for (desire, _) in concept.desire_table]
+        return {"type": RECORD_CONCEPT,
+                "seq": self.get_next_sequence(),
+                "key": item.key,
+                "term": concept.term.get_term_string(),
+                "priority": item.budget.get_decayed_priority(self.memory.concepts_bag.decay_clock),
+                "quality": item.budget.get_quality(),
+                "beliefs": beliefs,
+                "desires": desires}
+
+    def write_records(self):
+        """
+            Writer thread: appends queued records to their files, and deletes files that are no longer needed.
+            Commands are (command, path, record); a "delete" record is the number of the newest file to keep.
+        """
+        files = {}
+        while True:
+            (command, path, record) = self.write_queue.get()
+            if command == "write":
+                if path not in files: files[path] = open(path, "a", encoding="utf-8")
+                files[path].write(json.dumps(record) + "\n")
+            elif command == "delete":
+                # delete the files numbered before the record, once the newer checkpoint is on disk
+                for file in files.values():
+                    file.flush()
+                    os.fsync(file.fileno())
+                for file_number in get_file_numbers(self.directory):
+                    if file_number >= record: continue
+                    for prefix in (CHECKPOINT_PREFIX, JOURNAL_PREFIX):
+                        old_path = self.get_path(prefix, file_number)
+                        if old_path in files: files.pop(old_path).close()
+                        if os.path.exists(old_path): os.remove(old_path)
+            elif command == "sync" or command == "close":
+                for file in files.values(): file.flush()
+                if command == "close":
+                    for file in files.values(): file.close()
+                    files = {}
+                record.set()  # wake the waiting thread
+                if command == "close": return
+
+            if self.write_queue.empty():
+                for file in files.values(): file.flush()
+
+    def sync(self):
+        """
+            Wait until every record journaled so far is written to disk
+        """
+        written = threading.Event()
+        self.write_queue.put(("sync", None, written))
+        written.wait()
+
+    def close(self):
+        """
+            Journal the last changes, wait for them to be written, and stop journaling.
+            A checkpoint still in progress is left unfinished; restoring then uses the previous checkpoint.
+        """
+        self.flush()
+        closed = threading.Event()
+        self.write_queue.put(("close", None, closed))
+        closed.wait()
+        self.writer_thread.join()
+        self.memory.concepts_bag.changed_keys = None
+
+
+def get_sentence_record(sentence):
+    record = {"statement": sentence.statement.get_term_string(),
+              "punctuation": sentence.punctuation.value,
+              "frequency": sentence.value.frequency,
+              "confidence": sentence.value.confidence,
+              "occurrence_time": sentence.stamp.occurrence_time,
+              "stamp_id": sentence.stamp.id,
+              "creation_time": sentence.stamp.creation_time,
+              "evidential_base": list(sentence.stamp.evidential_base.ids)}
+    if isinstance(sentence, NALGrammar.Sentences.Goal): record["executed"] = sentence.executed
+    return record
+
+
+def get_file_numbers(directory):
+    """
+        :return: sorted numbers of the checkpoint and journal files in the directory
+    """
+    file_numbers = set()
+    for filename in os.listdir(directory):
+        for prefix in (CHECKPOINT_PREFIX, JOURNAL_PREFIX):
+            if filename.startswith(prefix) and filename.endswith(FILE_EXTENSION):
+                file_number = filename[len(prefix):-len(FILE_EXTENSION)]
+                if file_number.isdigit(): file_numbers.add(int(file_number))
+    return sorted(file_numbers)
+
+
+def read_records(path):
+    """
+        :return: the records in a file, stopping at a line that was cut off by a crash
+    """
+    records = []
+    if not os.path.exists(path): return records
+    with open(path, "r", encoding="utf-8") as file:
+        for line in file:
+            try:
+                records.append(json.loads(line))
+            except ValueError:
+                break
+    return records
+
+
+def get_last_sequence(directory, file_numbers):
+    last_sequence = -1
+    for file_number in file_numbers:
+        for prefix in (CHECKPOINT_PREFIX, JOURNAL_PREFIX):
+            for record in read_records(os.path.join(directory, prefix + str(file_number) + FILE_EXTENSION)):
+                last_sequence = max(last_sequence, record.get("seq", -1))
+    return last_sequence
+
+
+def restore_memory(directory):
+    """
+        Rebuild a Memory from the last complete checkpoint in a journal directory,
+        replaying only the journals written since that checkpoint began.
+
+        Concept term links are rebuilt when the concepts are created; their link budgets are not restored.
+
+        The restored memory replaces the memory of the current ReasonerContext (see Global.Global.get_context),
+        since sentences get their Stamps from it.
+
+        :param directory: journal directory
+        :return: the restored Memory
+    """
+    file_numbers = get_file_numbers(directory)
+    checkpoint_number = -1
+    checkpoint_records = []
+    for file_number in reversed(file_numbers):
+        records = read_records(os.path.join(directory, CHECKPOINT_PREFIX + str(file_number) + FILE_EXTENSION))
+        if len(records) > 0 and records[-1]["type"] == RECORD_END:
+            checkpoint_number = file_number
+            checkpoint_records = records
+            break
+
+    concept_records = {}  # key -> latest record
+    checkpoint_sequences = {}
+    last_cycle_record = None
+    for record in checkpoint_records:
+        if record["type"] == RECORD_CONCEPT:
+            concept_records[record["key"]] = record
+            checkpoint_sequences[record["key"]] = record["seq"]
+        else:
+            last_cycle_record = record
+
+    for file_number in file_numbers:
+        if file_number < checkpoint_number: continue
+        for record in read_records(os.path.join(directory, JOURNAL_PREFIX + str(file_number) + FILE_EXTENSION)):
+            if record["type"] == RECORD_CYCLE:
+                if last_cycle_record is None or record["cycle"] >= last_cycle_record["cycle"]: last_cycle_record = record
+            elif record["seq"] > checkpoint_sequences.get(record["key"], -1):
+                concept_records[record["key"]] = record
+
+    context = Global.Global.get_context()
+    previous_memory = context.memory
+    memory = NARSMemory.Memory()
+    context.memory = memory
+    try:
+        restore_concepts(memory, concept_records.values(), last_cycle_record)
+    except:
+        context.memory = previous_memory
+        raise
+    return memory
+
+
+def restore_concepts(memory, concept_records, last_cycle_record):
+    """
+        Create the concepts, their budgets and their tables in an empty memory
+    """
+    if last_cycle_record is not None: memory.current_cycle_number = last_cycle_record["cycle"]
+
+    stamp_ids = []  # of the restored sentences
+    for record in concept_records:
+        if record["type"] != RECORD_CONCEPT: continue  # forgotten
+        try:
+            concept_item = memory.peek_concept_item(NALGrammar.Terms.from_string(record["term"]))
+        except AssertionError as error:
+            Global.Global.print_to_output("WARNING: COULD NOT RESTORE CONCEPT " + record["term"] + ": " + str(error))
+            continue
+        memory.concepts_bag.change_priority(concept_item.key, new_priority=record["priority"])
+        memory.concepts_bag.change_quality(concept_item.key, new_quality=record["quality"])
+        concept = concept_item.object
+        for table, table_sentence_records in ((concept.belief_table, record["beliefs"]),
+                                              (concept.desire_table, record["desires"])):
+            for sentence_record in table_sentence_records:
+                sentence = restore_sentence(memory, sentence_record)
+                table.insert_object(sentence, sentence.get_present_value().confidence)
+                stamp_ids.append(sentence.stamp.id)
+
+    memory.next_stamp_id = max([stamp_id + 1 for stamp_id in stamp_ids] + [0])
+    if last_cycle_record is not None:
+        memory.next_stamp_id = max(memory.next_stamp_id, last_cycle_record["next_stamp_id"])
+        memory.next_percept_id = last_cycle_record["next_percept_id"]
+
+
+def restore_sentence(memory, record):
+    """
+        :return: Judgment or Goal from a sentence record, with its original Stamp ID and evidential base
+    """
+    statement = NALGrammar.Terms.from_string(record["statement"])
+    punctuation = NALSyntax.Punctuation.get_punctuation_from_string(record["punctuation"])
+    next_stamp_id = memory.next_stamp_id
+    memory.next_stamp_id = record["stamp_id"]  # the Stamp takes the next ID
+    if punctuation == NALSyntax.Punctuation.Judgment:
+        sentence = NALGrammar.Sentences.Judgment(statement,
+                                                 NALGrammar.Values.TruthValue(record["frequency"], record["confidence"]),
+                                                 occurrence_time=record["occurrence_time"])
+    else:
+        sentence = NALGrammar.Sentences.Goal(statement,
+                                             NALGrammar.Values.DesireValue(record["frequency"], record["confidence"]),
+                                             occurrence_time=record["occurrence_time"])
+        sentence.executed = record["executed"]
+    sentence.stamp.creation_time = record["creation_time"]
+    sentence.stamp.evidential_base.set_evidence(record["evidential_base"])
+    memory.next_stamp_id = next_stamp_id
+    return sentence
@@ -9,6 +9,7 @@ import Global
 import NALGrammar
 import NALSyntax
 import NARSDataStructures.Bag
+import NARSDataStructures.ConceptStore
 import NARSDataStructures.Other
 import NARSDataStructures.ItemContainers
 import NALInferenceRules
@@ -19,6 +20,20 @@ import NALInferenceRules
 """
 
 
+class CycleClock:
+    """
+        The working cycle number of a Memory, used as the decay clock of its bags.
+        It holds only the number, so a bag (e.g. a concept's link bag) can be pickled or encoded without its Memory.
+    """
+    __slots__ = ("cycle_number",)
+
+    def __init__(self):
+        self.cycle_number = 0
+
+    def __call__(self):
+        return self.cycle_number
+
+
 class Memory:
     """
         NARS Memory
@@ -27,14 +42,50 @@ class Memory:
     next_percept_id = 0
 
     def __init__(self):
+        self.clock = CycleClock()
         self.concepts_bag = NARSDataStructures.Bag.Bag(item_type=Concept,
                                                        capacity=Config.MEMORY_CONCEPT_CAPACITY,
-                                                       granularity=10000)
-        self.current_cycle_number = 0
+                                                       granularity=10000,
+                                                       lazy_decay=Config.BAG_LAZY_DECAY,
+                                                       decay_rate=Config.BAG_LAZY_DECAY_RATE,
+                                                       clock=self.clock)
+        self.cold_concept_store = None  # ColdConceptStore, created once concepts are first demoted
+        # recently created sentences by Stamp ID, to show the sentences behind evidential bases and parent premises
+        self.sentence_index = NARSDataStructures.Other.SentenceIndex(Config.SENTENCE_INDEX_CAPACITY) \
+            if Config.SENTENCE_INDEX_CAPACITY > 0 else None
 
     def __len__(self):
         return self.get_number_of_concepts()
 
+    @property
+    def current_cycle_number(self):
+        return self.clock.cycle_number
+
+    @current_cycle_number.setter
+    def current_cycle_number(self, cycle_number):
+        self.clock.cycle_number = cycle_number
+
+    def get_current_cycle_number(self):
+        return self.current_cycle_number
+
+    def demote_cold_concepts(self, hot_capacity=Config.MEMORY_HOT_CONCEPT_CAPACITY):
+        """
+            Move the contents of the lowest priority concepts to the cold concept store,
+            so at most hot_capacity concepts keep their tables and links in RAM.
+            Demoted concepts stay in the concepts bag, and are loaded back when used.
+
+            :param hot_capacity: how many concepts to keep fully in RAM
+        """
+        hot_items = [item for item in self.concepts_bag if not item.object.is_cold()]
+        if len(hot_items) <= hot_capacity: return
+
+        if self.cold_concept_store is None:
+            self.cold_concept_store = NARSDataStructures.ConceptStore.ColdConceptStore(self)
+        hot_items.sort(key=lambda item: item.budget.get_priority())
+        for item in hot_items[:len(hot_items) - hot_capacity]:
+            self.cold_concept_store.store(item.object)
+        self.cold_concept_store.compact_if_needed()
+
     def get_random_concept(self):
         """
             Probabilistically peek the concepts
@@ -64,11 +115,15 @@ class Memory:
         concept_key = NARSDataStructures.ItemContainers.Item.get_key_from_object(term)
         assert not (concept_key in self.concepts_bag.item_lookup_dict), "Cannot create new concept. Concept already exists."
         # create new concept
-        new_concept = Concept(term)
+        new_concept = Concept(term, clock=self.clock)
 
         # put into data structure
         self.concepts_bag.PUT_NEW(new_concept) # add to bag
 
+        if self.cold_concept_store is not None and concept_key in self.cold_concept_store:
+            # the concept was forgotten while cold; restore what it knew
+            self.cold_concept_store.load(new_concept)
+
         if isinstance(term, NALGrammar.Terms.CompoundTerm) and not isinstance(term, NALGrammar.Terms.SpatialTerm):
             #todo allow array elements
             for i, subterm in np.ndenumerate(term.subterms):
@@ -507,18 +562,37 @@ class Concept:
     """
         NARS Concept
     """
-    def __init__(self, term):
+    # attributes that a cold concept keeps in its store instead of RAM
+    COLD_ATTRIBUTES = ("term_links", "subterm_links", "superterm_links", "belief_table", "desire_table",
+                       "prediction_links", "explanation_links")
+    cold_store = None  # ColdConceptStore holding this concept's attributes, while it is cold
+
+    def __init__(self, term, clock=None):
+        """
+            :param clock: function returning the decay clock time of the concept's link bags (see Bag)
+        """
         Asserts.assert_term(term)
         self.term = term  # concept's unique term
-        self.term_links = NARSDataStructures.Bag.Bag(item_type=Concept, capacity=Config.CONCEPT_LINK_CAPACITY)  # Bag of related concepts (related by term)
-        self.subterm_links = NARSDataStructures.Bag.Bag(item_type=Concept,
-                                                     capacity=Config.CONCEPT_LINK_CAPACITY)  # Bag of related concepts (related by term)
-        self.superterm_links = NARSDataStructures.Bag.Bag(item_type=Concept,
-                                                     capacity=Config.CONCEPT_LINK_CAPACITY)  # Bag of related concepts (related by term)
+        self.term_links = Concept.create_link_bag(clock)  # Bag of related concepts (related by term)
+        self.subterm_links = Concept.create_link_bag(clock)  # Bag of related concepts (related by term)
+        self.superterm_links = Concept.create_link_bag(clock)  # Bag of related concepts (related by term)
         self.belief_table = NARSDataStructures.Other.Table(NALGrammar.Sentences.Judgment)
         self.desire_table = NARSDataStructures.Other.Table(NALGrammar.Sentences.Goal)
-        self.prediction_links = NARSDataStructures.Bag.Bag(item_type=Concept, capacity=Config.CONCEPT_LINK_CAPACITY)
-        self.explanation_links = NARSDataStructures.Bag.Bag(item_type=Concept, capacity=Config.CONCEPT_LINK_CAPACITY)
+        self.prediction_links = Concept.create_link_bag(clock)
+        self.explanation_links = Concept.create_link_bag(clock)
+
+    @staticmethod
+    def create_link_bag(clock):
+        """
+            :param clock: function returning the decay clock time (memory's CycleClock)
+            :return: empty Bag for a concept's links. In lazy decay mode, the links decay with the working cycle
+                like the concepts do, without the bag being touched.
+        """
+        return NARSDataStructures.Bag.Bag(item_type=Concept,
+                                          capacity=Config.CONCEPT_LINK_CAPACITY,
+                                          lazy_decay=Config.BAG_LAZY_DECAY,
+                                          decay_rate=Config.BAG_LAZY_DECAY_RATE,
+                                          clock=clock)
 
     def __str__(self):
         return self.get_term_string()
@@ -526,6 +600,18 @@ class Concept:
     def __eq__(self, other):
         return self.get_term_string() == other.get_formatted_string()
 
+    def __getattr__(self, name):
+        """
+            Only called for attributes the Concept does not have:
+            the tables and links of a cold concept are loaded from its store the first time they are used
+        """
+        if self.cold_store is None or name not in Concept.COLD_ATTRIBUTES: raise AttributeError(name)
+        self.cold_store.load(self)
+        return self.__dict__[name]
+
+    def is_cold(self):
+        return self.cold_store is not None
+
     def get_term(self):
         return self.term
 
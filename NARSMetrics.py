@@ -0,0 +1,199 @@
+import bisect
+import timeit as time
+
+"""
+    Author: Christian Hahm
+    Created: October 18, 2026
+    Purpose: Opt-in counters, histograms and timers for instrumenting NARS.
+        Instrumented code checks Global.Global.metrics first, so when metrics are disabled (None)
+        each instrumentation point costs a single attribute lookup.
+"""
+
+# upper bounds, in seconds, of the default histogram buckets (Prometheus style, each also counts smaller values)
+DEFAULT_BUCKETS = (0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005,
+                   0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+
+
+def get_label_key(labels):
+    """
+        :param labels: dict of label names to values, or None
+        :return: hashable, order-independent key for the labels
+    """
+    if not labels: return ()
+    return tuple(sorted((name, str(value)) for name, value in labels.items()))
+
+
+def format_labels(label_key, extra_label=None):
+    """
+        :return: Prometheus label string, e.g. {phase="input"}, or "" if there are no labels
+    """
+    labels = list(label_key)
+    if extra_label is not None: labels.append(extra_label)
+    if len(labels) == 0: return ""
+    return "{" + ",".join(name + '="' + value.replace("\\", "\\\\").replace('"', '\\"') + '"'
+                          for name, value in labels) + "}"
+
+
+class Histogram:
+    """
+        Counts of observed values in buckets, with their sum and total count
+    """
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.bucket_counts = [0] * (len(buckets) + 1)  # the last bucket holds values above the largest bound
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.bucket_counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def get_cumulative_counts(self):
+        """
+            :return: list of (upper bound, count of values <= upper bound), ending with (inf, total count)
+        """
+        cumulative_counts = []
+        running_count = 0
+        for upper_bound, bucket_count in zip(self.buckets + (float("inf"),), self.bucket_counts):
+            running_count += bucket_count
+            cumulative_counts.append((upper_bound, running_count))
+        return cumulative_counts
+
+    def get_quantile(self, quantile):
+        """
+            :return: upper bound of the bucket holding the given quantile of observations, or None if there are none
+        """
+        if self.count == 0: return None
+        for upper_bound, running_count in self.get_cumulative_counts():
+            if running_count >= quantile * self.count: return upper_bound
+
+
+class Timer:
+    """
+        Context manager which observes the seconds spent in its block into a histogram
+    """
+
+    def __init__(self, histogram):
+        self.histogram = histogram
+        self.begin_time = None
+
+    def __enter__(self):
+        self.begin_time = time.default_timer()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.histogram.observe(time.default_timer() - self.begin_time)
+        return False
+
+
+class MetricsRegistry:
+    """
+        Named counters and histograms, each split by a set of labels (e.g. the inference rule or cycle phase).
+    """
+
+    def __init__(self):
+        self.counters = {}  # name -> {label key: value}
+        self.histograms = {}  # name -> {label key: Histogram}
+        self.descriptions = {}  # name -> help text
+
+    def describe(self, name, description):
+        self.descriptions[name] = description
+
+    def increment(self, name, labels=None, amount=1):
+        """
+            Add to a counter
+
+            :param name: counter name
+            :param labels: optional dict of label names to values
+            :param amount: amount to add
+        """
+        counter = self.counters.setdefault(name, {})
+        label_key = get_label_key(labels)
+        counter[label_key] = counter.get(label_key, 0) + amount
+
+    def get_histogram(self, name, labels=None, buckets=DEFAULT_BUCKETS):
+        """
+            :return: the histogram with the given name and labels, created if necessary
+        """
+        histograms = self.histograms.setdefault(name, {})
+        label_key = get_label_key(labels)
+        histogram = histograms.get(label_key, None)
+        if histogram is None:
+            histogram = Histogram(buckets)
+            histograms[label_key] = histogram
+        return histogram
+
+    def observe(self, name, value, labels=None):
+        """
+            Add an observed value (e.g. a duration in seconds) to a histogram
+        """
+        self.get_histogram(name, labels).observe(value)
+
+    def timer(self, name, labels=None):
+        """
+            :return: context manager which observes the seconds spent in its block into a histogram
+        """
+        return Timer(self.get_histogram(name, labels))
+
+    def get_counter_value(self, name, labels=None):
+        return self.counters.get(name, {}).get(get_label_key(labels), 0)
+
+    def reset(self):
+        self.counters.clear()
+        self.histograms.clear()
+
+    def to_dict(self):
+        """
+            :return: JSON-serializable dict of every metric
+                {"counters": {name: [{"labels": {...}, "value": n}]},
+                 "histograms": {name: [{"labels": {...}, "count": n, "sum": s, "p50": .., "p99": .., "buckets": [[bound, n]]}]}}
+        """
+        return {"counters": {name: [{"labels": dict(label_key), "value": value}
+                                    for label_key, value in counter.items()]
+                             for name, counter in self.counters.items()},
+                "histograms": {name: [{"labels": dict(label_key),
+                                       "count": histogram.count,
+                                       "sum": histogram.sum,
+                                       "p50": histogram.get_quantile(0.5),
+                                       "p99": histogram.get_quantile(0.99),
+                                       "buckets": [[upper_bound, count]
+                                                   for upper_bound, count in histogram.get_cumulative_counts()[:-1]]}
+                                      for label_key, histogram in histograms.items()]
+                               for name, histograms in self.histograms.items()}}
+
+    def to_prometheus_text(self):
+        """
+            :return: the metrics in the Prometheus text exposition format
+        """
+        lines = []
+        for name, counter in sorted(self.counters.items()):
+            if name in self.descriptions: lines.append("# HELP " + name + " " + self.descriptions[name])
+            lines.append("# TYPE " + name + " counter")
+            for label_key, value in sorted(counter.items()):
+                lines.append(name + format_labels(label_key) + " " + str(value))
+        for name, histograms in sorted(self.histograms.items()):
+            if name in self.descriptions: lines.append("# HELP " + name + " " + self.descriptions[name])
+            lines.append("# TYPE " + name + " histogram")
+            for label_key, histogram in sorted(histograms.items()):
+                for upper_bound, count in histogram.get_cumulative_counts():
+                    bound_string = "+Inf" if upper_bound == float("inf") else repr(upper_bound)
+                    lines.append(name + "_bucket" + format_labels(label_key, ("le", bound_string)) + " " + str(count))
+                lines.append(name + "_sum" + format_labels(label_key) + " " + repr(histogram.sum))
+                lines.append(name + "_count" + format_labels(label_key) + " " + str(histogram.count))
+        return "\n".join(lines) + "\n"
+
+
+def create_nars_registry():
+    """
+        :return: MetricsRegistry with descriptions of the metrics NARS records
+    """
+    registry = MetricsRegistry()
+    registry.describe("nars_cycle_phase_seconds", "Seconds spent in each phase of the working cycle")
+    registry.describe("nars_task_seconds", "Seconds spent processing a task, by punctuation")
+    registry.describe("nars_two_premise_inference_seconds", "Seconds spent in two-premise inference, by premise types")
+    registry.describe("nars_inference_rule_fired_total", "Sentences derived by two-premise inference, by rule")
+    registry.describe("nars_container_operations_total", "Items put into, taken from or sampled from item containers")
+    registry.describe("nars_container_purged_total", "Items purged from full bags and buffers")
+    return registry
@@ -0,0 +1,279 @@
+import collections
+import multiprocessing
+import random
+import zlib
+
+import Config
+import Global
+import InputChannel
+import NALGrammar
+import NARSDataStructures.Buffers
+import NARSDataStructures.ItemContainers
+import NARSDataStructures.Other
+import NARSInferencePool
+
+"""
+    Author: Christian Hahm
+    Created: October 18, 2026
+    Purpose: Runs one NARS as several shards in separate processes, with the statement concepts partitioned between them
+"""
+
+STAMP_ID_RANGE = 10 ** 12  # each shard hands out Stamp IDs from its own range, so evidence stays distinct across shards
+
+
+def get_shard_index(term, shard_count):
+    """
+        :return: index of the shard owning the concept named by a term.
+            Term IDs are only dense counters within a process, so the term's string is hashed instead.
+    """
+    return zlib.crc32(term.get_term_string().encode("utf-8")) % shard_count
+
+
+class ShardBuffer(NARSDataStructures.Buffers.Buffer):
+    """
+        Global buffer of a shard. Tasks whose statement concept is owned by another shard are put in the shard's outbox
+        (to be sent to their owner) instead of being processed here.
+    """
+
+    def __init__(self, shard, item_type, capacity):
+        self.shard = shard
+        NARSDataStructures.Buffers.Buffer.__init__(self, item_type=item_type, capacity=capacity)
+
+    def PUT_NEW(self, object):
+        owner = get_shard_index(object.sentence.statement, self.shard.shard_count)
+        if owner != self.shard.shard_index:
+            self.shard.outbox.append((owner, NARSInferencePool.encode_sentence(object.sentence)))
+            return None
+        return NARSDataStructures.Buffers.Buffer.PUT_NEW(self, object)
+
+
+class Shard:
+    """
+        The NARS in one shard process.
+
+        Its memory also has concepts for statements owned by other shards, when they are subterms of its own statements.
+        It asks their owners for their best beliefs, a few concepts per cycle, and keeps copies in those concepts' belief tables.
+    """
+
+    def __init__(self, nars, shard_index, shard_count):
+        self.nars = nars
+        self.shard_index = shard_index
+        self.shard_count = shard_count
+        self.outbox = []  # (owner shard index, encoded task sentence)
+        self.belief_request_queue = collections.deque()  # terms of other shards' concepts, to ask for beliefs
+        self.remote_belief_ids = {}  # concept key -> Stamp ID of the copy of its owner's best belief, in its belief table
+        nars.memory.next_stamp_id += shard_index * STAMP_ID_RANGE
+        nars.global_buffer = ShardBuffer(self, item_type=NARSDataStructures.Other.Task,
+                                         capacity=Config.GLOBAL_BUFFER_CAPACITY)
+
+    def is_owned(self, term):
+        return get_shard_index(term, self.shard_count) == self.shard_index
+
+    def do_working_cycle(self, message):
+        """
+            :param message: dict of the "lines", "tasks", "belief_requests" and "beliefs" sent to this shard
+            :return: dict of the "outputs" of the cycle, and the "tasks", "belief_requests" and "beliefs" to send on
+        """
+        InputChannel.input_lines(message["lines"])
+        for encoded_sentence in message["tasks"]:
+            sentence = NARSInferencePool.decode_sentence_with_evidence(encoded_sentence)
+            self.nars.global_buffer.PUT_NEW(NARSDataStructures.Other.Task(sentence))
+        for encoded_belief in message["beliefs"]:
+            self.store_remote_belief(NARSInferencePool.decode_sentence_with_evidence(encoded_belief))
+
+        self.nars.do_working_cycle()
+
+        beliefs = [(requester, self.get_encoded_belief(encoded_term))
+                   for (requester, encoded_term) in message["belief_requests"]]
+        reply = {"outputs": list(Global.Global.output_log),
+                 "tasks": self.outbox,
+                 "belief_requests": self.get_belief_requests(),
+                 "beliefs": [(requester, encoded_belief) for (requester, encoded_belief) in beliefs
+                             if encoded_belief is not None]}
+        Global.Global.output_log.clear()
+        self.outbox = []
+        return reply
+
+    def get_encoded_belief(self, encoded_term):
+        """
+            :return: the best belief of one of this shard's concepts in compact form, or None if it has none
+        """
+        term = NARSInferencePool.decode_term(encoded_term)
+        concept_item = self.nars.memory.concepts_bag.peek(NARSDataStructures.ItemContainers.Item.get_key_from_object(term))
+        if concept_item is None: return None
+        belief = concept_item.object.belief_table.peek()
+        if belief is None or not NARSInferencePool.is_encodable(belief.statement): return None
+        return NARSInferencePool.encode_sentence(belief)
+
+    def store_remote_belief(self, belief):
+        """
+            Replace the copy of another shard's best belief in the local concept for its statement.
+            The concept's other beliefs stay.
+
+            The copy is inserted as it is, never revised with the local beliefs: the owner has already revised it
+            with the beliefs it knows of, and a revision made here could be sent back to the owner
+            and count the same evidence twice.
+        """
+        key = NARSDataStructures.ItemContainers.Item.get_key_from_object(belief.statement)
+        previous_stamp_id = self.remote_belief_ids.get(key, None)
+        if previous_stamp_id == belief.stamp.id: return  # the copy is up to date
+        belief_table = self.nars.memory.peek_concept(belief.statement).belief_table
+        for (sentence, _) in list(belief_table):
+            if sentence.stamp.id == previous_stamp_id: belief_table.remove(sentence)
+        belief_table.insert_object(belief, belief.get_present_value().confidence)
+        if len(belief_table) > belief_table.capacity: belief_table.extract_min()
+        self.remote_belief_ids[key] = belief.stamp.id
+
+    def get_belief_requests(self):
+        """
+            :return: (owner shard index, encoded term) of the next other shards' concepts to refresh the beliefs of
+        """
+        if len(self.belief_request_queue) == 0:
+            self.belief_request_queue.extend([item.object.term for item in self.nars.memory.concepts_bag
+                                              if not isinstance(item.object.term, NALGrammar.Terms.AtomicTerm)
+                                              and not self.is_owned(item.object.term)
+                                              and NARSInferencePool.is_encodable(item.object.term)])
+        belief_requests = []
+        while len(self.belief_request_queue) > 0 and len(belief_requests) < Config.SHARD_BELIEF_REQUESTS_PER_CYCLE:
+            term = self.belief_request_queue.popleft()
+            belief_requests.append((get_shard_index(term, self.shard_count), NARSInferencePool.encode_term(term)))
+        return belief_requests
+
+
+def run_shard(shard_index, shard_count, connection, config_values, seed):
+    """
+        Main loop of a shard process: serve the commands of the ShardedNARS until it says "stop"
+    """
+    NARSInferencePool.initialize_worker(config_values)
+    if seed is not None: random.seed(seed + shard_index)
+    shard = Shard(Global.Global.NARS, shard_index, shard_count)
+    while True:
+        command, data = connection.recv()
+        if command == "cycle":
+            connection.send(shard.do_working_cycle(data))
+        elif command == "belief":
+            connection.send(shard.get_encoded_belief(data))
+        elif command == "concepts":
+            connection.send([str(item.key) for item in shard.nars.memory.concepts_bag
+                             if shard.is_owned(item.object.term)])
+        elif command == "stop":
+            connection.close()
+            return
+
+
+class ShardedNARS:
+    """
+        Partitions the statement concepts of one NARS across shard processes, by a hash of the statement term.
+
+        Every working cycle runs on all shards at once, in lockstep. Between cycles this process routes:
+            input lines to the shard owning their statement (lines that are not sentences, like commands, go to every shard),
+            tasks derived in one shard to the shard owning their statement,
+            requests for the beliefs of another shard's concepts, and the replies.
+        A task reaches its owner the cycle after it was derived; a belief reply two cycles after it was asked for.
+    """
+
+    def __init__(self, shard_count, seed=None):
+        """
+            :param shard_count: number of shard processes
+            :param seed: optional random seed, for repeatable runs (each shard seeds with seed + its index)
+        """
+        self.shard_count = shard_count
+        self.next_messages = self.get_empty_messages()
+        context = multiprocessing.get_context("spawn")
+        self.connections = []
+        self.processes = []
+        config_values = NARSInferencePool.get_config_values()
+        for shard_index in range(shard_count):
+            connection, shard_connection = context.Pipe()
+            process = context.Process(target=run_shard,
+                                      args=(shard_index, shard_count, shard_connection, config_values, seed),
+                                      daemon=True)
+            process.start()
+            self.connections.append(connection)
+            self.processes.append(process)
+
+    def get_empty_messages(self):
+        return [{"lines": [], "tasks": [], "belief_requests": [], "beliefs": []} for _ in range(self.shard_count)]
+
+    def get_owner(self, term):
+        return get_shard_index(term, self.shard_count)
+
+    def input_lines(self, lines):
+        """
+            Send lines of input to their shards at the start of the next working cycle
+        """
+        for line in lines:
+            line = line.strip()
+            if len(line) == 0 or line.startswith("//"): continue
+            try:
+                statement = NALGrammar.Sentences.get_statement_from_string(line.replace(" ", ""))
+            except AssertionError:
+                for messages in self.next_messages: messages["lines"].append(line)
+                continue
+            self.next_messages[self.get_owner(statement)]["lines"].append(line)
+
+    def do_working_cycle(self):
+        """
+            Run one working cycle on every shard
+            :return: the outputs of the cycle, in shard order
+        """
+        messages = self.next_messages
+        self.next_messages = self.get_empty_messages()
+        for connection, message in zip(self.connections, messages):
+            connection.send(("cycle", message))
+
+        outputs = []
+        for shard_index, connection in enumerate(self.connections):
+            reply = connection.recv()
+            outputs.extend(reply["outputs"])
+            for (owner, encoded_sentence) in reply["tasks"]:
+                self.next_messages[owner]["tasks"].append(encoded_sentence)
+            for (owner, encoded_term) in reply["belief_requests"]:
+                self.next_messages[owner]["belief_requests"].append((shard_index, encoded_term))
+            for (requester, encoded_belief) in reply["beliefs"]:
+                self.next_messages[requester]["beliefs"].append(encoded_belief)
+        return outputs
+
+    def run_headless(self, input_lines=(), cycles=100, until=None, lines_per_cycle=None):
+        """
+            Like NARS.run_headless, on the shards
+
+            :return: list of the output messages produced by all the shards during the run
+        """
+        outputs = []
+        input_lines = iter(input_lines)
+        if lines_per_cycle is None: self.input_lines(input_lines)
+        for _ in range(cycles):
+            if lines_per_cycle is not None: self.input_lines([line for (_, line) in zip(range(lines_per_cycle), input_lines)])
+            outputs.extend(self.do_working_cycle())
+            if until is not None and until(outputs): break
+        return outputs
+
+    def get_belief(self, statement):
+        """
+            :param statement: statement Term
+            :return: formatted string of the best belief about the statement in its owner shard, or None if there is none
+        """
+        connection = self.connections[self.get_owner(statement)]
+        connection.send(("belief", NARSInferencePool.encode_term(statement)))
+        encoded_belief = connection.recv()
+        if encoded_belief is None: return None
+        punctuation, _, frequency, confidence, _, _, _ = encoded_belief
+        return statement.get_term_string() + punctuation \
+               + " " + NALGrammar.Values.TruthValue(frequency, confidence).get_formatted_string()
+
+    def get_shard_concepts(self):
+        """
+            :return: for each shard, the keys of the concepts it owns
+        """
+        for connection in self.connections:
+            connection.send(("concepts", None))
+        return [connection.recv() for connection in self.connections]
+
+    def close(self):
+        for connection, process in zip(self.connections, self.processes):
+            connection.send(("stop", None))
+            connection.close()
+            process.join()
+        self.connections = []
+        self.processes = []
@@ -0,0 +1,184 @@
+import argparse
+import json
+import platform
+import random
+import sys
+import timeit as time
+import tracemalloc
+
+import numpy as np
+
+import Config
+import Global
+import InputChannel
+import NALGrammar
+import NARS
+import NARSDataStructures.ItemContainers
+import NARSDataStructures.Other
+
+"""
+    Author: Christian Hahm
+    Created: October 18, 2026
+    Purpose: Measures working cycle throughput and latency on canned workloads, and reports them as JSON.
+        Usage: python Benchmark.py [--cycles N] [--workloads name,...] [--output results.json]
+        Also reports the bytes held by each stored belief and each buffered task.
+"""
+
+SEED = 7
+MEMORY_SAMPLE_SIZE = 10000  # beliefs and tasks created to measure their size
+CYCLE_PHASES = ("input", "global_buffer", "consider", "operations", "maintenance")
+
+
+def syllogistic_chains_workload(cycles):
+    """
+        Chains of inheritance judgments (a0-->a1), (a1-->a2), ... with questions about their ends,
+        as in the inference engine tests
+    """
+    lines = []
+    for chain in range(max(1, cycles // 20)):
+        terms = ["c" + str(chain) + "_" + str(i) for i in range(random.randint(3, 6))]
+        for subject, predicate in zip(terms, terms[1:]):
+            lines.append("(" + subject + "-->" + predicate + "). %" + str(random.choice([0.9, 1.0])) + ";0.9%")
+        lines.append("(" + terms[0] + "-->" + terms[-1] + ")?")
+    return lines, None
+
+
+def goal_operation_workload(cycles):
+    """
+        Each cycle, a state event and a goal to execute an operation in that state
+    """
+    lines = []
+    for _ in range(cycles):
+        state = random.randint(0, 2)
+        lines.append("(s" + str(state) + "-->seen). :|:")
+        lines.append("(&/,(s" + str(state) + "-->seen),((*,{SELF})-->op" + str(state) + "))! :|:")
+    return lines, 2
+
+
+def vision_workload(cycles):
+    """
+        A new synthetic image every 10 cycles, with a label event
+    """
+    def image_lines():
+        for cycle in range(cycles):
+            if cycle % 10 == 0:
+                image = np.random.randint(0, 256, size=Config.VISION_DIMENSIONS).astype(np.uint8)
+                InputChannel.queue_visual_sensory_image_array(image)
+                yield "(image" + str(cycle // 10 % 5) + "-->seen). :|:"
+            else:
+                yield "//"  # nothing new this cycle
+    return image_lines(), 1
+
+
+WORKLOADS = {"syllogistic_chains": syllogistic_chains_workload,
+             "goal_operation": goal_operation_workload,
+             "vision": vision_workload}
+
+
+def run_workload(workload, cycles, measure_memory=False):
+    """
+        Run a workload on a new NARS
+
+        :return: (per-cycle latencies in seconds, dict of seconds per cycle phase, NARS, traced memory growth in bytes,
+            number of sentences created)
+    """
+    random.seed(SEED)
+    np.random.seed(SEED)
+    nars = NARS.NARS()
+    Global.Global.NARS = nars
+    InputChannel.pended_input_data_queue.clear()
+    first_stamp_id = nars.memory.next_stamp_id
+    lines, lines_per_cycle = WORKLOADS[workload](cycles)
+
+    nars.cycle_phase_times = {phase: 0.0 for phase in CYCLE_PHASES}
+    latencies = []
+    if measure_memory: tracemalloc.start()
+    memory_before = tracemalloc.get_traced_memory()[0] if measure_memory else 0
+
+    def measure_cycle(outputs):
+        latencies.append(time.default_timer() - nars.cycle_begin_time)
+        return False
+
+    nars.run_headless(lines, cycles=cycles, until=measure_cycle, lines_per_cycle=lines_per_cycle)
+
+    memory_growth = None
+    if measure_memory:
+        memory_growth = tracemalloc.get_traced_memory()[0] - memory_before
+        tracemalloc.stop()
+    return latencies, nars.cycle_phase_times, nars, memory_growth, nars.memory.next_stamp_id - first_stamp_id
+
+
+def benchmark_workload(workload, cycles):
+    latencies, phase_times, nars, _, sentences_created = run_workload(workload, cycles)
+    # tracing allocations slows NARS down, so memory is measured in a separate run of the same workload
+    _, _, _, memory_growth, _ = run_workload(workload, cycles, measure_memory=True)
+
+    total_time = sum(latencies)
+    return {"cycles": len(latencies),
+            "cycles_per_second": len(latencies) / total_time,
+            "latency_p50_ms": 1000 * float(np.percentile(latencies, 50)),
+            "latency_p99_ms": 1000 * float(np.percentile(latencies, 99)),
+            "phase_seconds": phase_times,
+            "phase_fraction": {phase: seconds / total_time for phase, seconds in phase_times.items()},
+            "memory_growth_bytes": memory_growth,
+            "memory_growth_bytes_per_cycle": memory_growth / len(latencies),
+            "sentences_created_per_cycle": sentences_created / len(latencies),
+            "concepts": len(nars.memory)}
+
+
+def measure_object_memory(count=MEMORY_SAMPLE_SIZE):
+    """
+        Measure the bytes held by a stored belief (Judgment with its Stamp, evidential base and truth-value)
+        and by a buffered task (Task in an Item with its Budget, for a belief created beforehand).
+        Statement terms are created before measuring, since they are shared.
+
+        :return: dict of bytes per belief and bytes per task
+    """
+    NARS.NARS()
+    statements = [NALGrammar.Terms.from_string("(b" + str(i) + "-->c)") for i in range(count)]
+
+    def measure(create_object):
+        tracemalloc.start()
+        memory_before = tracemalloc.get_traced_memory()[0]
+        objects = [create_object(i) for i in range(count)]
+        bytes_per_object = (tracemalloc.get_traced_memory()[0] - memory_before) / count
+        tracemalloc.stop()
+        return bytes_per_object, objects
+
+    bytes_per_belief, beliefs = measure(lambda i: NALGrammar.Sentences.Judgment(statements[i],
+                                                                                NALGrammar.Values.TruthValue(0.9, 0.9)))
+    bytes_per_task, _ = measure(lambda i: NARSDataStructures.ItemContainers.Item(NARSDataStructures.Other.Task(beliefs[i]), i))
+    return {"bytes_per_belief": bytes_per_belief,
+            "bytes_per_task": bytes_per_task}
+
+
+def main(arguments=None):
+    parser = argparse.ArgumentParser(description="NARS working cycle benchmark")
+    parser.add_argument("--cycles", type=int, default=200, help="working cycles per workload")
+    parser.add_argument("--workloads", default=",".join(WORKLOADS), help="comma-separated workloads to run")
+    parser.add_argument("--output", default=None, help="JSON file to write the results to (default: print them)")
+    arguments = parser.parse_args(arguments)
+
+    results = {"python": sys.version.split()[0],
+               "platform": platform.platform(),
+               "seed": SEED,
+               "workloads": {}}
+    for workload in arguments.workloads.split(","):
+        assert workload in WORKLOADS, "ERROR: Unknown workload " + workload + ", choose from " + str(list(WORKLOADS))
+        results["workloads"][workload] = benchmark_workload(workload, arguments.cycles)
+    results["object_memory"] = measure_object_memory()
+
+    results_json = json.dumps(results, indent=2)
+    if arguments.output is None:
+        print(results_json)
+    else:
+        with open(arguments.output, "w") as file:
+            file.write(results_json)
+    return results
+
+
+if __name__ == "__main__":
+    Config.DEBUG = False
+    Config.GUI_USE_INTERFACE = False
+    Config.SILENT_MODE = True
+    main()
@@ -1,11 +1,22 @@
+import json
+import os
+import pickle
 import random
+import tempfile
 
+import numpy as np
+
+import Config
 import Global
 import NARSDataStructures
+import NARSDataStructures.BagSnapshot
+import NARSDataStructures.ConceptStore
 import NALGrammar
 import NALSyntax
 import NARS
+import NARSJournal
 import NARSMemory
+import NARSMetrics
 
 """
     Author: Christian Hahm
@@ -232,6 +243,385 @@ def test_bag_priority_changing():
             (priority, expected_values[key]))
 
 
+def test_bag_sparse_buckets():
+    """
+        Test if the bag only keeps buckets for the priority levels that hold items
+    """
+    bag = NARSDataStructures.Bag.Bag(item_type=NALGrammar.Sentences.Sentence, capacity=10, granularity=100)
+    item1 = bag.PUT_NEW(NALGrammar.Sentences.new_sentence_from_string("(a-->b)."))
+    item2 = bag.PUT_NEW(NALGrammar.Sentences.new_sentence_from_string("(a-->b)."))
+    bag.change_priority(item1.key, 0.25)
+    bag.change_priority(item2.key, 0.75)
+    assert sorted(bag.priority_buckets.keys()) == [25, 75], "TEST FAILURE: Bag kept buckets for empty priority levels"
+
+    bag.change_priority(item1.key, 0.75)
+    assert sorted(bag.priority_buckets.keys()) == [75], "TEST FAILURE: Bag did not drop a bucket when it emptied"
+    assert bag.peek() in (item1, item2), "TEST FAILURE: Bag could not peek from its only bucket"
+
+    bag.TAKE_USING_KEY(item1.key)
+    bag.TAKE_USING_KEY(item2.key)
+    assert len(bag.priority_buckets) == 0 and len(bag.quality_buckets) == 0, \
+        "TEST FAILURE: Empty bag still holds buckets"
+
+
+def test_bag_bucket_slots():
+    """
+        Test if items keep pointing at their own bucket slots while priorities change and items are removed
+    """
+    bag = NARSDataStructures.Bag.Bag(item_type=NALGrammar.Sentences.Sentence, capacity=50, granularity=10)
+    items = [bag.PUT_NEW(NALGrammar.Sentences.new_sentence_from_string("(a-->b).")) for _ in range(50)]
+    for i in range(200):
+        item = random.choice(items)
+        if i % 10 == 0:
+            bag.TAKE_USING_KEY(item.key)
+            items.remove(item)
+        else:
+            bag.change_priority(item.key, random.random())
+
+    for item in items:
+        assert bag.priority_buckets[item.bucket_num][item.bucket_slot] is item, \
+            "TEST FAILURE: Item is not in its priority bucket slot"
+        assert bag.quality_buckets[item.quality_bucket_num][item.quality_bucket_slot] is item, \
+            "TEST FAILURE: Item is not in its quality bucket slot"
+    assert sum(len(bucket) for bucket in bag.priority_buckets.values()) == len(bag), \
+        "TEST FAILURE: Priority buckets do not hold exactly the items in the bag"
+
+
+def test_bag_lazy_decay():
+    """
+        Test if a lazily decaying bag defers moving decayed items until they are sampled or swept
+    """
+    bag = NARSDataStructures.Bag.Bag(item_type=NALGrammar.Sentences.Sentence, capacity=10, granularity=100,
+                                     lazy_decay=True, decay_rate=0.5)
+    item1 = bag.PUT_NEW(NALGrammar.Sentences.new_sentence_from_string("(a-->b)."))
+    item2 = bag.PUT_NEW(NALGrammar.Sentences.new_sentence_from_string("(a-->b)."))
+    bag.change_priority(item1.key, 0.8)
+    bag.change_priority(item2.key, 0.8)
+
+    bag.decay_item(item1.key, multiplier=0.5)
+    assert item1.budget.get_priority() == 0.4, "TEST FAILURE: Decay did not change the item's priority"
+    assert item1.bucket_num == 80, "TEST FAILURE: Lazy decay moved the item before it was sampled"
+
+    bag.advance_decay_clock(ticks=2)
+    assert item2.budget.get_decayed_priority(bag.decay_clock) == 0.2, "TEST FAILURE: Decay clock did not decay the item"
+    assert item2.bucket_num == 80, "TEST FAILURE: Decay clock moved the item before it was sampled"
+
+    item = bag.peek()
+    assert item.bucket_num == bag.calc_bucket_num_from_value(item.budget.get_priority()), \
+        "TEST FAILURE: Peeked item was not moved to the bucket for its decayed priority"
+
+    bag.sweep_decay()
+    assert (item1.bucket_num, item2.bucket_num) == (10, 20), "TEST FAILURE: Sweep did not move the decayed items " + str(
+        (item1.bucket_num, item2.bucket_num))
+
+
+def test_bag_lazy_decay_with_working_cycle():
+    """
+        Test if memory's concepts and concept links decay with the working cycle in lazy decay mode
+    """
+    lazy_decay = Config.BAG_LAZY_DECAY
+    Config.BAG_LAZY_DECAY = True
+    try:
+        nars = NARS.NARS()
+        concept_item = nars.memory.peek_concept_item(NALGrammar.Terms.from_string("(a-->b)"))
+        link_bag = concept_item.object.prediction_links
+        link_item = link_bag.PUT_NEW(nars.memory.peek_concept(NALGrammar.Terms.from_string("(c-->d)")))
+        link_priority = link_item.budget.get_priority()
+
+        nars.run_headless(cycles=5)
+    finally:
+        Config.BAG_LAZY_DECAY = lazy_decay
+    assert nars.memory.concepts_bag.decay_clock == 5 and link_bag.decay_clock == 5, \
+        "TEST FAILURE: Working cycle did not move the decay clocks"
+    expected_priority = link_priority * Config.BAG_LAZY_DECAY_RATE ** 5
+    assert abs(link_item.budget.get_decayed_priority(link_bag.decay_clock) - expected_priority) < 1e-9, \
+        "TEST FAILURE: Concept link did not decay with the working cycle"
+
+    writer = NARSDataStructures.BagSnapshot.BagSnapshotWriter()
+    try:
+        reader = NARSDataStructures.BagSnapshot.BagSnapshotReader(writer.publish(link_bag))
+        snapshot = reader.read()
+        assert abs(snapshot.priorities[0] - expected_priority) < 1e-6, "TEST FAILURE: Snapshot priority was not decayed"
+        snapshot.release()
+        reader.close()
+    finally:
+        writer.close()
+
+    class MemoryCheckingPickler(pickle.Pickler):
+        def persistent_id(self, object):
+            assert not isinstance(object, NARSMemory.Memory), "TEST FAILURE: Pickling a link bag pickled its Memory"
+            return None
+
+    MemoryCheckingPickler(tempfile.TemporaryFile()).dump(link_bag)
+
+
+def test_bag_peek_distribution():
+    """
+        Test if probabilistic peeking selects buckets with the same distribution as
+        walking the buckets from a random level, entering each non-empty bucket with probability (level + 1) / granularity
+    """
+    granularity = 100
+    bag = NARSDataStructures.Bag.Bag(item_type=NALGrammar.Sentences.Sentence, capacity=10, granularity=granularity)
+    priorities = [0.015, 0.055, 0.505, 0.985, 0.995]
+    for p in priorities:
+        item = bag.PUT_NEW(NALGrammar.Sentences.new_sentence_from_string("(a-->b)."))
+        bag.change_priority(item.key, p)
+    levels = [bag.calc_bucket_num_from_value(p) for p in priorities]
+
+    # exact distribution of the bucket walk, summed over every starting level
+    expected_probabilities = {level: 0.0 for level in levels}
+    for start_level in range(granularity):
+        not_yet_selected = 1.0
+        for offset in range(granularity):
+            level = (start_level + offset) % granularity
+            if level in expected_probabilities:
+                acceptance = (level + 1) / granularity
+                expected_probabilities[level] += not_yet_selected * acceptance / granularity
+                not_yet_selected *= 1 - acceptance
+
+    random.seed(1)
+    samples = 100000
+    counts = {level: 0 for level in levels}
+    for _ in range(samples):
+        counts[bag.peek().bucket_num] += 1
+
+    chi_squared = sum((counts[level] - samples * expected_probabilities[level]) ** 2
+                      / (samples * expected_probabilities[level]) for level in levels)
+    critical_value = 18.467  # 4 degrees of freedom, p = 0.001
+    assert chi_squared < critical_value, "TEST FAILURE: Bag peek distribution differs from the bucket walk " + str(
+        (counts, expected_probabilities))
+
+
+def test_bucket_sampling_index_single_level():
+    """
+        Test if the bucket sampling index samples the only occupied level
+    """
+    index = NARSDataStructures.Bag.BucketSamplingIndex(granularity=10000)
+    for level in (9999, 0, 4321):
+        index.set_occupied(level)
+
+    index.set_empty(9999)
+    index.set_empty(0)
+    assert index.sample_level() == 4321, "TEST FAILURE: Only occupied level was not sampled"
+    index.set_empty(4321)
+    index.set_occupied(9999)
+    assert index.sample_level() == 9999, "TEST FAILURE: Only occupied top level was not sampled"
+
+
+def test_value_formatting_is_lazy():
+    """
+        Test if truth-values and desire-values build their formatted string only when first printed, and keep it
+    """
+    for value in (NALGrammar.Values.TruthValue(0.9, 0.5), NALGrammar.Values.DesireValue(0.2, 0.8)):
+        assert value.formatted_string is None, "TEST FAILURE: Value was formatted before it was printed"
+        formatted_string = value.get_formatted_string()
+        assert value.get_formatted_string() is formatted_string, "TEST FAILURE: Value was formatted twice"
+
+
+def test_gui_update_batching():
+    """
+        Test if the GUI update batcher sends only the net changes to each data structure
+    """
+    batcher = Global.GUIUpdateBatcher(updates_per_second=1)
+    bag = NARSDataStructures.Bag.Bag(item_type=NALGrammar.Sentences.Sentence, capacity=10)
+    data_structure_info = (str(bag), type(bag).__name__)
+    items = [bag.PUT_NEW(NALGrammar.Sentences.new_sentence_from_string("(a" + str(i) + "-->b). %1.0;0.9%"))
+             for i in range(3)]
+    strings = [str(item) for item in items]
+
+    batcher.add(strings[0], data_structure_info, 1)
+    batcher.add(strings[1], data_structure_info, 2)
+    batcher.remove(strings[1], data_structure_info, 1)  # added and removed in the same window
+    assert len(batcher) == 1, "TEST FAILURE: Item added and removed in the same window was not dropped"
+    assert batcher.flush() == [("batch", ([], [strings[0]]), data_structure_info, 1)], \
+        "TEST FAILURE: Wrong batch sent"
+    assert batcher.flush() == [], "TEST FAILURE: Batcher flushed more often than its rate"
+
+    items[0].budget.set_priority(0.1)
+    changed_string = str(items[0])
+    batcher.remove(strings[0], data_structure_info, 0)
+    batcher.add(changed_string, data_structure_info, 1)
+    batcher.add(strings[2], data_structure_info, 2)
+    assert batcher.flush(force=True) == [("batch", ([strings[0]], [changed_string, strings[2]]), data_structure_info, 2)], \
+        "TEST FAILURE: Changed item was not sent as one remove and one add"
+
+    batcher.add(strings[1], data_structure_info, 3)
+    batcher.discard(type(bag).__name__)
+    assert batcher.flush(force=True) == [], "TEST FAILURE: Updates to a cleared data structure were sent"
+
+
+def test_bag_snapshot():
+    """
+        Test if a snapshot of the concepts bag published to shared memory can be read back from it
+    """
+    memory = NARSMemory.Memory()
+    for i in range(20):
+        memory.conceptualize_term(NALGrammar.Terms.from_string("(a" + str(i) + "-->b)"))
+    writer = NARSDataStructures.BagSnapshot.BagSnapshotWriter()
+    try:
+        snapshot_name = writer.publish(memory.concepts_bag)
+        reader = NARSDataStructures.BagSnapshot.BagSnapshotReader(snapshot_name)
+        snapshot = reader.read()
+        items = list(memory.concepts_bag)
+        assert len(snapshot) == len(items), "TEST FAILURE: Snapshot has the wrong number of items"
+        for i, item in enumerate(items):
+            assert snapshot.get_key(i) == item.key and snapshot.item_ids[i] == item.id, \
+                "TEST FAILURE: Snapshot item " + str(i) + " does not match " + str(item)
+            assert abs(snapshot.priorities[i] - item.budget.get_priority()) < 1e-6, "TEST FAILURE: Wrong snapshot priority"
+            assert np.isnan(snapshot.expectations[i]), "TEST FAILURE: Concept without beliefs has a snapshot expectation"
+        assert snapshot.is_valid(), "TEST FAILURE: Unchanged snapshot is not valid"
+
+        for i in range(2000):
+            memory.conceptualize_term(NALGrammar.Terms.from_string("(c" + str(i) + "-->d)"))
+        assert writer.publish(memory.concepts_bag) != snapshot_name, \
+            "TEST FAILURE: Writer did not move to a larger block when the bag outgrew it"
+        snapshot.release()
+        reader.close()
+
+        reader = NARSDataStructures.BagSnapshot.BagSnapshotReader(writer.get_name())
+        snapshot = reader.read()
+        assert len(snapshot) == len(memory.concepts_bag), "TEST FAILURE: Snapshot of the grown bag has the wrong size"
+        snapshot.release()
+        reader.close()
+    finally:
+        writer.close()
+
+
+def test_memory_journal():
+    """
+        Test if memory restored from a journal directory matches the journaled memory
+    """
+    nars = NARS.NARS()
+    with tempfile.TemporaryDirectory() as directory:
+        nars.memory_journal = NARSJournal.MemoryJournal(nars.memory, directory, flush_interval=1,
+                                                        checkpoint_interval=5, checkpoint_chunk_size=2)
+        nars.run_headless(["(a-->b). %1.0;0.9%", "(b-->c). %1.0;0.9%", "(c-->d). %0.8;0.9%", "(d-->e)! %1.0;0.9%"],
+                          cycles=23)
+        nars.stop_memory_journal()
+        assert len(NARSJournal.get_file_numbers(directory)) <= 2, \
+            "TEST FAILURE: Files older than the last complete checkpoint were not deleted"
+
+        with open(os.path.join(directory, os.listdir(directory)[0]), "a") as file:
+            file.write('{"type": "conc')  # cut off by a crash
+
+        journaled_memory = nars.memory
+        restored_memory = NARSJournal.restore_memory(directory)
+
+    assert restored_memory.current_cycle_number == journaled_memory.current_cycle_number, \
+        "TEST FAILURE: Restored memory is at the wrong cycle"
+    assert set(restored_memory.concepts_bag.item_lookup_dict) == set(journaled_memory.concepts_bag.item_lookup_dict), \
+        "TEST FAILURE: Restored memory has different concepts"
+    for key, item in journaled_memory.concepts_bag.item_lookup_dict.items():
+        restored_item = restored_memory.concepts_bag.peek(key)
+        assert abs(restored_item.budget.get_priority() - item.budget.get_priority()) < 1e-9 \
+               and abs(restored_item.budget.get_quality() - item.budget.get_quality()) < 1e-9, \
+            "TEST FAILURE: Restored concept " + key + " has a different budget"
+        for table, restored_table in ((item.object.belief_table, restored_item.object.belief_table),
+                                      (item.object.desire_table, restored_item.object.desire_table)):
+            assert sorted([sentence.get_formatted_string() for (sentence, _) in table]) \
+                   == sorted([sentence.get_formatted_string() for (sentence, _) in restored_table]), \
+                "TEST FAILURE: Restored concept " + key + " has different sentences"
+    assert restored_memory.next_stamp_id == journaled_memory.next_stamp_id, "TEST FAILURE: Stamp IDs were not restored"
+
+
+def test_cold_concept_store():
+    """
+        Test if demoted concepts give back the same tables and links when they are used again
+    """
+    nars = NARS.NARS()
+    nars.run_headless(["(a-->b). %1.0;0.9%", "(b-->c). %0.8;0.9%", "((a-->b)==>(c-->d)). %1.0;0.9%", "(c-->d)! %1.0;0.9%"],
+                      cycles=10)
+
+    def get_contents(concept):
+        return ([sentence.get_formatted_string() for (sentence, _) in concept.belief_table],
+                [sentence.get_formatted_string() for (sentence, _) in concept.desire_table],
+                [list(belief.stamp.evidential_base) for (belief, _) in concept.belief_table],
+                [sorted([(link_item.key, link_item.budget.get_priority(), link_item.budget.decay_timestamp)
+                         for link_item in getattr(concept, link_attribute)])
+                 for link_attribute in NARSDataStructures.ConceptStore.LINK_ATTRIBUTES])
+
+    contents = {item.key: get_contents(item.object) for item in nars.memory.concepts_bag}
+    assert any([len(prediction_links) > 0 for (_, _, _, (_, _, _, prediction_links, _)) in contents.values()]), \
+        "TEST FAILURE: Test memory has no links to store"
+
+    nars.memory.demote_cold_concepts(hot_capacity=1)
+    cold_items = [item for item in nars.memory.concepts_bag if item.object.is_cold()]
+    assert len(cold_items) == len(contents) - 1, "TEST FAILURE: Wrong number of concepts demoted"
+    assert max([item.budget.get_priority() for item in cold_items]) <= \
+           min([item.budget.get_priority() for item in nars.memory.concepts_bag if not item.object.is_cold()]), \
+        "TEST FAILURE: A higher priority concept was demoted"
+    assert "belief_table" not in cold_items[0].object.__dict__, "TEST FAILURE: Demoted concept kept its table in RAM"
+
+    writer = NARSDataStructures.BagSnapshot.BagSnapshotWriter()
+    try:
+        writer.publish(nars.memory.concepts_bag)
+    finally:
+        writer.close()
+    assert all([item.object.is_cold() for item in cold_items]), "TEST FAILURE: Publishing a snapshot loaded cold concepts"
+
+    for item in nars.memory.concepts_bag:
+        assert get_contents(item.object) == contents[item.key], \
+            "TEST FAILURE: Concept " + item.key + " changed after it was demoted and loaded"
+        assert not item.object.is_cold(), "TEST FAILURE: Used concept is still cold"
+    assert len(nars.memory.cold_concept_store) == 0, "TEST FAILURE: Loaded records are still in the store"
+
+    nars.memory.demote_cold_concepts(hot_capacity=0)
+    store_size = nars.memory.cold_concept_store.size
+    nars.memory.cold_concept_store.compact()
+    assert nars.memory.cold_concept_store.size < store_size, "TEST FAILURE: Compaction did not reclaim loaded records"
+
+    # a concept forgotten while cold is restored when it is created again
+    forgotten_key = "(a --> b)"
+    nars.memory.concepts_bag.TAKE_USING_KEY(forgotten_key)
+    nars.memory.cold_concept_store.compact()
+    assert forgotten_key in nars.memory.cold_concept_store, "TEST FAILURE: Compaction dropped a forgotten concept's record"
+    recreated_concept = nars.memory.peek_concept(NALGrammar.Terms.from_string(forgotten_key))
+    assert get_contents(recreated_concept)[0] == contents[forgotten_key][0], \
+        "TEST FAILURE: Re-created concept did not get back the beliefs it had while cold"
+    assert forgotten_key not in nars.memory.cold_concept_store, "TEST FAILURE: Restored record is still in the store"
+    nars.run_headless(["(a-->b)?"], cycles=10)
+
+
+def test_metrics():
+    """
+        Test if the metrics registry records the working cycle, tasks, inference rules and bag operations,
+        and exports them
+    """
+    registry = NARSMetrics.MetricsRegistry()
+    for value in [0.00002, 0.0003, 0.0003, 2.0]:
+        registry.observe("test_seconds", value, {"phase": "a"})
+    registry.increment("test_total", {"rule": 'say "hi"'}, amount=2)
+    with registry.timer("test_seconds", {"phase": "b"}): pass
+    histogram = registry.get_histogram("test_seconds", {"phase": "a"})
+    assert histogram.count == 4 and histogram.get_quantile(0.5) == 0.0005, "TEST FAILURE: Wrong histogram quantile"
+    assert registry.get_histogram("test_seconds", {"phase": "b"}).count == 1, "TEST FAILURE: Timer was not observed"
+    text = registry.to_prometheus_text()
+    assert 'test_seconds_bucket{phase="a",le="+Inf"} 4' in text, "TEST FAILURE: Wrong histogram export"
+    assert 'test_total{rule="say \\"hi\\""} 2' in text, "TEST FAILURE: Wrong counter export"
+
+    nars = NARS.NARS()
+    concepts_before = len(nars.memory)
+    registry = nars.enable_metrics()
+    try:
+        nars.run_headless(["(a-->b).", "(b-->c).", "(a-->c)?",
+                           "(a-->b). :|:", "(&/,(a-->b),((*,{SELF})-->op))! :|:"], cycles=20)
+        metrics = registry.to_dict()
+        phases = {histogram["labels"]["phase"] for histogram in metrics["histograms"]["nars_cycle_phase_seconds"]}
+        assert phases == {"input", "global_buffer", "consider", "operations", "maintenance"}, \
+            "TEST FAILURE: Missing cycle phases " + str(phases)
+        assert {histogram["labels"]["punctuation"] for histogram in metrics["histograms"]["nars_task_seconds"]} \
+               == {".", "?", "!"}, "TEST FAILURE: Tasks were not timed by punctuation"
+        assert registry.get_counter_value("nars_inference_rule_fired_total", {"rule": "F_Deduction"}) > 0, \
+            "TEST FAILURE: Deduction was not counted"
+        assert registry.get_counter_value("nars_container_operations_total",
+                                          {"container": "ConceptsBag", "item": "Concept", "operation": "put"}) \
+               == len(nars.memory) - concepts_before, "TEST FAILURE: Wrong count of concepts put"
+        json.dumps(metrics)
+    finally:
+        nars.disable_metrics()
+    assert Global.Global.metrics is None, "TEST FAILURE: Metrics were not disabled"
+
+
 def test_4_event_temporal_chaining():
     calculate_expected_num_of_results = lambda N: int(N * (N + 1) / 2 - 1)
 
@@ -278,6 +668,38 @@ def main():
     test_bag_overflow_purge()
     test_bag_clear()
     test_bag_priority_changing()
+    test_bag_sparse_buckets()
+    test_bag_bucket_slots()
+    test_bag_lazy_decay()
+    test_bag_lazy_decay_with_working_cycle()
+    test_bag_peek_distribution()
+    test_bucket_sampling_index_single_level()
+    test_bag_snapshot()
+
+    """
+        Memory Journal Tests
+    """
+    test_memory_journal()
+
+    """
+        Cold Concept Store Tests
+    """
+    test_cold_concept_store()
+
+    """
+        Metrics Tests
+    """
+    test_metrics()
+
+    """
+        Truth-Value Store Tests
+    """
+    test_value_formatting_is_lazy()
+
+    """
+        GUI Tests
+    """
+    test_gui_update_batching()
 
     print("All Data Structure Tests successfully passed.")
 
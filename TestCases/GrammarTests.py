@@ -1,5 +1,16 @@
+import gc
+import random
+import weakref
+
+import numpy as np
+
+import Config
+import Global
+
 import NARSDataStructures
 import NALGrammar
+import NALInferenceRules.HelperFunctions
+import NALInferenceRules.TruthValueFunctions
 import NALSyntax
 import NARS
 import NARSMemory
@@ -58,6 +69,201 @@ def array_term_indexing_test():
                                                          "1.0, 0.5" +
                                                          NALSyntax.StatementSyntax.ArrayElementIndexEnd.value)
 
+def term_interning_test():
+    """
+        Test if terms with the same structure are the same interned instance, sharing one term ID
+    """
+    statement_term = NALGrammar.Terms.from_string("(A-->(*,B,C))")
+    same_statement_term = NALGrammar.Terms.StatementTerm(NALGrammar.Terms.from_string("A"),
+                                                         NALGrammar.Terms.from_string("(*,B,C)"),
+                                                         NALSyntax.Copula.Inheritance)
+    assert statement_term is same_statement_term, "TEST FAILURE: Same term was not interned to one instance"
+    assert statement_term.get_subject_term() is NALGrammar.Terms.from_string("A"), "TEST FAILURE: Subterm was not interned"
+    assert {str(statement_term): True}.get(statement_term), "TEST FAILURE: Term cannot look up its string key"
+
+    other_statement_term = NALGrammar.Terms.from_string("(A-->(*,C,B))")
+    assert statement_term != other_statement_term and statement_term.term_id != other_statement_term.term_id, \
+        "TEST FAILURE: Different terms share a term ID"
+
+    # intervals are not part of the term string, so terms differing only by interval are equal but not identical
+    implication_term = NALGrammar.Terms.from_string("((A-->B)=/>(C-->D))")
+    implication_term_with_interval = NALGrammar.Terms.StatementTerm(implication_term.get_subject_term(),
+                                                                    implication_term.get_predicate_term(),
+                                                                    implication_term.get_copula(),
+                                                                    interval=5)
+    assert implication_term_with_interval is not implication_term, "TEST FAILURE: Interval was lost by interning"
+    assert implication_term_with_interval == implication_term, "TEST FAILURE: Equal terms have different term IDs"
+
+def parse_cache_test():
+    """
+        Test if parsing the same Narsese string twice is answered from the parse cache
+    """
+    NALGrammar.Terms.clear_parse_cache()
+    term = NALGrammar.Terms.from_string("(--,(3_7-->B))")
+    hits, misses, _, _ = NALGrammar.Terms.get_parse_cache_info()
+    same_term = NALGrammar.Terms.from_string("(--, (3_7 --> B))")
+    assert same_term is term, "TEST FAILURE: Cached parse returned a different term"
+    assert NALGrammar.Terms.get_parse_cache_info().hits == hits + 1, "TEST FAILURE: Normalized string missed the cache"
+    assert NALGrammar.Terms.get_parse_cache_info().misses == misses, "TEST FAILURE: Cached string was parsed again"
+
+    NALGrammar.Sentences.clear_parse_cache()
+    sentence = NALGrammar.Sentences.new_sentence_from_string("(a-->b). %0.8;0.5%")
+    same_sentence = NALGrammar.Sentences.new_sentence_from_string("(a-->b). %0.8;0.5%")
+    assert NALGrammar.Sentences.get_parse_cache_info().hits == 1, "TEST FAILURE: Sentence string missed the cache"
+    assert sentence.stamp.id != same_sentence.stamp.id, "TEST FAILURE: Cached sentence parse reused a Stamp"
+    assert sentence.statement is same_sentence.statement \
+           and same_sentence.value.frequency == 0.8 and same_sentence.value.confidence == 0.5, \
+        "TEST FAILURE: Cached sentence parse lost part of the sentence"
+
+def random_term_string(depth):
+    """
+        Generate a random well-formed Narsese term string with at most the given nesting depth
+    """
+    kind = random.randrange(6) if depth > 0 else random.randrange(2)
+    if kind == 0:
+        return random.choice("abcdefgxyzABCDEFG") + random.choice(["", "1", "_2", "^op", "37"])
+    elif kind == 1:
+        return random.choice(["#x", "?y", "#z(a)", "0", "{SELF}"])
+    elif kind == 2:
+        set_start, set_end = random.choice(["{}", "[]"])
+        subterms = [random_term_string(depth - 1) for _ in range(random.randint(1, 3))]
+        return set_start + ",".join(subterms) + set_end
+    elif kind == 3:
+        connector = random.choice(["&", "|", "-", "~", "*", "/", "\\", "&&", "||", "&|", "@&"])
+        subterms = [random_term_string(depth - 1) for _ in range(random.randint(1, 3))]
+        return "(" + connector + "," + ",".join(subterms) + ")"
+    elif kind == 4:
+        elements = [random_term_string(depth - 1)]
+        for _ in range(random.randint(1, 3)):
+            if random.random() < 0.5: elements.append(str(random.randint(1, 20)))  # interval
+            elements.append(random_term_string(depth - 1))
+        if random.random() < 0.3: elements.append(str(random.randint(1, 20)))  # trailing interval
+        return "(" + random.choice(["--", "&/"]) + "," + ",".join(elements) + ")"
+    else:
+        # the recursive parser counts the brackets in {--, --] and {-] as set brackets, so leave those copulas out
+        copula = random.choice([copula.value for copula in NALSyntax.Copula
+                                if "{" not in copula.value and "]" not in copula.value])
+        return "(" + random_term_string(depth - 1) + copula + random_term_string(depth - 1) + ")"
+
+
+def parser_fuzz_equivalence_test():
+    """
+        Test if the single-pass parser builds the same terms as the recursive parser on random term strings
+    """
+    random.seed(9)
+    for _ in range(2000):
+        term_string = random_term_string(depth=4)
+        expected_term = NALGrammar.Terms._from_string_recursive(term_string)
+        term = NALGrammar.Parser.parse_term(term_string)
+        assert term is expected_term, "TEST FAILURE: Parsers disagree on " + term_string + ": " \
+                                      + str(term) + " instead of " + str(expected_term)
+        if isinstance(term, NALGrammar.Terms.StatementTerm):
+            assert term.interval == expected_term.interval, "TEST FAILURE: Parsers disagree on the interval of " + term_string
+
+def lazy_term_string_test():
+    """
+        Test if compound and spatial term strings are only built when first used, and are built correctly
+    """
+    elements = np.empty(shape=(2, 3), dtype=object)
+    for indices, _ in np.ndenumerate(elements):
+        elements[indices] = NALGrammar.Terms.from_string("(" + str(indices[0]) + "_" + str(indices[1]) + "-->B)")
+    spatial_term = NALGrammar.Terms.SpatialTerm(spatial_subterms=elements,
+                                                connector=NALSyntax.TermConnector.ArrayConjunction)
+    assert spatial_term.string is None, "TEST FAILURE: Spatial term string was built before it was used"
+
+    expected_string = "(" + NALSyntax.TermConnector.ArrayConjunction.value
+    for indices, element in np.ndenumerate(elements):
+        expected_string += str(indices[0]) + str(element) + str(indices[1]) + "_"
+    expected_string += ")"
+    assert str(spatial_term) == expected_string, "TEST FAILURE: Spatial term string is " + str(spatial_term)
+
+    compound_term = NALGrammar.Terms.CompoundTerm([elements[0, 0], elements[1, 2]],
+                                                  NALSyntax.TermConnector.Conjunction)
+    assert compound_term.string is None, "TEST FAILURE: Compound term string was built before it was used"
+    assert str(compound_term) == "(&&,(0_0 --> B),(1_2 --> B))", "TEST FAILURE: Compound term string is " + str(compound_term)
+    assert NALGrammar.Terms.from_string("(&&,(0_0-->B),(1_2-->B))") is compound_term, \
+        "TEST FAILURE: Term parsed from the same string is not the interned term"
+
+
+def evidential_base_overlap_test():
+    """
+        Test if evidential bases detect shared evidence through their fingerprints and Stamp IDs,
+        including IDs whose fingerprint bits collide, and keep their fingerprint right after purging old evidence
+    """
+    NARS.NARS()
+    j1 = NALGrammar.Sentences.new_sentence_from_string("(a-->b).")
+    j2 = NALGrammar.Sentences.new_sentence_from_string("(b-->c).")
+    assert not j1.stamp.evidential_base.has_evidential_overlap(j2.stamp.evidential_base) \
+           and NALGrammar.Sentences.may_interact(j1, j2), "TEST FAILURE: Separate evidence overlapped"
+
+    derived = NALGrammar.Sentences.new_sentence_from_string("(a-->c).")
+    derived.stamp.evidential_base.merge_sentence_evidential_base_into_self(j1)
+    derived.stamp.evidential_base.merge_sentence_evidential_base_into_self(j2)
+    assert j1 in derived.stamp.evidential_base and not NALGrammar.Sentences.may_interact(j1, derived), \
+        "TEST FAILURE: Sentence interacted with a sentence derived from it"
+    assert derived.stamp.evidential_base.has_evidential_overlap(j2.stamp.evidential_base), \
+        "TEST FAILURE: Shared evidence was not detected"
+
+    # a sentence whose ID has the same fingerprint bit as j1, but is different evidence
+    colliding = NALGrammar.Sentences.new_sentence_from_string("(d-->e).")
+    colliding.stamp.evidential_base.set_evidence([j1.stamp.id + Config.EVIDENTIAL_BASE_FINGERPRINT_BITS])
+    assert colliding.stamp.evidential_base.fingerprint & j1.stamp.evidential_base.fingerprint \
+           and not colliding.stamp.evidential_base.has_evidential_overlap(j1.stamp.evidential_base), \
+        "TEST FAILURE: Colliding fingerprint bits were taken for shared evidence"
+
+    for _ in range(Config.MAX_EVIDENTIAL_BASE_LENGTH):
+        derived.stamp.evidential_base.merge_sentence_evidential_base_into_self(NALGrammar.Sentences.new_sentence_from_string("(f-->g)."))
+    assert len(derived.stamp.evidential_base) == Config.MAX_EVIDENTIAL_BASE_LENGTH \
+           and derived.stamp.evidential_base.fingerprint == NALGrammar.Sentences.get_evidence_fingerprint(*derived.stamp.evidential_base.ids), \
+        "TEST FAILURE: Evidential base was not purged to its maximum length"
+    assert not derived.stamp.evidential_base.has_evidential_overlap(j1.stamp.evidential_base), \
+        "TEST FAILURE: Purged evidence still overlapped"
+
+
+def evidence_retention_test():
+    """
+        Test if a derived sentence keeps only the Stamp IDs of its evidence and premises, not the sentences,
+        and if the sentence index still resolves those IDs for display until it forgets them
+    """
+    NARS.NARS()
+    premise = NALGrammar.Sentences.new_sentence_from_string("(a-->b).")
+    derived = NALGrammar.Sentences.new_sentence_from_string("(a-->c).")
+    derived.stamp.evidential_base.merge_sentence_evidential_base_into_self(premise)
+    NALInferenceRules.HelperFunctions.stamp_and_print_inference_rule(derived, None, [premise])
+    premise_string = str(premise)
+    assert derived.stamp.get_evidence_strings(derived.stamp.parent_premise_ids) == [premise_string], \
+        "TEST FAILURE: Parent premise was not resolved from the sentence index"
+
+    premise_reference = weakref.ref(premise)
+    premise_id = premise.stamp.id
+    del premise
+    for i in range(Config.SENTENCE_INDEX_CAPACITY):
+        NALGrammar.Sentences.new_sentence_from_string("(f-->g).")
+    gc.collect()
+    assert premise_reference() is None, "TEST FAILURE: Derived sentence kept its premise alive"
+    assert premise_id in derived.stamp.evidential_base.ids \
+           and derived.stamp.get_evidence_strings(derived.stamp.parent_premise_ids) \
+           == [Global.Global.MARKER_SENTENCE_ID + str(premise_id) + Global.Global.MARKER_ID_END], \
+        "TEST FAILURE: Forgotten premise was not shown by its Stamp ID"
+
+
+def present_value_cache_test():
+    """
+        Test if an event's projected value is computed once per cycle, and projected again when the cycle advances
+    """
+    nars = NARS.NARS()
+    event = NALGrammar.Sentences.new_sentence_from_string("(a-->b). :|: %1.0;0.9%")
+    present_value = event.get_present_value()
+    assert event.get_present_value() is present_value, "TEST FAILURE: Present value was projected twice in one cycle"
+
+    nars.memory.current_cycle_number += 3
+    projected_value = event.get_present_value()
+    assert projected_value is not present_value and projected_value.confidence < present_value.confidence, \
+        "TEST FAILURE: Present value was not projected again when the cycle advanced"
+    assert event.get_expectation() == NALInferenceRules.TruthValueFunctions.Expectation(projected_value.frequency,
+                                                                                        projected_value.confidence), \
+        "TEST FAILURE: Expectation was not of the projected value"
+
 
 def main():
     """
@@ -65,6 +271,17 @@ def main():
     """
     calculate_syntactic_complexity_test()
     array_term_indexing_test()
+    term_interning_test()
+    parse_cache_test()
+    parser_fuzz_equivalence_test()
+    lazy_term_string_test()
+
+    """
+        Sentence Tests
+    """
+    evidential_base_overlap_test()
+    evidence_retention_test()
+    present_value_cache_test()
 
     print("All Grammar Tests successfully passed.")
 
@@ -1,11 +1,17 @@
 import threading
+
+import Global
 import InputChannel
+import NARS
 
 import NALGrammar
+import NALSyntax
 import NALInferenceRules.Local
 import NALInferenceRules.Conditional
 
 import NARSInferenceEngine
+import NARSInferencePool
+import NARSShards
 
 """
     Author: Christian Hahm
@@ -350,6 +356,205 @@ def conditional_conjunctional_abduction():
 
     assert success, "TEST FAILURE: Conditional Conjunctional Abduction test failed: " + failed_criterion
 
+
+def two_judgment_rule_dispatch():
+    """
+        Test if each shape of two-judgment premise pair fires the rules it did before the rules were put in a table,
+        and if the test pairs cover every distinct list of rules in the table
+    """
+    test_cases = [
+        ("(M-->P)", "(S-->M)", ["F_Deduction", "F_Exemplification"]),
+        ("(S-->M)", "(M-->P)", ["F_Deduction", "F_Exemplification"]),
+        ("(M-->P)", "(M-->S)", ["F_Induction", "F_Induction", "F_Comparison", "F_Union", "F_Intersection",
+                                "F_Difference", "F_Difference"]),
+        ("(P-->M)", "(S-->M)", ["F_Abduction", "F_Abduction", "F_Intersection", "F_Union",
+                                "F_Difference", "F_Difference", "F_Comparison"]),
+        ("(M-->P)", "(S<->M)", ["F_Analogy"]),
+        ("(M<->S)", "(P-->M)", ["F_Analogy"]),
+        ("(M<->P)", "(S<->M)", ["F_Resemblance"]),
+        ("(S-->P)", "(P-->S)", []),
+        ("(S-->P)", "(S<->P)", []),
+        ("(A-->B)", "(C-->D)", []),
+        ("((a-->b)==>(c-->d))", "((e-->f)==>(a-->b))", ["F_Deduction", "F_Exemplification"]),
+        ("((&&,(a-->b),(c-->d))==>(e-->f))", "((c-->d)==>(e-->f))", ["F_Abduction", "F_Abduction", "F_Abduction",
+                                                                     "F_Comparison"]),
+        ("((a-->b)<=>(c-->d))", "((c-->d)<=>(e-->f))", ["F_Resemblance"]),
+        ("((a-->b)==>(c-->d))", "(a-->b)", []),
+        ("(&&,(a-->b),(c-->d))", "((&&,(a-->b),(c-->d))==>(e-->f))", ["F_Deduction"])
+    ]
+
+    covered_rules = []
+    for (j1_string, j2_string, expected_derived_by) in test_cases:
+        j1 = NALGrammar.Sentences.new_sentence_from_string(j1_string + ". %1.0;0.9%")
+        j2 = NALGrammar.Sentences.new_sentence_from_string(j2_string + ". %1.0;0.9%")
+        derived_by = [derived_sentence.stamp.derived_by for derived_sentence in run_test(j1, j2)]
+        assert derived_by == expected_derived_by, \
+            "TEST FAILURE: " + j1_string + " and " + j2_string + " derived by " + str(derived_by)
+
+        j1_shape = NARSInferenceEngine.get_statement_shape(j1.statement)
+        j2_shape = NARSInferenceEngine.get_statement_shape(j2.statement)
+        if j1_shape is NARSInferenceEngine.COMPOUND or j2_shape is NARSInferenceEngine.COMPOUND \
+                or j1_shape[NARSInferenceEngine.IS_FIRST_ORDER] != j2_shape[NARSInferenceEngine.IS_FIRST_ORDER]: continue
+        shared_terms = NARSInferenceEngine.get_shared_terms(j1.statement, j2.statement,
+                                                            j1_shape[NARSInferenceEngine.IS_SYMMETRIC],
+                                                            j2_shape[NARSInferenceEngine.IS_SYMMETRIC])
+        if shared_terms == NARSInferenceEngine.TAUTOLOGY: continue
+        covered_rules.append(NARSInferenceEngine.TWO_JUDGMENT_RULES[(j1_shape[NARSInferenceEngine.IS_FIRST_ORDER],
+                                                                    j1_shape[NARSInferenceEngine.IS_SYMMETRIC],
+                                                                    j2_shape[NARSInferenceEngine.IS_SYMMETRIC],
+                                                                    shared_terms)])
+
+    for rules in NARSInferenceEngine.TWO_JUDGMENT_RULES.values():
+        assert rules in covered_rules, "TEST FAILURE: No test pair fires the rules " + str(rules)
+
+
+def headless_run():
+    """
+        Test if a headless NARS consumes its input in order, stops when the predicate holds, and returns its outputs
+    """
+    nars = NARS.NARS()
+    outputs = nars.run_headless(input_lines=["(S-->P). %1.0;0.9%", "", "// comment", "(S-->P)?"],
+                                cycles=100,
+                                until=lambda outputs: any([output.startswith("OUT:") for output in outputs]))
+
+    assert Global.Global.get_current_cycle_number() < 100, "TEST FAILURE: Headless run did not stop when answered"
+    answers = [output for output in outputs if output.startswith("OUT:")]
+    assert len(answers) == 1 and "(S --> P)." in answers[0], \
+        "TEST FAILURE: Headless run returned the wrong outputs " + str(outputs)
+
+    input_lines = iter(["(A-->B).", "(B-->C).", "(C-->D)."])
+    nars.run_headless(input_lines=input_lines, cycles=2, lines_per_cycle=1)
+    assert list(input_lines) == ["(C-->D)."], "TEST FAILURE: Headless run did not feed one input line per cycle"
+    assert Global.Global.output_log is None, "TEST FAILURE: Headless run did not restore printed output"
+
+    other_nars = NARS.NARS()
+    nars.run_headless(input_lines=["(E-->F)."], cycles=1)
+    assert Global.Global.NARS is other_nars, "TEST FAILURE: Headless run did not restore the global NARS"
+    sentence = NALGrammar.Sentences.new_sentence_from_string("(p-->q).")
+    assert sentence.stamp.context is Global.Global.NARS.context, \
+        "TEST FAILURE: Headless run left its NARS as the context of the thread"
+
+
+def independent_reasoners():
+    """
+        Test if two NARS in one process keep their own cycle numbers and Stamp IDs,
+        and if sentences keep using the NARS that created them while another one runs
+    """
+    nars_a = NARS.NARS()
+    nars_b = NARS.NARS()
+    nars_a.run_headless(input_lines=["(a-->b). :|:"], cycles=5)
+    next_stamp_id_a = nars_a.memory.next_stamp_id
+    nars_b.run_headless(input_lines=["(c-->d). :|:", "(e-->f). :|:"], cycles=2)
+    assert nars_a.memory.current_cycle_number == 5 and nars_b.memory.current_cycle_number == 2, \
+        "TEST FAILURE: NARS did not keep its own cycle number"
+    assert nars_a.memory.next_stamp_id == next_stamp_id_a, "TEST FAILURE: Another NARS took Stamp IDs from this NARS' memory"
+
+    event_a = nars_a.memory.peek_concept(NALGrammar.Terms.from_string("(a-->b)")).belief_table.peek()
+    assert event_a.stamp.context is nars_a.context, "TEST FAILURE: Sentence was not bound to the NARS that created it"
+    assert event_a.get_tense() == NALSyntax.Tense.Past, \
+        "TEST FAILURE: Sentence tense did not use the cycle number of its own NARS"
+
+    nars_a.run_headless(input_lines=["(g-->h). :|:"], cycles=1)
+    event_b = nars_b.memory.peek_concept(NALGrammar.Terms.from_string("(c-->d)")).belief_table.peek()
+    assert event_b.stamp.context is nars_b.context and nars_b.memory.current_cycle_number == 2, \
+        "TEST FAILURE: Running one NARS changed the other"
+
+    nars_c = NARS.NARS()
+    nars_a.do_working_cycle()
+    sentence = NALGrammar.Sentences.new_sentence_from_string("(p-->q).")
+    assert sentence.stamp.context is nars_c.context, \
+        "TEST FAILURE: NARS stayed the context of the thread after its working cycle"
+
+
+def pooled_inference():
+    """
+        Test if premise pairs run in worker processes derive the same sentences, in the same order,
+        as when they are run in this process
+    """
+    Global.Global.NARS = NARS.NARS()
+    premise_pairs = [("((&/,(a-->b),(c-->d))=/>(e-->f)).", "(&/,(a-->b),(c-->d)). :|:"),
+                     ("(a-->b). %1.0;0.9%", "(a-->b). %0.5;0.5%"),
+                     ("(&/,(a-->b),((*,{SELF})-->op))! :|:", "(a-->b). :|:"),
+                     ("((a-->b)=/>(c-->d)).", "(a-->b). :|:")]
+    premise_pairs = [(NALGrammar.Sentences.new_sentence_from_string(j1),
+                      NALGrammar.Sentences.new_sentence_from_string(j2)) for (j1, j2) in premise_pairs]
+
+    def run_pool(processes, min_batch_size):
+        inference_pool = NARSInferencePool.InferencePool(processes, min_batch_size=min_batch_size)
+        try:
+            for (j1, j2) in premise_pairs:
+                inference_pool.add_premise_pair(j1, j2)
+            derived_sentences = inference_pool.run()
+            assert (inference_pool.pool is not None) == (min_batch_size <= len(premise_pairs)), \
+                "TEST FAILURE: Worker processes were not used as expected"
+        finally:
+            inference_pool.close()
+        return [(derived_sentence.get_formatted_string().split(Global.Global.MARKER_ID_END)[1],
+                 derived_sentence.stamp.derived_by,
+                 list(derived_sentence.stamp.parent_premise_ids),
+                 [stamp_id for stamp_id in derived_sentence.stamp.evidential_base if stamp_id != derived_sentence.stamp.id])
+                for derived_sentence in derived_sentences]
+
+    expected = run_pool(processes=2, min_batch_size=len(premise_pairs) + 1)  # in this process
+    assert len(expected) > 0, "TEST FAILURE: Premise pairs derived nothing"
+    actual = run_pool(processes=2, min_batch_size=1)
+    assert actual == expected, "TEST FAILURE: Worker processes derived " + str(actual) + " instead of " + str(expected)
+
+
+def sharded_run():
+    """
+        Test if shards in separate processes each keep their own statements' concepts,
+        and derive a conclusion from premises owned by different shards
+    """
+    shard_count = 2
+    for i in range(100):
+        implication = NALGrammar.Terms.from_string("((&/,(s" + str(i) + "-->seen),(t" + str(i) + "-->seen))=/>(g" + str(i) + "-->reached))")
+        conjunction = NALGrammar.Terms.from_string("(&/,(s" + str(i) + "-->seen),(t" + str(i) + "-->seen))")
+        if NARSShards.get_shard_index(implication, shard_count) != NARSShards.get_shard_index(conjunction, shard_count): break
+    conclusion = NALGrammar.Terms.from_string("(g" + str(i) + "-->reached)")
+
+    sharded_nars = NARSShards.ShardedNARS(shard_count, seed=1)
+    try:
+        outputs = sharded_nars.run_headless([implication.get_term_string() + ".", "(a-->b).", "(a-->b)?"]
+                                            + [conjunction.get_term_string() + ". :|:"] * 20,
+                                            cycles=60, lines_per_cycle=1)
+        assert any([output.startswith("OUT:") and "(a --> b)" in output for output in outputs]), \
+            "TEST FAILURE: Question was not answered by its shard"
+        assert sharded_nars.get_belief(conclusion) is not None, \
+            "TEST FAILURE: Premises in different shards did not derive " + str(conclusion)
+
+        shard_concepts = sharded_nars.get_shard_concepts()
+        for term in (implication, conjunction, conclusion):
+            assert term.get_term_string() in shard_concepts[NARSShards.get_shard_index(term, shard_count)], \
+                "TEST FAILURE: " + str(term) + " is not in its shard"
+        assert len(set(shard_concepts[0]) & set(shard_concepts[1])) == 0, "TEST FAILURE: A concept is owned by two shards"
+    finally:
+        sharded_nars.close()
+
+
+def shard_remote_belief_copy():
+    """
+        Test if a shard keeps a single copy of another shard's best belief, replaced by each reply,
+        next to the beliefs of its own
+    """
+    nars = NARS.NARS()
+    shard = NARSShards.Shard(nars, shard_index=0, shard_count=2)
+    local_belief = NALGrammar.Sentences.new_sentence_from_string("(a-->b). %1.0;0.5%")
+    belief_table = nars.memory.peek_concept(local_belief.statement).belief_table
+    belief_table.put(local_belief)
+    for truth_value in ("%0.8;0.7%", "%0.6;0.8%"):
+        remote_belief = NALGrammar.Sentences.new_sentence_from_string("(a-->b). " + truth_value)
+        encoded_belief = NARSInferencePool.encode_sentence(remote_belief)
+        shard.store_remote_belief(NARSInferencePool.decode_sentence_with_evidence(encoded_belief))
+        shard.store_remote_belief(NARSInferencePool.decode_sentence_with_evidence(encoded_belief))
+
+    beliefs = [belief for (belief, _) in belief_table]
+    assert len(beliefs) == 2 and local_belief in beliefs, "TEST FAILURE: Remote belief copies replaced the local belief " \
+                                                          "or were kept next to each other"
+    assert any([belief.stamp.id == remote_belief.stamp.id and abs(belief.value.frequency - 0.6) < 1e-6
+                for belief in beliefs]), "TEST FAILURE: Remote belief copy was not replaced by the last reply"
+
+
 def main():
     revision()
 
@@ -377,6 +582,24 @@ def main():
     # conditional_conjunctional_deduction()
     # conditional_conjunctional_abduction()
 
+    """
+        Rule dispatch
+    """
+    two_judgment_rule_dispatch()
+
+    """
+        Headless engine
+    """
+    headless_run()
+    independent_reasoners()
+
+    """
+        Worker processes
+    """
+    pooled_inference()
+    sharded_run()
+    shard_remote_belief_copy()
+
     print("All Inference Engine Tests successfully passed.")
 
 if __name__ == "__main__":
@@ -1,3 +1,7 @@
+import random
+
+import numpy as np
+
 import NALGrammar
 import NALInferenceRules
 
@@ -421,6 +425,40 @@ def conditional_conjunctional_abduction():
 
     assert success, "TEST FAILURE: Conditional Conjunctional Abduction test failed: " + output.get_term_string_no_id()
 
+def truth_value_array_functions():
+    """
+        Test if the array truth value functions compute the same truth-values as the scalar truth value functions
+    """
+    size = 50
+    f1, c1, f2, c2 = (np.array([random.random() for _ in range(size)]) for _ in range(4))
+    f1[0], f2[0] = 1.0, 1.0  # include full positive evidence
+
+    TruthValueFunctions = NALInferenceRules.TruthValueFunctions
+    for truth_value_function, array_function in TruthValueFunctions.ARRAY_TRUTH_VALUE_FUNCTIONS.items():
+        if truth_value_function is TruthValueFunctions.F_Projection:
+            f, c = array_function(f1, c1, 2, 5, 0.9)
+            expected = [truth_value_function(f1[i], c1[i], 2, 5, 0.9) for i in range(size)]
+        elif truth_value_function.__code__.co_argcount == 2:
+            f, c = array_function(f1, c1)
+            expected = [truth_value_function(f1[i], c1[i]) for i in range(size)]
+        else:
+            f, c = array_function(f1, c1, f2, c2)
+            expected = [truth_value_function(f1[i], c1[i], f2[i], c2[i]) for i in range(size)]
+
+        assert np.allclose(f, [truth_value.frequency for truth_value in expected]) \
+               and np.allclose(c, [truth_value.confidence for truth_value in expected]), \
+            "TEST FAILURE: " + array_function.__name__ + " does not match " + truth_value_function.__name__
+
+    truth_value_array = TruthValueFunctions.create_truth_value_array(f1, c1)
+    revised = TruthValueFunctions.ReviseArray(truth_value_array)
+    expected = truth_value_array[0]
+    for truth_value in truth_value_array[1:]:
+        expected = TruthValueFunctions.F_Revision(expected.frequency, expected.confidence,
+                                                  truth_value.frequency, truth_value.confidence)
+    assert np.isclose(revised.frequency, expected.frequency) and np.isclose(revised.confidence, expected.confidence), \
+        "TEST FAILURE: ReviseArray does not match repeated revision"
+
+
 def main():
     revision()
 
@@ -448,6 +486,11 @@ def main():
     conditional_conjunctional_deduction()
     conditional_conjunctional_abduction()
 
+    """
+        Truth value functions
+    """
+    truth_value_array_functions()
+
     print("All Inference Rule Tests successfully passed.")
 
 if __name__ == "__main__":
@@ -0,0 +1,66 @@
+import random
+import timeit as time
+
+import Config
+import Global
+import GrammarTests
+import NALGrammar
+import NARS
+
+"""
+    Author: Christian Hahm
+    Created: October 18, 2026
+    Purpose: Measures Narsese parsing throughput, in sentences per second
+"""
+
+NUMBER_OF_SENTENCES = 5000
+TERM_DEPTH = 4
+
+
+def generate_sentence_strings():
+    random.seed(3)
+    return ["(" + GrammarTests.random_term_string(depth=TERM_DEPTH - 1) + "-->"
+            + GrammarTests.random_term_string(depth=TERM_DEPTH - 1) + "). %0.9;0.9%"
+            for _ in range(NUMBER_OF_SENTENCES)]
+
+
+def measure_sentences_per_second(parse_function, sentence_strings):
+    start = time.default_timer()
+    for sentence_string in sentence_strings:
+        parse_function(sentence_string)
+    return len(sentence_strings) / (time.default_timer() - start)
+
+
+def statement_string(sentence_string):
+    return sentence_string[:sentence_string.rfind(")") + 1]
+
+
+def main():
+    Global.Global.NARS = NARS.NARS()  # need it for Stamp IDs
+    sentence_strings = generate_sentence_strings()
+
+    recursive_rate = measure_sentences_per_second(
+        lambda sentence_string: NALGrammar.Terms._from_string_recursive(statement_string(sentence_string)),
+        sentence_strings)
+    single_pass_rate = measure_sentences_per_second(
+        lambda sentence_string: NALGrammar.Parser.parse_term(statement_string(sentence_string)),
+        sentence_strings)
+
+    NALGrammar.Terms.clear_parse_cache()
+    NALGrammar.Sentences.clear_parse_cache()
+    sentence_rate = measure_sentences_per_second(NALGrammar.Sentences.new_sentence_from_string, sentence_strings)
+    repeated_sentence_strings = sentence_strings[:min(1000, Config.PARSE_CACHE_CAPACITY)]
+    measure_sentences_per_second(NALGrammar.Sentences.new_sentence_from_string, repeated_sentence_strings)  # fill cache
+    cached_sentence_rate = measure_sentences_per_second(NALGrammar.Sentences.new_sentence_from_string,
+                                                        repeated_sentence_strings)
+
+    print("Recursive parser: " + "{:.0f}".format(recursive_rate) + " statements/s")
+    print("Single-pass parser: " + "{:.0f}".format(single_pass_rate) + " statements/s")
+    print("new_sentence_from_string: " + "{:.0f}".format(sentence_rate) + " sentences/s")
+    print("new_sentence_from_string, cached: " + "{:.0f}".format(cached_sentence_rate) + " sentences/s")
+
+
+if __name__ == "__main__":
+    Config.DEBUG = False
+    Config.GUI_USE_INTERFACE = False
+    main()